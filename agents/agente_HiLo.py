@@ -5,9 +5,9 @@ from abc import ABC
 from core.player import Jugador, Mano
 from core.cartas import Carta
 from core.acciones import Accion
-from .agente_base import Agente
+from .agente_base import Agente, ConZapatoCompartido
 
-class AgenteHiLo(Agente, ABC):
+class AgenteHiLo(ConZapatoCompartido, Agente, ABC):
     """
     Agente que implementa conteo de cartas Hi-Lo y una estrategia básica
     adaptativa. Apuesta más fuerte cuando el conteo es alto.
@@ -24,21 +24,19 @@ class AgenteHiLo(Agente, ABC):
         :param max_bet_fraction: fracción del capital para apuesta máxima
         """
         super().__init__(jugador)
-        self.conteo = 0
+        # El Hi-Lo lo lleva el conteo del zapato (el del casino cuando juega en uno)
+        self._iniciar_zapato(num_mazos=4)
         self.base_bet = base_bet
         self.min_bet = min_bet
         self.max_bet_fraction = max_bet_fraction
         self.logger = logging.getLogger(self.__class__.__name__)
 
+    @property
+    def conteo(self) -> int:
+        return self.conteo_zapato.hilo
+
     def resetear_conteo(self):
-        self.conteo = 0
-
-    def observar_carta(self, carta: Carta):
-        val = carta.valor
-        if 2 <= val <= 6:
-            self.conteo += 1
-        elif val >= 10 or carta.rango.name == 'AS':
-            self.conteo -= 1
+        self._reiniciar_zapato()
 
     def decidir_apuesta(self) -> int:
         """
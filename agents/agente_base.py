@@ -2,8 +2,16 @@ from abc import ABC, abstractmethod
 from core.player import Jugador, Mano
 from core.cartas import Carta
 from core.acciones import Accion
+from core.composicion import ConteoZapato
 
 class Agente(ABC):
+    # Atributos que no van a los checkpoints (core/checkpoint.py): recursos del proceso como
+    # loggers, hilos o locks, que se quedan los del agente recién creado. Las subclases y
+    # mixins declaran los suyos; se juntan los de toda la jerarquía.
+    NO_CHECKPOINT = ('logger',)
+    # Cachés que solo van al checkpoint si se piden (incluir_memos); si no, quedan vacíos
+    MEMOS_CHECKPOINT = ()
+
     def __init__(self, jugador: Jugador):
         """
         Inicializa el agente con un jugador.
@@ -31,4 +39,62 @@ class Agente(ABC):
         """
         Para agentes contadores de cartas, el resto lo puede ignorar.
         """
-        pass
\ No newline at end of file
+        pass
+
+    def conectar_zapato(self, conteo_zapato) -> bool:
+        """
+        El casino ofrece su ConteoZapato compartido. Los agentes que lo usan lo guardan y
+        devuelven True; a esos el casino deja de notificarles carta por carta.
+        """
+        return False
+
+    @classmethod
+    def _atributos_declarados(cls, nombre: str) -> set:
+        return {atributo for clase in cls.__mro__ for atributo in clase.__dict__.get(nombre, ())}
+
+    def estado_checkpoint(self, incluir_memos: bool = False) -> dict:
+        """
+        Estado del agente entre rondas: capital, contadores, conteos y (opcionalmente) memos.
+        Se guarda junto con el resto del casino en un solo pickle, así las referencias
+        compartidas (el ConteoZapato del casino) siguen compartidas al cargarlo.
+        """
+        excluir = self._atributos_declarados('NO_CHECKPOINT')
+        if not incluir_memos:
+            excluir |= self._atributos_declarados('MEMOS_CHECKPOINT')
+        return {nombre: valor for nombre, valor in self.__dict__.items() if nombre not in excluir}
+
+    def restaurar_checkpoint(self, estado: dict):
+        """Vuelve al estado guardado. El Jugador se actualiza en el lugar (otros pueden tener referencias)."""
+        estado = dict(estado)
+        jugador = estado.pop('jugador', None)
+        if jugador is not None:
+            self.jugador.__dict__.update(jugador.__dict__)
+        self.__dict__.update(estado)
+
+
+class ConZapatoCompartido:
+    """
+    Mixin para agentes que cuentan cartas con un ConteoZapato (core/composicion.py).
+    Sin casino usan uno propio que se actualiza en observar_carta; el casino les pasa
+    el suyo con conectar_zapato y desde entonces lo leen por referencia.
+    """
+
+    def _iniciar_zapato(self, num_mazos: int):
+        self.conteo_zapato = ConteoZapato(num_mazos)
+        self._zapato_propio = True
+
+    def conectar_zapato(self, conteo_zapato) -> bool:
+        # Con otra cantidad de mazos el agente sigue con su propio conteo, como antes
+        if getattr(self, 'num_mazos', None) not in (None, conteo_zapato.num_mazos):
+            return False
+        self.conteo_zapato = conteo_zapato
+        self._zapato_propio = False
+        return True
+
+    def observar_carta(self, carta: Carta):
+        self.conteo_zapato.observar(carta)
+
+    def _reiniciar_zapato(self):
+        """Al barajar: el conteo propio se reinicia acá, el compartido lo reinicia el casino."""
+        if self._zapato_propio:
+            self.conteo_zapato.reiniciar()
@@ -0,0 +1,107 @@
+"""
+Decisiones con presupuesto (anytime) para los agentes Markov.
+
+Sin presupuesto, el agente hace la búsqueda completa de siempre. Con un presupuesto
+de tiempo (ms) o de nodos por decisión, la búsqueda se profundiza de a un nivel:
+la profundidad d limita cuántas cartas más puede pedir el jugador y en las hojas
+cortadas se usa como valor heurístico el EV de plantarse. Cada pasada terminada
+deja una acción; cuando el presupuesto se agota se juega la de la última pasada
+completa, y si ni la primera llegó a terminar, la estrategia básica.
+
+Los valores de estados cuya búsqueda no tuvo cortes son exactos y van al memo de
+siempre; los truncados se guardan aparte por (estado, profundidad restante) y solo
+durante la decisión, así no contaminan el caché del zapato.
+"""
+
+import time
+from .estrategia_basica import accion_basica
+
+
+class PresupuestoAgotado(Exception):
+    """Se lanza desde un nodo de la búsqueda cuando se agota el presupuesto de la decisión."""
+
+
+class DecisionAnytime:
+    """
+    Mixin para agentes Markov que ya usan TelemetriaMarkov (comparte nodos_decision).
+    La subclase implementa _elegir_accion(mano, carta_dealer, profundidad), llama a
+    _visitar_nodo() en cada nodo de sus recursiones y usa _valor_cortado /
+    _buscar_parcial / _guardar_valor en _get_valor_estado.
+    """
+    MEMOS_CHECKPOINT = ('_memo_parcial',)
+
+    def configurar_presupuesto(self, presupuesto_ms: float = None, presupuesto_nodos: int = None):
+        """
+        :param presupuesto_ms: tiempo máximo por decisión en milisegundos (None = sin límite).
+        :param presupuesto_nodos: nodos de búsqueda máximos por decisión (None = sin límite).
+        """
+        self.presupuesto_ms = presupuesto_ms
+        self.presupuesto_nodos = presupuesto_nodos
+        self._limite_tiempo = None
+        self._limite_nodos = None
+        self._cortes = 0
+        self._memo_parcial = {}
+        self.decisiones_respaldo = 0
+        self.profundidad_ultima_decision = None
+        # Política cuando no termina ninguna pasada; se puede cambiar por la tabla generada
+        # para el zapato del agente: agente.estrategia_respaldo = tabla_estrategia(8).accion
+        self.estrategia_respaldo = accion_basica
+
+    def _visitar_nodo(self):
+        self.nodos_decision += 1
+        if self._limite_nodos is not None and self.nodos_decision > self._limite_nodos:
+            raise PresupuestoAgotado()
+        if self._limite_tiempo is not None and time.perf_counter() > self._limite_tiempo:
+            raise PresupuestoAgotado()
+
+    def _valor_cortado(self, valor_hoja: float) -> float:
+        """Hoja heurística: marca que la pasada actual no es exacta."""
+        self._cortes += 1
+        return valor_hoja
+
+    def _buscar_parcial(self, estado_key: tuple, profundidad: int):
+        """Valor truncado ya calculado en esta decisión para el estado, o None."""
+        if profundidad is None:
+            return None
+        valor = self._memo_parcial.get((estado_key, profundidad))
+        if valor is not None:
+            self._cortes += 1  # el valor guardado también es truncado
+        return valor
+
+    def _guardar_valor(self, memo: dict, estado_key: tuple, profundidad: int, cortes_antes: int, valor: float):
+        """Guarda en el memo del zapato si el subárbol fue exacto, si no en el memo parcial."""
+        if self._cortes == cortes_antes:
+            memo[estado_key] = valor
+        else:
+            self._memo_parcial[(estado_key, profundidad)] = valor
+
+    def _decidir_anytime(self, mano, carta_dealer):
+        if self.presupuesto_ms is None and self.presupuesto_nodos is None:
+            return self._elegir_accion(mano, carta_dealer)
+
+        if self.presupuesto_ms is not None:
+            self._limite_tiempo = time.perf_counter() + self.presupuesto_ms / 1000.0
+        if self.presupuesto_nodos is not None:
+            self._limite_nodos = self.nodos_decision + self.presupuesto_nodos
+        self._memo_parcial.clear()
+
+        mejor, profundidad = None, 1
+        self.profundidad_ultima_decision = 0
+        try:
+            while True:
+                cortes_antes = self._cortes
+                mejor = self._elegir_accion(mano, carta_dealer, profundidad)
+                self.profundidad_ultima_decision = profundidad
+                if self._cortes == cortes_antes:
+                    break  # la pasada no cortó ninguna hoja: búsqueda completa
+                profundidad += 1
+        except PresupuestoAgotado:
+            pass
+        finally:
+            self._limite_tiempo = None
+            self._limite_nodos = None
+
+        if mejor is None:
+            self.decisiones_respaldo += 1
+            return self.estrategia_respaldo(mano, carta_dealer)
+        return mejor
@@ -0,0 +1,98 @@
+"""
+Distribución final del dealer como cadena de Markov absorbente.
+
+Con un vector de probabilidades fijo (agentes por umbral e híbrido) la mano del
+dealer es una cadena sobre estados (total, blanda): los transitorios son las duras
+de 2 a 16 y las blandas de 11 a 16, y los absorbentes son plantarse con 17..21 o
+pasarse. Con Q (transitorio -> transitorio) y R (transitorio -> absorbente) armadas
+a partir del vector, B = (I - Q)^-1 R da la probabilidad de terminar en cada total
+desde cada estado, y la fila de la carta visible de cada una de las 10 cartas del
+dealer sale de un solo producto de matrices. La cadena se resuelve una vez por
+vector de probabilidades; cada consulta del dealer es leer una fila.
+
+El dealer se planta con 17 o más, también con 17 blando, como en la recursión que
+reemplaza. La blandura es la real (ver agents/dp_jugador.py).
+"""
+
+import numpy as np
+from .dp_jugador import TOTAL_MAXIMO, VALORES_POR_INDICE, siguiente_estado
+
+PLANTARSE_DEALER = 17
+PASARSE = TOTAL_MAXIMO + 1  # columna de pasarse en la distribución final
+ESTADOS_TRANSITORIOS = ([(total, False) for total in range(2, PLANTARSE_DEALER)] +
+                        [(total, True) for total in range(11, PLANTARSE_DEALER)])
+_INDICE_ESTADO = {estado: i for i, estado in enumerate(ESTADOS_TRANSITORIOS)}
+FINALES = tuple(range(PLANTARSE_DEALER, TOTAL_MAXIMO + 1)) + (PASARSE,)
+
+
+def _tabla_transiciones() -> np.ndarray:
+    """
+    (carta, estado transitorio, destino): 1 si la carta lleva del estado al destino.
+    Los destinos son los transitorios seguidos de los finales, así Q y R de un vector
+    de probabilidades salen de un solo producto.
+    """
+    n = len(ESTADOS_TRANSITORIOS)
+    tabla = np.zeros((len(VALORES_POR_INDICE), n, n + len(FINALES)))
+    for i, (total, blanda) in enumerate(ESTADOS_TRANSITORIOS):
+        for j, valor_carta in enumerate(VALORES_POR_INDICE):
+            nuevo_total, nueva_blanda = siguiente_estado(total, blanda, valor_carta)
+            if nuevo_total > TOTAL_MAXIMO:
+                tabla[j, i, -1] = 1.0
+            elif nuevo_total >= PLANTARSE_DEALER:
+                tabla[j, i, n + nuevo_total - PLANTARSE_DEALER] = 1.0
+            else:
+                tabla[j, i, _INDICE_ESTADO[(nuevo_total, nueva_blanda)]] = 1.0
+    return tabla
+
+
+_TRANSICIONES = _tabla_transiciones()
+
+
+def estado_carta_visible(valor_carta: int) -> tuple:
+    """Estado del dealer con una sola carta (As = 11 blando)."""
+    return valor_carta, valor_carta == 11
+
+
+_FILAS_VISIBLES = [_INDICE_ESTADO[estado_carta_visible(valor)] for valor in VALORES_POR_INDICE]
+
+
+def distribucion_final(prob_dist, visitar_nodo=None) -> np.ndarray:
+    """
+    Distribución del total final del dealer para las 10 cartas visibles.
+
+    :param prob_dist: probabilidad de cada carta por índice (0 = As, 9 = 10).
+    :param visitar_nodo: se llama una vez por estado transitorio (contadores y presupuestos).
+    :return: matriz (10, 23): fila = carta visible por índice, columna = total final
+             (17..21, o 22 = pasarse).
+    """
+    prob_dist = np.asarray(prob_dist, dtype=float)
+    dist = np.zeros((len(VALORES_POR_INDICE), PASARSE + 1))
+    if prob_dist.sum() == 0:
+        # Sin cartas el dealer se queda con la carta visible (como en la recursión)
+        for j, valor in enumerate(VALORES_POR_INDICE):
+            dist[j, valor] = 1.0
+        return dist
+
+    n = len(ESTADOS_TRANSITORIOS)
+    if visitar_nodo is not None:
+        for _ in range(n):
+            visitar_nodo()
+    transiciones = np.tensordot(prob_dist, _TRANSICIONES, axes=1)
+    q, r = transiciones[:, :n], transiciones[:, n:]
+
+    absorcion = np.linalg.solve(np.eye(n) - q, r)
+    dist[:, FINALES] = absorcion[_FILAS_VISIBLES]
+    return dist
+
+
+def probabilidades_resultado(dist: np.ndarray) -> tuple:
+    """
+    (victoria, derrota, empate) de plantarse, cada una de forma (22, 10):
+    fila = total del jugador (hasta 21), columna = carta visible por índice.
+    """
+    dist_total = dist[:, :PASARSE].T  # (22, 10): probabilidad de que el dealer termine en cada total
+    menores = np.cumsum(dist_total, axis=0) - dist_total
+    victoria = dist[:, PASARSE] + menores
+    empate = dist_total
+    derrota = dist_total.sum(axis=0) - menores - empate
+    return victoria, derrota, empate
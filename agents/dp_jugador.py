@@ -0,0 +1,109 @@
+"""
+Valores de las manos del jugador por programación dinámica, de abajo hacia arriba.
+
+Con un vector de probabilidades fijo (agentes por umbral e híbrido) el valor de una
+mano solo depende de su total, de si es blanda y de la carta del dealer, así que
+en lugar de recorrer el árbol con Mano y recursión se llena la tabla completa en
+una pasada. Cada estado depende solo de estados ya resueltos si se recorren:
+
+    duras 21..11  ->  blandas 21..11  ->  duras 10..2
+
+(una dura de 11 o más solo pasa a duras mayores; una blanda pasa a blandas mayores
+o a duras de 12 o más; una dura de 10 o menos puede pasar a blanda con un As). Cada
+estado es un producto del vector de probabilidades por las filas de los estados
+siguientes, para las 10 cartas del dealer a la vez.
+
+Blanda quiere decir que un As cuenta 11 (Mano.es_blanda es False con dos ases
+aunque uno siga valiendo 11; acá se usa la blandura real).
+"""
+
+import numpy as np
+from core.cartas import Rango
+from core.composicion import indice_carta
+
+TOTAL_MAXIMO = 21
+VALORES_POR_INDICE = (11, 2, 3, 4, 5, 6, 7, 8, 9, 10)
+ORDEN_ESTADOS = ([(total, False) for total in range(21, 10, -1)] +
+                 [(total, True) for total in range(21, 10, -1)] +
+                 [(total, False) for total in range(10, 1, -1)])
+
+
+def estado_mano(mano) -> tuple:
+    """(total, blanda) de una mano, con la blandura real (algún As vale 11)."""
+    total = mano.valor_total
+    total_con_ases_en_11 = sum(carta.valor for carta in mano.cartas)
+    ases = sum(1 for carta in mano.cartas if carta.rango == Rango.AS)
+    return total, ases > (total_con_ases_en_11 - total) // 10
+
+
+def siguiente_estado(total: int, blanda: bool, valor_carta: int) -> tuple:
+    """Estado después de recibir una carta (As = 11). Un total mayor a 21 es pasarse."""
+    if valor_carta == 11:
+        if total + 11 <= TOTAL_MAXIMO:
+            return total + 11, True
+        return total + 1, blanda
+    nuevo = total + valor_carta
+    if nuevo > TOTAL_MAXIMO and blanda:
+        return nuevo - 10, False
+    return nuevo, blanda
+
+
+class TablaValores:
+    """
+    Tablas [blanda][total][carta del dealer] para un vector de probabilidades.
+    valor: EV óptimo entre plantarse y pedir; pedir: EV de pedir y seguir óptimo;
+    doblar: EV de recibir una sola carta y plantarse (sin multiplicar por 2).
+    La carta del dealer va por índice (0 = As, 9 = 10).
+    """
+
+    __slots__ = ("plantarse", "valor", "pedir", "doblar")
+
+    def __init__(self, plantarse: np.ndarray, num_dealer: int):
+        self.plantarse = plantarse
+        self.valor = np.zeros((2, TOTAL_MAXIMO + 1, num_dealer))
+        self.pedir = np.zeros((2, TOTAL_MAXIMO + 1, num_dealer))
+        self.doblar = np.zeros((2, TOTAL_MAXIMO + 1, num_dealer))
+
+    def ev(self, tabla: np.ndarray, total: int, blanda: bool, carta_dealer) -> float:
+        return float(tabla[int(blanda), total, indice_carta(carta_dealer.valor)])
+
+
+def resolver_tabla(prob_dist, plantarse: np.ndarray, valor_pasarse: float, visitar_nodo=None) -> TablaValores:
+    """
+    Llena la tabla de valores del jugador en una pasada.
+
+    :param prob_dist: probabilidad de cada carta por índice (0 = As, 9 = 10).
+    :param plantarse: EV de plantarse, forma (22, cartas del dealer), por total.
+    :param valor_pasarse: valor de pasarse de 21.
+    :param visitar_nodo: se llama una vez por estado (contadores y presupuestos de los agentes).
+    """
+    prob_dist = np.asarray(prob_dist, dtype=float)
+    num_dealer = plantarse.shape[1]
+    tabla = TablaValores(plantarse, num_dealer)
+    pasado = np.full(num_dealer, valor_pasarse)
+    sin_cartas = prob_dist.sum() == 0
+
+    for total, blanda in ORDEN_ESTADOS:
+        if visitar_nodo is not None:
+            visitar_nodo()
+        fila_plantarse = plantarse[total]
+        if sin_cartas:
+            # Sin cartas para pedir, pedir vale lo mismo que plantarse (como en la búsqueda)
+            pedir, doblar = fila_plantarse, fila_plantarse
+        else:
+            valores_siguientes = np.empty((len(VALORES_POR_INDICE), num_dealer))
+            plantarse_siguientes = np.empty((len(VALORES_POR_INDICE), num_dealer))
+            for i, valor_carta in enumerate(VALORES_POR_INDICE):
+                nuevo_total, nueva_blanda = siguiente_estado(total, blanda, valor_carta)
+                if nuevo_total > TOTAL_MAXIMO:
+                    valores_siguientes[i] = pasado
+                    plantarse_siguientes[i] = pasado
+                else:
+                    valores_siguientes[i] = tabla.valor[int(nueva_blanda), nuevo_total]
+                    plantarse_siguientes[i] = plantarse[nuevo_total]
+            pedir = prob_dist @ valores_siguientes
+            doblar = prob_dist @ plantarse_siguientes
+        tabla.pedir[int(blanda), total] = pedir
+        tabla.doblar[int(blanda), total] = doblar
+        tabla.valor[int(blanda), total] = np.maximum(fila_plantarse, pedir)
+    return tabla
@@ -0,0 +1,125 @@
+"""
+Estrategia básica precalculada (zapato de 4 a 8 mazos, el dealer se planta en todos
+los 17, doblar después de dividir y rendición).
+
+Es el piso de los agentes Markov con presupuesto de decisión: si el presupuesto se
+agota antes de terminar la primera pasada de la búsqueda, se juega esta tabla.
+
+Cada fila va contra la carta visible del dealer 2, 3, ..., 10, As. Códigos:
+    H: pedir    S: plantarse    P: dividir
+    D: doblar (con más de dos cartas, pedir)
+    d: doblar (con más de dos cartas, plantarse)
+    R: rendirse (con más de dos cartas, pedir)
+    r: rendirse (con más de dos cartas, plantarse)
+"""
+
+from core.acciones import Accion
+from core.player import Mano
+from core.cartas import Carta
+
+CARTAS_DEALER = (2, 3, 4, 5, 6, 7, 8, 9, 10, 11)
+
+DURAS = {
+    8:  "HHHHHHHHHH",
+    9:  "HDDDDHHHHH",
+    10: "DDDDDDDDHH",
+    11: "DDDDDDDDDH",
+    12: "HHSSSHHHHH",
+    13: "SSSSSHHHHH",
+    14: "SSSSSHHHHH",
+    15: "SSSSSHHHRH",
+    16: "SSSSSHHRRR",
+    17: "SSSSSSSSSS",
+}
+
+BLANDAS = {
+    13: "HHHDDHHHHH",
+    14: "HHHDDHHHHH",
+    15: "HHDDDHHHHH",
+    16: "HHDDDHHHHH",
+    17: "HDDDDHHHHH",
+    18: "SddddSSHHH",
+    19: "SSSSSSSSSS",
+}
+
+# Por valor de la carta repetida; los pares que no se dividen siguen como total duro
+PARES = {
+    2:  "PPPPPPHHHH",
+    3:  "PPPPPPHHHH",
+    4:  "HHHPPHHHHH",
+    6:  "PPPPPHHHHH",
+    7:  "PPPPPPHHHH",
+    8:  "PPPPPPPPPP",
+    9:  "PPPPPSPPSS",
+    11: "PPPPPPPPPP",
+}
+
+
+def _codigo(tabla: dict, total: int, carta_dealer: int) -> str:
+    """Busca el total en la tabla; los totales fuera de rango usan la fila más cercana."""
+    total = min(max(total, min(tabla)), max(tabla))
+    return tabla[total][CARTAS_DEALER.index(carta_dealer)]
+
+
+class TablaEstrategia:
+    """
+    Tablas de duras, blandas y pares con los códigos de arriba. La fija de este módulo
+    es TABLA_FIJA; las generadas por número de mazos están en agents/tablas_estrategia.py.
+    """
+
+    def __init__(self, duras: dict, blandas: dict, pares: dict):
+        self.duras = duras
+        self.blandas = blandas
+        self.pares = pares
+
+    def codigo_par(self, valor_carta: int, carta_dealer: int) -> str:
+        if valor_carta not in self.pares:
+            return "H"
+        return self.pares[valor_carta][CARTAS_DEALER.index(carta_dealer)]
+
+    def pide_carta(self, total: int, blanda: bool, carta_dealer: int) -> bool:
+        """Si pide con una mano de más de dos cartas (doblar y rendirse pasan a pedir o plantarse)."""
+        codigo = _codigo(self.blandas if blanda else self.duras, total, carta_dealer)
+        return codigo in ("H", "D", "R")
+
+    def accion(self, mano: Mano, carta_dealer: Carta) -> Accion:
+        """Acción de la tabla para la mano contra la carta visible del dealer."""
+        dealer = carta_dealer.valor
+        dos_cartas = len(mano.cartas) == 2
+
+        if mano.es_divisible and self.codigo_par(mano.cartas[0].valor, dealer) == "P":
+            return Accion.DIVIDIR
+
+        if mano.es_blanda:
+            codigo = _codigo(self.blandas, mano.valor_total, dealer)
+        else:
+            codigo = _codigo(self.duras, mano.valor_total, dealer)
+
+        if codigo == "S":
+            return Accion.PLANTARSE
+        if codigo == "D":
+            return Accion.DOBLAR if dos_cartas else Accion.PEDIR
+        if codigo == "d":
+            return Accion.DOBLAR if dos_cartas else Accion.PLANTARSE
+        if codigo == "R":
+            return Accion.RENDIRSE if dos_cartas else Accion.PEDIR
+        if codigo == "r":
+            return Accion.RENDIRSE if dos_cartas else Accion.PLANTARSE
+        return Accion.PEDIR
+
+
+TABLA_FIJA = TablaEstrategia(DURAS, BLANDAS, PARES)
+
+
+def _codigo_par(valor_carta: int, carta_dealer: int) -> str:
+    return TABLA_FIJA.codigo_par(valor_carta, carta_dealer)
+
+
+def pide_carta(total: int, blanda: bool, carta_dealer: int) -> bool:
+    """Si la estrategia básica pide con una mano de más de dos cartas (doblar y rendirse pasan a pedir)."""
+    return TABLA_FIJA.pide_carta(total, blanda, carta_dealer)
+
+
+def accion_basica(mano: Mano, carta_dealer: Carta) -> Accion:
+    """Acción de la estrategia básica para la mano contra la carta visible del dealer."""
+    return TABLA_FIJA.accion(mano, carta_dealer)
@@ -0,0 +1,210 @@
+"""
+Evaluación exhaustiva de una política fija: EV por mano inicial y ventaja de la
+casa con las reglas de Casino, sin simular rondas.
+
+Una política fija es cualquier función (mano, carta_dealer) -> Accion que no
+cambia durante la evaluación: accion_basica, un AgenteHiLo con el conteo congelado
+(su decidir_accion solo lee el conteo) o una tabla compilada. Se recorren todos los
+repartos iniciales (carta del jugador, carta visible, carta del jugador) con las
+probabilidades exactas del zapato, y cada mano se juega con la política pidiendo
+cartas de la composición que queda, quitando las que ya salieron.
+
+    evaluador = EvaluadorPolitica(accion_basica, num_mazos=6)
+    resultado = evaluador.evaluar()
+    resultado.ventaja_casa, resultado.ev(10, 6, 10)   # 10 y 6 contra un 10 (= ev_por_mano[(6, 10, 10)])
+
+Reglas de Casino que se reproducen:
+- Sin mirar la carta oculta: el blackjack del dealer es un 21 más. El blackjack
+  del jugador (dos cartas que suman 21, también después de dividir) paga 3:2
+  salvo que el dealer termine con 21, y entonces empata.
+- El dealer pide con menos de 17 y se planta con 17 blando.
+- Doblar, dividir y rendirse solo con dos cartas (dividir, con dos cartas del
+  mismo valor); si no, la acción vale como plantarse. Se puede doblar y rendirse
+  después de dividir y volver a dividir sin límite.
+- Rendirse pierde media apuesta; pasarse pierde aunque el dealer también se pase.
+
+Aproximaciones: el dealer saca sus cartas con la composición que dejó la mano del
+jugador (la cadena de agents/dp_dealer.py, sin quitar las propias), y cada mano
+dividida se juega con la composición sin la otra (dos veces el EV de una mano
+con la carta dividida). Con un zapato completo la diferencia con la simulación
+está muy por debajo del ruido de cualquier comparación por rondas. Las decisiones
+de la política se guardan por cartas y carta visible, sin importar el orden.
+"""
+
+from core.acciones import Accion
+from core.cartas import Carta, Palo, Rango
+from core.composicion import Composicion
+from core.player import Mano
+from .dp_jugador import TOTAL_MAXIMO, VALORES_POR_INDICE, siguiente_estado
+from .dp_dealer import distribucion_final, probabilidades_resultado
+
+PAGO_BLACKJACK = 1.5
+PAGO_RENDIRSE = -0.5
+RANGOS_POR_INDICE = tuple(Rango.from_valor(valor) for valor in VALORES_POR_INDICE)
+
+
+def _estado(cartas: tuple) -> tuple:
+    """(total, blanda) de una mano dada por índices de carta."""
+    total, blanda = 0, False
+    for indice in cartas:
+        total, blanda = siguiente_estado(total, blanda, VALORES_POR_INDICE[indice])
+    return total, blanda
+
+
+def _quitar(conteos: tuple, indice: int) -> tuple:
+    return conteos[:indice] + (conteos[indice] - 1,) + conteos[indice + 1:]
+
+
+class ResultadoEvaluacion:
+    """
+    ev_por_mano: EV (en apuestas iniciales) por (valor carta 1, valor carta 2, valor visible),
+    con las cartas del jugador ordenadas y el As como 11. prob_por_mano: probabilidad de
+    cada reparto. ev_total: EV esperado por ronda; ventaja_casa = -ev_total.
+    """
+
+    def __init__(self, ev_por_mano: dict, prob_por_mano: dict):
+        self.ev_por_mano = ev_por_mano
+        self.prob_por_mano = prob_por_mano
+        self.ev_total = sum(prob_por_mano[clave] * ev for clave, ev in ev_por_mano.items())
+
+    @property
+    def ventaja_casa(self) -> float:
+        return -self.ev_total
+
+    def ev(self, carta_1: int, carta_2: int, visible: int) -> float:
+        """EV de la mano inicial, con las cartas del jugador en cualquier orden (As = 11)."""
+        return self.ev_por_mano[(min(carta_1, carta_2), max(carta_1, carta_2), visible)]
+
+    def ev_por_carta_dealer(self) -> dict:
+        """EV condicionado a cada carta visible del dealer."""
+        suma, masa = {}, {}
+        for clave, ev in self.ev_por_mano.items():
+            visible, prob = clave[2], self.prob_por_mano[clave]
+            suma[visible] = suma.get(visible, 0.0) + prob * ev
+            masa[visible] = masa.get(visible, 0.0) + prob
+        return {visible: suma[visible] / masa[visible] for visible in suma}
+
+
+class EvaluadorPolitica:
+    """
+    Juega una política fija sobre todos los repartos de un zapato, con memo por composición.
+    Los memos de manos y del dealer son de la carta visible en curso.
+    """
+
+    def __init__(self, politica, num_mazos: int = 4, conteos=None):
+        """
+        :param politica: función (mano, carta_dealer) -> Accion, o un agente con decidir_accion.
+        :param num_mazos: mazos del zapato completo (se ignora si se pasan conteos).
+        :param conteos: cartas restantes por índice (0 = As, 9 = 10) para evaluar un zapato empezado.
+        """
+        self.politica = getattr(politica, "decidir_accion", politica)
+        if conteos is None:
+            conteos = Composicion.zapato(num_mazos).conteos
+        self.conteos = tuple(int(c) for c in conteos)
+        self._memo_mano = {}
+        self._memo_accion = {}
+        self._memo_dealer = {}
+
+    def evaluar(self) -> ResultadoEvaluacion:
+        """
+        Recorre los repartos iniciales (en Casino: jugador, visible, jugador) carta visible
+        por carta visible; los memos de manos y del dealer se vacían entre una y otra.
+        """
+        ev_por_mano, prob_por_mano = {}, {}
+        conteos, total = self.conteos, sum(self.conteos)
+        for visible, n_visible in enumerate(conteos):
+            if not n_visible:
+                continue
+            sin_visible = _quitar(conteos, visible)
+            for primera, n_primera in enumerate(sin_visible):
+                if not n_primera:
+                    continue
+                sin_primera = _quitar(sin_visible, primera)
+                for segunda, n_segunda in enumerate(sin_primera):
+                    if not n_segunda:
+                        continue
+                    prob = n_visible * n_primera * n_segunda / (total * (total - 1) * (total - 2))
+                    valores = sorted((VALORES_POR_INDICE[primera], VALORES_POR_INDICE[segunda]))
+                    clave = (valores[0], valores[1], VALORES_POR_INDICE[visible])
+                    if clave not in ev_por_mano:
+                        ev_por_mano[clave] = self._ev_mano((primera, segunda), visible,
+                                                           _quitar(sin_primera, segunda))
+                    prob_por_mano[clave] = prob_por_mano.get(clave, 0.0) + prob
+            self._memo_mano.clear()
+            self._memo_dealer.clear()
+        return ResultadoEvaluacion(ev_por_mano, prob_por_mano)
+
+    def _accion(self, cartas: tuple, visible: int) -> Accion:
+        clave = (tuple(sorted(cartas)), visible)
+        accion = self._memo_accion.get(clave)
+        if accion is None:
+            mano = Mano([Carta(Palo.PICAS, RANGOS_POR_INDICE[i]) for i in cartas])
+            accion = self.politica(mano, Carta(Palo.CORAZONES, RANGOS_POR_INDICE[visible]))
+            self._memo_accion[clave] = accion
+        return accion
+
+    def _plantarse_dealer(self, conteos: tuple, visible: int) -> tuple:
+        """
+        EV de plantarse por total y probabilidad de que el dealer termine con 21,
+        con el dealer sacando de esta composición.
+        """
+        resultado = self._memo_dealer.get(conteos)
+        if resultado is None:
+            total = sum(conteos)
+            dist = distribucion_final([c / total for c in conteos] if total else [0.0] * len(conteos))
+            victoria, derrota, _ = probabilidades_resultado(dist)
+            resultado = ((victoria[:, visible] - derrota[:, visible]).tolist(), float(dist[visible, TOTAL_MAXIMO]))
+            self._memo_dealer[conteos] = resultado
+        return resultado
+
+    def _ev_plantarse(self, total: int, blackjack: bool, visible: int, conteos: tuple) -> float:
+        plantarse, veintiuno = self._plantarse_dealer(conteos, visible)
+        if blackjack:
+            return PAGO_BLACKJACK * (1.0 - veintiuno)
+        return plantarse[total]
+
+    def _ev_mano(self, cartas: tuple, visible: int, conteos: tuple) -> float:
+        """EV de jugar la mano con la política; conteos ya no tiene las cartas repartidas."""
+        clave = (conteos, tuple(sorted(cartas)), visible)
+        ev = self._memo_mano.get(clave)
+        if ev is None:
+            ev = self._jugar(cartas, visible, conteos)
+            self._memo_mano[clave] = ev
+        return ev
+
+    def _jugar(self, cartas: tuple, visible: int, conteos: tuple) -> float:
+        total, blanda = _estado(cartas)
+        dos_cartas = len(cartas) == 2
+        accion = self._accion(cartas, visible)
+        restantes = sum(conteos)
+        if accion in (Accion.DOBLAR, Accion.RENDIRSE) and not dos_cartas:
+            accion = Accion.PLANTARSE
+        if accion == Accion.DIVIDIR and not (dos_cartas and VALORES_POR_INDICE[cartas[0]] == VALORES_POR_INDICE[cartas[1]]):
+            accion = Accion.PLANTARSE
+        if accion != Accion.RENDIRSE and accion != Accion.PLANTARSE and not restantes:
+            accion = Accion.PLANTARSE  # sin cartas para repartir
+
+        if accion == Accion.RENDIRSE:
+            return PAGO_RENDIRSE
+        if accion == Accion.PLANTARSE:
+            return self._ev_plantarse(total, dos_cartas and total == TOTAL_MAXIMO, visible, conteos)
+
+        ev = 0.0
+        for indice, n in enumerate(conteos):
+            if not n:
+                continue
+            prob = n / restantes
+            sin_carta = _quitar(conteos, indice)
+            if accion == Accion.DIVIDIR:
+                # Casino reparte una carta a cada mitad; las dos mitades valen lo mismo
+                ev += prob * 2 * self._ev_mano((cartas[0], indice), visible, sin_carta)
+                continue
+            nuevo_total = siguiente_estado(total, blanda, VALORES_POR_INDICE[indice])[0]
+            if accion == Accion.DOBLAR:
+                ev += prob * (-2.0 if nuevo_total > TOTAL_MAXIMO
+                              else 2 * self._ev_plantarse(nuevo_total, False, visible, sin_carta))
+            elif nuevo_total > TOTAL_MAXIMO:
+                ev -= prob
+            else:
+                ev += prob * self._ev_mano(cartas + (indice,), visible, sin_carta)
+        return ev
@@ -1,4 +1,9 @@
-from .agente_base import Agente
+from .agente_base import Agente, ConZapatoCompartido
+from .telemetria_cache import TelemetriaMarkov, contar_nodos
+from .decision_anytime import DecisionAnytime
+from .prefetch_zapato import PrefetchZapato, turno_busqueda
+from .poda_probabilidad import PodaProbabilidad
+from .motor_montecarlo import SeleccionMotorEV
 from core.acciones import Accion
 from core.player import Jugador, Mano
 from core.cartas import Carta, Rango, Palo
@@ -86,35 +91,44 @@ Cálculo de Probabilidades:
 Las probabilidades se calculan usando las cartas restantes en el mazo y simulando
 el comportamiento determinista del dealer (pedir hasta 17+).
 """
-class AgenteMarkov_arriesgado(Agente):
+class AgenteMarkov_arriesgado(DecisionAnytime, PodaProbabilidad, TelemetriaMarkov, ConZapatoCompartido, Agente):
     """
     Agente MDP con una arquitectura de caché y AGRUPACIÓN DE ESTADOS.
     *** VERSIÓN EXPERIMENTAL CON RECOMPENSAS MODIFICADAS ***
     - Victoria: +2
     - Empate: -1
     - Derrota: -2
+
+    Con umbral_poda poda el árbol del dealer como AgenteMarkov_normal; las cotas de
+    error van al doble por la escala de las recompensas (ver agents/poda_probabilidad.py).
     """
-    def __init__(self, jugador: Jugador, num_mazos: int = 4, precision_agrupacion: int = 20):
+    MEMOS = ('memo_valor_estado', 'memo_outcome_prob', 'memo_dealer_dist')
+    ESCALA_RECOMPENSA = 2.0
+
+    def __init__(self, jugador: Jugador, num_mazos: int = 4, precision_agrupacion: int = 20,
+                 umbral_poda: float = None):
         super().__init__(jugador)
         self.num_mazos = num_mazos
         self.precision_agrupacion = precision_agrupacion
+        # Sin presupuesto: DecisionAnytime solo hace la búsqueda completa que verifica la poda
+        self.configurar_presupuesto()
+        self.configurar_poda(umbral_poda)
+        self._iniciar_zapato(num_mazos)
         self.resetear_conteo()
 
-    # ... (funciones _get_idx, observar_carta, resetear_conteo, decidir_apuesta sin cambios) ...
+    # ... (funciones _get_idx, resetear_conteo, decidir_apuesta sin cambios; observar_carta viene de ConZapatoCompartido) ...
     def _get_idx(self, valor_carta: int) -> int:
         if valor_carta == 11: return 0
         return valor_carta - 1 if valor_carta < 10 else 9
 
-    def observar_carta(self, carta: Carta):
-        idx = self._get_idx(carta.valor)
-        if self.cartas_restantes[idx] > 0:
-            self.cartas_restantes[idx] -= 1
+    @property
+    def cartas_restantes(self) -> np.ndarray:
+        """Cartas restantes por índice, leídas del conteo del zapato (propio o el del casino)."""
+        return np.array(self.conteo_zapato.conteos)
 
     def resetear_conteo(self):
-        self.cartas_restantes = np.array([4 * self.num_mazos] * 9 + [16 * self.num_mazos])
-        self.memo_valor_estado = {}
-        self.memo_outcome_prob = {}
-        self.memo_dealer_dist = {}
+        self._reiniciar_zapato()
+        self._cerrar_zapato()
             
     def decidir_apuesta(self, capital_actual: int = None) -> int:
         return int(5)
@@ -135,7 +149,8 @@ class AgenteMarkov_arriesgado(Agente):
         porc_altas_d = int( (num_altas / total_restantes) * p )
         return (porc_ases_d, porc_bajas_d, porc_medias_d, porc_altas_d)
 
-    def _calcular_dealer_recursivo(self, mano_dealer: Mano, cartas_restantes: np.ndarray) -> dict:
+    def _calcular_dealer_recursivo(self, mano_dealer: Mano, cartas_restantes: np.ndarray, prob_camino: float = 1.0) -> dict:
+        self._visitar_nodo()
         valor_actual = mano_dealer.valor_total
         key_recursiva = (valor_actual, mano_dealer.es_blanda, tuple(cartas_restantes))
         temp_cache = {}
@@ -150,11 +165,14 @@ class AgenteMarkov_arriesgado(Agente):
         for i, count in enumerate(cartas_restantes):
             if count > 0:
                 prob_carta = count / total_cartas
+                if self._podar(prob_camino * prob_carta):
+                    continue
                 valor_carta = 11 if i == 0 else (10 if i == 9 else i + 1)
                 nuevas_cartas_restantes = cartas_restantes.copy()
                 nuevas_cartas_restantes[i] -= 1
                 nueva_carta = Carta(Palo.PICAS, Rango.from_valor(valor_carta))
-                sub_dist = self._calcular_dealer_recursivo(Mano(mano_dealer.cartas + [nueva_carta]), nuevas_cartas_restantes)
+                sub_dist = self._calcular_dealer_recursivo(Mano(mano_dealer.cartas + [nueva_carta]), nuevas_cartas_restantes,
+                                                           prob_camino * prob_carta)
                 for v_final, p_sub in sub_dist.items():
                     dist_prob_final[v_final] = dist_prob_final.get(v_final, 0) + prob_carta * p_sub
         temp_cache[key_recursiva] = dist_prob_final
@@ -167,7 +185,8 @@ class AgenteMarkov_arriesgado(Agente):
         if cache_key in self.memo_dealer_dist:
             return self.memo_dealer_dist[cache_key]
         else:
-            dist_calculada = self._calcular_dealer_recursivo(mano_dealer, cartas_restantes)
+            dist_calculada = self._registrar_dist_dealer(self._calcular_dealer_recursivo(mano_dealer, cartas_restantes),
+                                                        mano_dealer.valor_total)
             self.memo_dealer_dist[cache_key] = dist_calculada
             return dist_calculada
 
@@ -256,6 +275,7 @@ class AgenteMarkov_arriesgado(Agente):
         return ev_mano * 2
 
     def _get_valor_estado(self, mano_jugador: Mano, carta_dealer: Carta, cartas_restantes: np.ndarray) -> float:
+        self._visitar_nodo()
         # ================================================================================= #
         # === CAMBIO: La recompensa por pasarse ahora es -2, en línea con una derrota. === #
         if mano_jugador.valor_total > 21:
@@ -274,10 +294,13 @@ class AgenteMarkov_arriesgado(Agente):
         self.memo_valor_estado[estado_key] = valor_optimo
         return valor_optimo
 
+    @contar_nodos
     def decidir_accion(self, mano: Mano, carta_dealer: Carta) -> Accion:
         if mano.es_blackjack or mano.valor_total > 21:
             return Accion.PLANTARSE
+        return self._decidir_con_poda(mano, carta_dealer)
 
+    def _elegir_accion(self, mano: Mano, carta_dealer: Carta, profundidad: int = None) -> Accion:
         acciones_ev = {}
         acciones_ev[Accion.PLANTARSE] = self._calcular_ev_plantarse(mano.valor_total, carta_dealer, self.cartas_restantes.copy())
         acciones_ev[Accion.PEDIR] = self._calcular_ev_pedir(mano, carta_dealer, self.cartas_restantes.copy())
@@ -288,6 +311,9 @@ class AgenteMarkov_arriesgado(Agente):
                 acciones_ev[Accion.DIVIDIR] = self._calcular_ev_dividir(mano, carta_dealer, self.cartas_restantes.copy())
 
         mejor_ev = max(acciones_ev.values())
+        self._ev_ultima_busqueda = dict(acciones_ev)
+        if len(mano.cartas) == 2:
+            self._ev_ultima_busqueda[Accion.RENDIRSE] = -1.0
         
         # ========================================================================================== #
         # === CAMBIO: El valor de la rendición ahora se compara con -1 en la nueva escala de EV. === #
@@ -299,35 +325,52 @@ class AgenteMarkov_arriesgado(Agente):
     
 
     
-class AgenteMarkov_normal(Agente):
+class AgenteMarkov_normal(PrefetchZapato, DecisionAnytime, SeleccionMotorEV, PodaProbabilidad, TelemetriaMarkov, ConZapatoCompartido, Agente):
     """
     Agente MDP que utiliza una clave de caché AGRUPADA para una eficiencia drásticamente mejorada.
     En lugar de usar el estado exacto del mazo, agrupa las cartas restantes en porcentajes
     discretizados, permitiendo una reutilización masiva de los cálculos.
+
+    Con presupuesto_ms o presupuesto_nodos la decisión es anytime (ver agents/decision_anytime.py).
+    Con prefetch=True cada zapato nuevo precalcula en segundo plano las manos iniciales
+    (ver agents/prefetch_zapato.py).
+    Con umbral_poda el árbol del dealer no expande las ramas menos probables que el
+    umbral y cada decisión informa una cota de su error (ver agents/poda_probabilidad.py).
+    Con motor_ev='montecarlo' o 'auto' los EV se estiman por muestreo cuando la búsqueda
+    exacta sería cara (ver agents/motor_montecarlo.py).
     """
-    def __init__(self, jugador: Jugador, num_mazos: int = 4, precision_agrupacion: int = 20):
+    MEMOS = ('memo_valor_estado', 'memo_outcome_prob', 'memo_dealer_dist')
+
+    def __init__(self, jugador: Jugador, num_mazos: int = 4, precision_agrupacion: int = 20,
+                 presupuesto_ms: float = None, presupuesto_nodos: int = None, prefetch: bool = False,
+                 umbral_poda: float = None, motor_ev: str = 'exacto', costo_maximo_nodos: int = 20000):
         super().__init__(jugador)
         self.num_mazos = num_mazos
         # La precisión define en cuántos "buckets" se divide cada porcentaje. 
         # 10 = buckets de 10%. 20 = buckets de 5%.
         self.precision_agrupacion = precision_agrupacion
+        self.configurar_presupuesto(presupuesto_ms, presupuesto_nodos)
+        self.configurar_prefetch(prefetch, precision_agrupacion)
+        self.configurar_poda(umbral_poda)
+        self.configurar_motor(motor_ev, costo_maximo_nodos)
+        self._iniciar_zapato(num_mazos)
         self.resetear_conteo()
 
     def _get_idx(self, valor_carta: int) -> int:
         if valor_carta == 11: return 0
         return valor_carta - 1 if valor_carta < 10 else 9
 
-    def observar_carta(self, carta: Carta):
-        idx = self._get_idx(carta.valor)
-        if self.cartas_restantes[idx] > 0:
-            self.cartas_restantes[idx] -= 1
+    @property
+    def cartas_restantes(self) -> np.ndarray:
+        """Cartas restantes por índice, leídas del conteo del zapato (propio o el del casino)."""
+        return np.array(self.conteo_zapato.conteos)
 
     def resetear_conteo(self):
         """Resetea todos los cachés y las cartas. Se llama solo al barajar."""
-        self.cartas_restantes = np.array([4 * self.num_mazos] * 9 + [16 * self.num_mazos])
-        self.memo_valor_estado = {}
-        self.memo_outcome_prob = {}
-        self.memo_dealer_dist = {}
+        self._detener_prefetch()
+        self._reiniciar_zapato()
+        self._cerrar_zapato()
+        self._lanzar_prefetch()
             
     def decidir_apuesta(self, capital_actual: int = None) -> int:
         # Por ahora, apuesta fija para centrarnos en la estrategia de juego.
@@ -359,11 +402,16 @@ class AgenteMarkov_normal(Agente):
         
         return (porc_ases_d, porc_bajas_d, porc_medias_d, porc_altas_d)
 
-    def _calcular_dealer_recursivo(self, mano_dealer: Mano, cartas_restantes: np.ndarray) -> dict:
+    def _clave_memo_actual(self) -> tuple:
+        return self._crear_clave_agrupada(self.cartas_restantes)
+
+    def _calcular_dealer_recursivo(self, mano_dealer: Mano, cartas_restantes: np.ndarray, prob_camino: float = 1.0) -> dict:
         """
         La función de cálculo de "fuerza bruta" original. Se llama solo cuando
-        un estado agrupado no se encuentra en el caché.
+        un estado agrupado no se encuentra en el caché. prob_camino es la probabilidad
+        de llegar a esta mano desde la carta visible (para la poda).
         """
+        self._visitar_nodo()
         valor_actual = mano_dealer.valor_total
         
         # Se usa una clave EXACTA para la recursión interna para garantizar la corrección.
@@ -384,13 +432,16 @@ class AgenteMarkov_normal(Agente):
         for i, count in enumerate(cartas_restantes):
             if count > 0:
                 prob_carta = count / total_cartas
+                if self._podar(prob_camino * prob_carta):
+                    continue
                 valor_carta = 11 if i == 0 else (10 if i == 9 else i + 1)
                 
                 nuevas_cartas_restantes = cartas_restantes.copy()
                 nuevas_cartas_restantes[i] -= 1
                 
                 nueva_carta = Carta(Palo.PICAS, Rango.from_valor(valor_carta))
-                sub_dist = self._calcular_dealer_recursivo(Mano(mano_dealer.cartas + [nueva_carta]), nuevas_cartas_restantes)
+                sub_dist = self._calcular_dealer_recursivo(Mano(mano_dealer.cartas + [nueva_carta]), nuevas_cartas_restantes,
+                                                           prob_camino * prob_carta)
                 
                 for v_final, p_sub in sub_dist.items():
                     dist_prob_final[v_final] = dist_prob_final.get(v_final, 0) + prob_carta * p_sub
@@ -411,7 +462,8 @@ class AgenteMarkov_normal(Agente):
         if cache_key in self.memo_dealer_dist:
             return self.memo_dealer_dist[cache_key]
         else:
-            dist_calculada = self._calcular_dealer_recursivo(mano_dealer, cartas_restantes)
+            dist_calculada = self._registrar_dist_dealer(self._calcular_dealer_recursivo(mano_dealer, cartas_restantes),
+                                                        mano_dealer.valor_total)
             self.memo_dealer_dist[cache_key] = dist_calculada
             return dist_calculada
 
@@ -464,7 +516,7 @@ class AgenteMarkov_normal(Agente):
                 ev_total += prob_carta * ev_doblado
         return ev_total
         
-    def _calcular_ev_pedir(self, mano_jugador: Mano, carta_dealer: Carta, cartas_restantes: np.ndarray) -> float:
+    def _calcular_ev_pedir(self, mano_jugador: Mano, carta_dealer: Carta, cartas_restantes: np.ndarray, profundidad: int = None) -> float:
         ev_total = 0.0
         total_cartas = np.sum(cartas_restantes)
         if total_cartas == 0:
@@ -479,18 +531,24 @@ class AgenteMarkov_normal(Agente):
                 nuevas_cartas_restantes[i] -= 1
                 
                 nueva_mano = Mano(mano_jugador.cartas + [Carta(Palo.PICAS, Rango.from_valor(valor_carta))])
-                valor_siguiente_estado = self._get_valor_estado(nueva_mano, carta_dealer, nuevas_cartas_restantes)
+                valor_siguiente_estado = self._get_valor_estado(nueva_mano, carta_dealer, nuevas_cartas_restantes,
+                                                                None if profundidad is None else profundidad - 1)
                 ev_total += prob_carta * valor_siguiente_estado
         
         return ev_total
         
-    def _calcular_ev_dividir(self, mano_jugador: Mano, carta_dealer: Carta, cartas_restantes: np.ndarray) -> float:
+    def _calcular_ev_dividir(self, mano_jugador: Mano, carta_dealer: Carta, cartas_restantes: np.ndarray, profundidad: int = None) -> float:
         carta_dividida_valor = mano_jugador.cartas[0].valor
         mano_dividida = Mano([Carta(Palo.PICAS, Rango.from_valor(carta_dividida_valor))])
-        ev_mano = self._get_valor_estado(mano_dividida, carta_dealer, cartas_restantes.copy())
+        ev_mano = self._get_valor_estado(mano_dividida, carta_dealer, cartas_restantes.copy(), profundidad)
         return ev_mano * 2
 
-    def _get_valor_estado(self, mano_jugador: Mano, carta_dealer: Carta, cartas_restantes: np.ndarray) -> float:
+    def _get_valor_estado(self, mano_jugador: Mano, carta_dealer: Carta, cartas_restantes: np.ndarray, profundidad: int = None) -> float:
+        """
+        Valor óptimo del estado. profundidad = cuántas cartas más puede pedir el jugador
+        en esta pasada (None = sin límite); en 0 la hoja vale el EV de plantarse.
+        """
+        self._visitar_nodo()
         if mano_jugador.valor_total > 21:
             return -1.0
 
@@ -499,28 +557,43 @@ class AgenteMarkov_normal(Agente):
         estado_key = (mano_jugador.valor_total, mano_jugador.es_blanda, len(mano_jugador.cartas), carta_dealer.valor, clave_agrupada)
         if estado_key in self.memo_valor_estado:
             return self.memo_valor_estado[estado_key]
+        valor_parcial = self._buscar_parcial(estado_key, profundidad)
+        if valor_parcial is not None:
+            return valor_parcial
 
         ev_plantarse = self._calcular_ev_plantarse(mano_jugador.valor_total, carta_dealer, cartas_restantes)
-        ev_pedir = self._calcular_ev_pedir(mano_jugador, carta_dealer, cartas_restantes)
+        if profundidad == 0 and mano_jugador.valor_total < 21:
+            return self._valor_cortado(ev_plantarse)
+
+        cortes_antes = self._cortes
+        ev_pedir = self._calcular_ev_pedir(mano_jugador, carta_dealer, cartas_restantes, profundidad)
 
         valor_optimo = max(ev_plantarse, ev_pedir)
-        self.memo_valor_estado[estado_key] = valor_optimo
+        self._guardar_valor(self.memo_valor_estado, estado_key, profundidad, cortes_antes, valor_optimo)
         return valor_optimo
 
+    @turno_busqueda
+    @contar_nodos
     def decidir_accion(self, mano: Mano, carta_dealer: Carta) -> Accion:
         if mano.es_blackjack or mano.valor_total > 21:
             return Accion.PLANTARSE
+        return self._decidir_con_motor(mano, carta_dealer)
 
+    def _elegir_accion(self, mano: Mano, carta_dealer: Carta, profundidad: int = None) -> Accion:
+        cartas_restantes = np.array(self._conteo_busqueda().conteos)
         acciones_ev = {}
-        acciones_ev[Accion.PLANTARSE] = self._calcular_ev_plantarse(mano.valor_total, carta_dealer, self.cartas_restantes.copy())
-        acciones_ev[Accion.PEDIR] = self._calcular_ev_pedir(mano, carta_dealer, self.cartas_restantes.copy())
+        acciones_ev[Accion.PLANTARSE] = self._calcular_ev_plantarse(mano.valor_total, carta_dealer, cartas_restantes.copy())
+        acciones_ev[Accion.PEDIR] = self._calcular_ev_pedir(mano, carta_dealer, cartas_restantes.copy(), profundidad)
         
         if len(mano.cartas) == 2:
-            acciones_ev[Accion.DOBLAR] = self._calcular_ev_doblar(mano, carta_dealer, self.cartas_restantes.copy())
+            acciones_ev[Accion.DOBLAR] = self._calcular_ev_doblar(mano, carta_dealer, cartas_restantes.copy())
             if mano.cartas[0].rango == mano.cartas[1].rango:
-                acciones_ev[Accion.DIVIDIR] = self._calcular_ev_dividir(mano, carta_dealer, self.cartas_restantes.copy())
+                acciones_ev[Accion.DIVIDIR] = self._calcular_ev_dividir(mano, carta_dealer, cartas_restantes.copy(), profundidad)
 
         mejor_ev = max(acciones_ev.values())
+        self._ev_ultima_busqueda = dict(acciones_ev)
+        if len(mano.cartas) == 2:
+            self._ev_ultima_busqueda[Accion.RENDIRSE] = -0.5
         if len(mano.cartas) == 2 and -0.5 > mejor_ev:
             return Accion.RENDIRSE
         
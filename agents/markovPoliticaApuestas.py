@@ -5,11 +5,19 @@ from typing import Tuple, Dict, Deque
 from core.acciones import Accion
 from core.player import Jugador, Mano
 from core.cartas import Carta, Rango, Palo
-from .agente_base import Agente
+from core.composicion import ConteoZapato
+from .agente_base import Agente, ConZapatoCompartido
+from .telemetria_cache import TelemetriaMarkov, contar_nodos
+from .decision_anytime import DecisionAnytime
+from .prefetch_zapato import PrefetchZapato, turno_busqueda
+from .poda_probabilidad import PodaProbabilidad
+from .motor_montecarlo import SeleccionMotorEV
 from policy.policy_gradient_entropy import ApuestaConPolicyGradient
 
 
-class AgenteMarkov_PoliticaApuestas(Agente):
+class AgenteMarkov_PoliticaApuestas(PrefetchZapato, DecisionAnytime, SeleccionMotorEV, PodaProbabilidad, TelemetriaMarkov, ConZapatoCompartido, Agente):
+    MEMOS = ('memo_valor_estado', 'memo_outcome_prob', 'memo_dealer_dist')
+
     def __init__(self, jugador: Jugador, num_mazos: int = 4, config: dict = None):
         super().__init__(jugador)
         self.num_mazos = num_mazos
@@ -23,7 +31,13 @@ class AgenteMarkov_PoliticaApuestas(Agente):
             'decaimiento_entropia': 0.995,
             'rango_apuesta': [0.01, 0.1],
             'min_apuesta': 10,
-            'max_porcentaje_capital': 0.2
+            'max_porcentaje_capital': 0.2,
+            'presupuesto_ms': None,  # tiempo máximo por decisión (ver decision_anytime.py)
+            'presupuesto_nodos': None,
+            'prefetch': False,  # precálculo de las manos iniciales al barajar (ver prefetch_zapato.py)
+            'umbral_poda': None,  # poda del árbol del dealer con cota de error (ver poda_probabilidad.py)
+            'motor_ev': 'exacto',  # 'exacto', 'montecarlo' o 'auto' (ver motor_montecarlo.py)
+            'costo_maximo_nodos': 20000
         }
         if config:
             self.config.update(config)
@@ -54,32 +68,32 @@ class AgenteMarkov_PoliticaApuestas(Agente):
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
 
-        # Inicializar cachés como diccionarios simples
-        self.memo_valor_estado = {}
-        self.memo_outcome_prob = {}
-        self.memo_dealer_dist = {}
+        self.configurar_presupuesto(self.config['presupuesto_ms'], self.config['presupuesto_nodos'])
+        self.configurar_prefetch(self.config['prefetch'], self.config['precision_agrupacion'])
+        self.configurar_poda(self.config['umbral_poda'])
+        self.configurar_motor(self.config['motor_ev'], self.config['costo_maximo_nodos'])
 
+        # Totales del zapato (restantes, por grupo, Hi-Lo) que se actualizan carta a carta
+        self._iniciar_zapato(num_mazos)
         self.resetear_conteo(reset_completo=True)
 
     def _get_idx(self, valor_carta: int) -> int:
         """Mapea valores de carta a índices (As=0, 2-9=1-8, 10/J/Q/K=9)"""
         return 0 if valor_carta == 11 else (valor_carta - 1 if valor_carta < 10 else 9)
 
-    def observar_carta(self, carta: Carta):
-        """Actualiza el conteo de cartas restantes"""
-        idx = self._get_idx(carta.valor)
-        if self.cartas_restantes[idx] > 0:
-            self.cartas_restantes[idx] -= 1
+    @property
+    def cartas_restantes(self) -> np.ndarray:
+        """Cartas restantes por índice, leídas del conteo del zapato (propio o el del casino)."""
+        return np.array(self.conteo_zapato.conteos)
 
     def resetear_conteo(self, reset_completo: bool = True):
         """Resetea todos los cachés y las cartas. Se llama al barajar."""
         # Reset Markov
-        self.cartas_restantes = np.array([4 * self.num_mazos] * 9 + [16 * self.num_mazos])
+        self._detener_prefetch()
+        self._reiniciar_zapato()
 
-        # Limpiar cachés
-        self.memo_valor_estado.clear()
-        self.memo_outcome_prob.clear()
-        self.memo_dealer_dist.clear()
+        # Limpiar cachés (guarda la telemetría del zapato que termina)
+        self._cerrar_zapato()
 
         # Reset Policy Gradient
         self.pg_apuestas.capital_actual = self.jugador.capital
@@ -99,20 +113,18 @@ class AgenteMarkov_PoliticaApuestas(Agente):
 
         self.pg_apuestas.pasos_episodio = 0
         self.logger.info("Conteo y cachés reiniciados")
+        self._lanzar_prefetch()
 
-    def _calcular_conteo_hi_lo(self) -> float:
-        """Calcula el conteo Hi-Lo para ajustar apuestas"""
-        conteo = 0
-        total_cartas = np.sum(self.cartas_restantes)
+    @property
+    def conteo_hi_lo(self) -> float:
+        """Conteo Hi-Lo para ajustar apuestas, en O(1) con los totales por grupo del zapato"""
+        total_cartas = self.conteo_zapato.total
         if total_cartas == 0:
             return 0.0
 
-        # Valores Hi-Lo: As y 10/J/Q/K=-1, 2-6=+1, 7-9=0
-        for i, count in enumerate(self.cartas_restantes):
-            if i == 0 or i == 9:  # Ases y 10/J/Q/K
-                conteo -= count
-            elif 1 <= i <= 5:  # Cartas 2-6
-                conteo += count
+        # Valores Hi-Lo sobre las cartas restantes: As y 10/J/Q/K=-1, 2-6=+1, 7-9=0
+        num_ases, num_bajas, _, num_altas = self.conteo_zapato.grupos
+        conteo = num_bajas - num_ases - num_altas
 
         mazos_restantes = total_cartas / 52.0
         return conteo / max(1, mazos_restantes)
@@ -127,7 +139,7 @@ class AgenteMarkov_PoliticaApuestas(Agente):
         self.pg_apuestas.capital_actual = capital
 
         # Calcular ventaja basada en conteo de cartas
-        conteo = self._calcular_conteo_hi_lo()
+        conteo = self.conteo_hi_lo
         ventaja_estimada = max(0, 0.005 * conteo)
 
         # Obtener porcentaje base de la red neuronal
@@ -190,16 +202,14 @@ class AgenteMarkov_PoliticaApuestas(Agente):
 
 
     # --- Métodos MDP con caché manual ---
-    def _crear_clave_agrupada(self, cartas_restantes: np.ndarray) -> tuple:
+    def _crear_clave_agrupada(self, zapato: ConteoZapato) -> tuple:
         """Crea una clave agrupada para caché basada en porcentajes discretizados"""
-        total_restantes = np.sum(cartas_restantes)
+        total_restantes = zapato.total
         if total_restantes == 0:
             return (0, 0, 0, 0)
 
-        num_ases = cartas_restantes[0]
-        num_bajas = np.sum(cartas_restantes[1:6])  # 2-6
-        num_medias = np.sum(cartas_restantes[6:9])  # 7-9
-        num_altas = cartas_restantes[9]  # 10/J/Q/K
+        # Ases, bajas (2-6), medias (7-9) y altas (10/J/Q/K) ya vienen sumadas
+        num_ases, num_bajas, num_medias, num_altas = zapato.grupos
 
         p = self.config['precision_agrupacion']
         return (
@@ -209,19 +219,22 @@ class AgenteMarkov_PoliticaApuestas(Agente):
             int((num_altas / total_restantes) * p)
         )
 
-    def _calcular_dealer_dist_iterativa(self, mano_inicial: Mano, cartas_restantes: np.ndarray) -> dict:
+    def _clave_memo_actual(self) -> tuple:
+        return self._crear_clave_agrupada(self.conteo_zapato)
+
+    def _calcular_dealer_dist_iterativa(self, mano_inicial: Mano, zapato: ConteoZapato) -> dict:
         """Versión iterativa para evitar problemas de recursión"""
-        stack = [(mano_inicial, cartas_restantes, 1.0)]
+        stack = [(mano_inicial, list(zapato.conteos), zapato.total, 1.0)]
         dist_final = {}
 
         while stack:
-            mano_actual, cartas_actuales, prob_actual = stack.pop()
+            mano_actual, cartas_actuales, total_cartas, prob_actual = stack.pop()
+            self._visitar_nodo()
 
             if mano_actual.valor_total >= 17:
                 dist_final[mano_actual.valor_total] = dist_final.get(mano_actual.valor_total, 0) + prob_actual
                 continue
 
-            total_cartas = np.sum(cartas_actuales)
             if total_cartas == 0:
                 dist_final[mano_actual.valor_total] = dist_final.get(mano_actual.valor_total, 0) + prob_actual
                 continue
@@ -229,39 +242,43 @@ class AgenteMarkov_PoliticaApuestas(Agente):
             for i, count in enumerate(cartas_actuales):
                 if count > 0:
                     valor_carta = 11 if i == 0 else (10 if i == 9 else i + 1)
+                    prob_nueva = prob_actual * (count / total_cartas)
+                    if self._podar(prob_nueva):
+                        continue
                     nuevas_cartas = cartas_actuales.copy()
                     nuevas_cartas[i] -= 1
                     nueva_mano = Mano(mano_actual.cartas + [Carta(Palo.PICAS, Rango.from_valor(valor_carta))])
-                    stack.append((nueva_mano, nuevas_cartas, prob_actual * (count / total_cartas)))
+                    stack.append((nueva_mano, nuevas_cartas, total_cartas - 1, prob_nueva))
 
         return dist_final
 
-    def _simular_dealer(self, mano_dealer: Mano, cartas_restantes: np.ndarray) -> dict:
+    def _simular_dealer(self, mano_dealer: Mano, zapato: ConteoZapato) -> dict:
         """Simula la distribución de probabilidad del dealer usando caché manual"""
-        clave_agrupada = self._crear_clave_agrupada(cartas_restantes)
+        clave_agrupada = self._crear_clave_agrupada(zapato)
         cache_key = (mano_dealer.valor_total, mano_dealer.es_blanda, clave_agrupada)
 
         if cache_key in self.memo_dealer_dist:
             return self.memo_dealer_dist[cache_key]
 
-        dist_calculada = self._calcular_dealer_dist_iterativa(mano_dealer, cartas_restantes)
+        dist_calculada = self._registrar_dist_dealer(self._calcular_dealer_dist_iterativa(mano_dealer, zapato),
+                                                    mano_dealer.valor_total)
         self.memo_dealer_dist[cache_key] = dist_calculada
         return dist_calculada
 
     def _get_outcome_probabilities(self, valor_jugador: int, carta_dealer: Carta,
-                                   cartas_restantes: np.ndarray) -> tuple:
+                                   zapato: ConteoZapato) -> tuple:
         """Calcula probabilidades de resultado (ganar, perder, empatar) con caché manual"""
         # Casos especiales primero
         if valor_jugador > 21:
             return (0.0, 1.0, 0.0)
 
-        clave_agrupada = self._crear_clave_agrupada(cartas_restantes)
+        clave_agrupada = self._crear_clave_agrupada(zapato)
         prob_key = (valor_jugador, carta_dealer.valor, clave_agrupada)
 
         if prob_key in self.memo_outcome_prob:
             return self.memo_outcome_prob[prob_key]
 
-        dist_prob_dealer = self._simular_dealer(Mano([carta_dealer]), cartas_restantes)
+        dist_prob_dealer = self._simular_dealer(Mano([carta_dealer]), zapato)
 
         prob_victoria, prob_derrota, prob_empate = 0.0, 0.0, 0.0
         for valor_final_dealer, prob in dist_prob_dealer.items():
@@ -276,72 +293,79 @@ class AgenteMarkov_PoliticaApuestas(Agente):
         self.memo_outcome_prob[prob_key] = resultado
         return resultado
 
-    def _calcular_ev_plantarse(self, valor_jugador: int, carta_dealer: Carta, cartas_restantes: np.ndarray) -> float:
+    def _calcular_ev_plantarse(self, valor_jugador: int, carta_dealer: Carta, zapato: ConteoZapato) -> float:
         """Valor esperado de plantarse"""
-        prob_victoria, prob_derrota, _ = self._get_outcome_probabilities(valor_jugador, carta_dealer, cartas_restantes)
+        prob_victoria, prob_derrota, _ = self._get_outcome_probabilities(valor_jugador, carta_dealer, zapato)
         return prob_victoria - prob_derrota
 
-    def _calcular_ev_doblar(self, mano_jugador: Mano, carta_dealer: Carta, cartas_restantes: np.ndarray) -> float:
+    def _calcular_ev_doblar(self, mano_jugador: Mano, carta_dealer: Carta, zapato: ConteoZapato) -> float:
         """Valor esperado de doblar"""
         ev_total = 0.0
-        total_cartas = np.sum(cartas_restantes)
+        total_cartas = zapato.total
         if total_cartas == 0:
             return -2.0
 
-        for i, count in enumerate(cartas_restantes):
+        for i, count in enumerate(zapato.conteos):
             if count > 0:
                 prob_carta = count / total_cartas
                 valor_carta = 11 if i == 0 else (10 if i == 9 else i + 1)
 
-                nuevas_cartas_restantes = cartas_restantes.copy()
-                nuevas_cartas_restantes[i] -= 1
-
                 nueva_mano = Mano(mano_jugador.cartas + [Carta(Palo.PICAS, Rango.from_valor(valor_carta))])
 
+                # Retiro hipotético en el lugar: las claves agrupadas salen de los totales en O(1)
+                zapato.quitar(i)
                 prob_victoria, prob_derrota, _ = self._get_outcome_probabilities(
-                    nueva_mano.valor_total, carta_dealer, nuevas_cartas_restantes
+                    nueva_mano.valor_total, carta_dealer, zapato
                 )
+                zapato.reponer(i)
                 ev_doblado = (prob_victoria * 2) - (prob_derrota * 2)
                 ev_total += prob_carta * ev_doblado
         return ev_total
 
-    def _calcular_ev_pedir(self, mano_jugador: Mano, carta_dealer: Carta, cartas_restantes: np.ndarray) -> float:
+    def _calcular_ev_pedir(self, mano_jugador: Mano, carta_dealer: Carta, zapato: ConteoZapato,
+                           profundidad: int = None) -> float:
         """Valor esperado de pedir carta"""
         ev_total = 0.0
-        total_cartas = np.sum(cartas_restantes)
+        total_cartas = zapato.total
         if total_cartas == 0:
-            return self._calcular_ev_plantarse(mano_jugador.valor_total, carta_dealer, cartas_restantes)
+            return self._calcular_ev_plantarse(mano_jugador.valor_total, carta_dealer, zapato)
 
-        for i, count in enumerate(cartas_restantes):
+        for i, count in enumerate(zapato.conteos):
             if count > 0:
                 prob_carta = count / total_cartas
                 valor_carta = 11 if i == 0 else (10 if i == 9 else i + 1)
 
-                nuevas_cartas_restantes = cartas_restantes.copy()
-                nuevas_cartas_restantes[i] -= 1
-
                 nueva_mano = Mano(mano_jugador.cartas + [Carta(Palo.PICAS, Rango.from_valor(valor_carta))])
-                valor_siguiente_estado = self._get_valor_estado(nueva_mano, carta_dealer, nuevas_cartas_restantes)
+                zapato.quitar(i)
+                valor_siguiente_estado = self._get_valor_estado(nueva_mano, carta_dealer, zapato,
+                                                                None if profundidad is None else profundidad - 1)
+                zapato.reponer(i)
                 ev_total += prob_carta * valor_siguiente_estado
 
         return ev_total
 
-    def _calcular_ev_dividir(self, mano_jugador: Mano, carta_dealer: Carta, cartas_restantes: np.ndarray) -> float:
+    def _calcular_ev_dividir(self, mano_jugador: Mano, carta_dealer: Carta, zapato: ConteoZapato,
+                             profundidad: int = None) -> float:
         """Valor esperado de dividir"""
         if len(mano_jugador.cartas) != 2:
             return -1.0
 
         carta_dividida_valor = mano_jugador.cartas[0].valor
         mano_dividida = Mano([Carta(Palo.PICAS, Rango.from_valor(carta_dividida_valor))])
-        ev_mano = self._get_valor_estado(mano_dividida, carta_dealer, cartas_restantes.copy())
+        ev_mano = self._get_valor_estado(mano_dividida, carta_dealer, zapato, profundidad)
         return ev_mano * 2
 
-    def _get_valor_estado(self, mano_jugador: Mano, carta_dealer: Carta, cartas_restantes: np.ndarray) -> float:
-        """Calcula el valor del estado usando MDP con caché manual"""
+    def _get_valor_estado(self, mano_jugador: Mano, carta_dealer: Carta, zapato: ConteoZapato,
+                          profundidad: int = None) -> float:
+        """
+        Calcula el valor del estado usando MDP con caché manual. profundidad = cuántas cartas
+        más puede pedir el jugador en esta pasada (None = sin límite).
+        """
+        self._visitar_nodo()
         if mano_jugador.valor_total > 21:
             return -1.0
 
-        clave_agrupada = self._crear_clave_agrupada(cartas_restantes)
+        clave_agrupada = self._crear_clave_agrupada(zapato)
         estado_key = (
             mano_jugador.valor_total,
             mano_jugador.es_blanda,
@@ -352,34 +376,52 @@ class AgenteMarkov_PoliticaApuestas(Agente):
 
         if estado_key in self.memo_valor_estado:
             return self.memo_valor_estado[estado_key]
+        valor_parcial = self._buscar_parcial(estado_key, profundidad)
+        if valor_parcial is not None:
+            return valor_parcial
 
-        ev_plantarse = self._calcular_ev_plantarse(mano_jugador.valor_total, carta_dealer, cartas_restantes)
-        ev_pedir = self._calcular_ev_pedir(mano_jugador, carta_dealer, cartas_restantes)
+        ev_plantarse = self._calcular_ev_plantarse(mano_jugador.valor_total, carta_dealer, zapato)
+        if profundidad == 0 and mano_jugador.valor_total < 21:
+            return self._valor_cortado(ev_plantarse)
+
+        cortes_antes = self._cortes
+        ev_pedir = self._calcular_ev_pedir(mano_jugador, carta_dealer, zapato, profundidad)
 
         valor_optimo = max(ev_plantarse, ev_pedir)
-        self.memo_valor_estado[estado_key] = valor_optimo
+        self._guardar_valor(self.memo_valor_estado, estado_key, profundidad, cortes_antes, valor_optimo)
         return valor_optimo
 
+    @turno_busqueda
+    @contar_nodos
     def decidir_accion(self, mano: Mano, carta_dealer: Carta) -> Accion:
         """Toma la decisión óptima basada en el valor esperado de cada acción"""
         if mano.es_blackjack or mano.valor_total > 21:
             return Accion.PLANTARSE
+        return self._decidir_con_motor(mano, carta_dealer)
 
+    def _elegir_accion(self, mano: Mano, carta_dealer: Carta, profundidad: int = None) -> Accion:
+        """Compara el EV de cada acción; con profundidad, la búsqueda de PEDIR queda limitada"""
+        # Copia propia: la búsqueda quita y repone cartas, y un corte por presupuesto
+        # puede dejarla a medio reponer sin tocar el conteo del zapato
+        zapato = self._conteo_busqueda()
         acciones_ev = {
-            Accion.PLANTARSE: self._calcular_ev_plantarse(mano.valor_total, carta_dealer, self.cartas_restantes.copy()),
-            Accion.PEDIR: self._calcular_ev_pedir(mano, carta_dealer, self.cartas_restantes.copy())
+            Accion.PLANTARSE: self._calcular_ev_plantarse(mano.valor_total, carta_dealer, zapato),
+            Accion.PEDIR: self._calcular_ev_pedir(mano, carta_dealer, zapato, profundidad)
         }
 
+        self._ev_ultima_busqueda = acciones_ev
+
         # Acciones especiales solo disponibles con 2 cartas
         if len(mano.cartas) == 2:
-            acciones_ev[Accion.DOBLAR] = self._calcular_ev_doblar(mano, carta_dealer, self.cartas_restantes.copy())
+            acciones_ev[Accion.DOBLAR] = self._calcular_ev_doblar(mano, carta_dealer, zapato)
 
             if mano.cartas[0].rango == mano.cartas[1].rango:
-                acciones_ev[Accion.DIVIDIR] = self._calcular_ev_dividir(mano, carta_dealer,
-                                                                        self.cartas_restantes.copy())
+                acciones_ev[Accion.DIVIDIR] = self._calcular_ev_dividir(mano, carta_dealer, zapato, profundidad)
 
             # Considerar rendirse si el EV es muy bajo
             mejor_ev = max(acciones_ev.values())
+            self._ev_ultima_busqueda = dict(acciones_ev)
+            self._ev_ultima_busqueda[Accion.RENDIRSE] = -0.5
             if -0.5 > mejor_ev:
                 return Accion.RENDIRSE
         return max(acciones_ev, key=acciones_ev.get)
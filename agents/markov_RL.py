@@ -1,10 +1,12 @@
 import numpy as np
-from .agente_base import Agente
+from .agente_base import Agente, ConZapatoCompartido
+from .telemetria_cache import TelemetriaMarkov, contar_nodos
 from core.acciones import Accion
 from core.player import Jugador, Mano
 from core.cartas import Carta, Rango, Palo
+from core.composicion import Composicion
 
-class AgenteMarkov_RL(Agente):
+class AgenteMarkov_RL(TelemetriaMarkov, ConZapatoCompartido, Agente):
     """
     Agente MDP con una arquitectura de caché optimizada por bucket y una ESTRUCTURA DE RECOMPENSAS
     GRANULAR Y PARAMETRIZADA, diseñada para ser controlada por un agente de RL externo.
@@ -13,6 +15,8 @@ class AgenteMarkov_RL(Agente):
     aprenderá cuál es el mejor conjunto de recompensas para este agente, con el objetivo de
     maximizar el rendimiento financiero a largo plazo.
     """
+    MEMOS = ('memo_probabilidades', 'memo_ev')
+
     def __init__(self, jugador: Jugador, num_mazos: int = 4, precision_agrupacion= 20):
         super().__init__(jugador)
         self.num_mazos = num_mazos
@@ -26,8 +30,7 @@ class AgenteMarkov_RL(Agente):
             'player_bust': -1.0
         }
 
-        self.memo_probabilidades = {}
-        self.memo_ev = {}
+        self._iniciar_zapato(num_mazos)
         self.resetear_conteo()
 
     def set_recompensas(self, recompensa_dict: dict):
@@ -37,26 +40,23 @@ class AgenteMarkov_RL(Agente):
         if valor_carta == 11: return 0
         return valor_carta - 1 if valor_carta < 10 else 9
 
-    def observar_carta(self, carta: Carta):
-        idx = self._get_idx(carta.valor)
-        if self.cartas_restantes[idx] > 0:
-            self.cartas_restantes[idx] -= 1
+    @property
+    def cartas_restantes(self) -> np.ndarray:
+        """Cartas restantes por índice, leídas del conteo del zapato (propio o el del casino)."""
+        return np.array(self.conteo_zapato.conteos)
 
     def resetear_conteo(self):
-        self.cartas_restantes = np.array([4 * self.num_mazos] * 9 + [16 * self.num_mazos])
-        self.memo_ev.clear()
-        self.memo_probabilidades.clear()
+        self._reiniciar_zapato()
+        self._cerrar_zapato()
             
     def decidir_apuesta(self, capital_actual: int = None) -> int:
         return 5
 
     def _crear_clave_agrupada(self) -> tuple:
-        total_restantes = np.sum(self.cartas_restantes)
+        # Los totales por grupo ya los lleva el conteo del zapato
+        total_restantes = self.conteo_zapato.total
         if total_restantes == 0: return (0, 0, 0, 0)
-        num_ases = self.cartas_restantes[0]
-        num_bajas = np.sum(self.cartas_restantes[1:6])
-        num_medias = np.sum(self.cartas_restantes[6:9])
-        num_altas = self.cartas_restantes[9]
+        num_ases, num_bajas, num_medias, num_altas = self.conteo_zapato.grupos
         p = self.precision_agrupacion
         return (
             int((num_ases / total_restantes) * p),
@@ -70,40 +70,43 @@ class AgenteMarkov_RL(Agente):
         if clave_agrupada in self.memo_probabilidades:
             return self.memo_probabilidades[clave_agrupada]
 
-        total_cartas = np.sum(self.cartas_restantes)
+        total_cartas = self.conteo_zapato.total
         if total_cartas == 0: return {}
 
-        distribucion = { (11 if i==0 else i+1): c/total_cartas for i, c in enumerate(self.cartas_restantes) if c > 0 }
+        distribucion = { (11 if i==0 else i+1): c/total_cartas for i, c in enumerate(self.conteo_zapato.conteos) if c > 0 }
         
         self.memo_probabilidades[clave_agrupada] = distribucion
         return distribucion
 
-    def _calcular_dealer_recursivo(self, valor_actual: int, es_blanda: bool, cartas_restantes: np.ndarray, memo: dict) -> dict:
-        clave_memo = (valor_actual, es_blanda, tuple(cartas_restantes))
+    def _calcular_dealer_recursivo(self, valor_actual: int, es_blanda: bool, composicion: Composicion, memo: dict) -> dict:
+        # La composición se modifica al bajar y se restaura al volver; la clave es su hash Zobrist
+        self.nodos_decision += 1
+        clave_memo = (valor_actual, es_blanda, composicion.hash)
         if clave_memo in memo:
             return memo[clave_memo]
 
         if valor_actual > 21: return {'dealer_bust': 1.0}
         if valor_actual >= 17: return {valor_actual: 1.0}
 
-        total_cartas = np.sum(cartas_restantes)
+        total_cartas = composicion.total
         if total_cartas == 0: return {valor_actual: 1.0}
 
         # --- CORRECCIÓN AQUÍ ---
         # Inicializar como un diccionario vacío para aceptar cualquier clave de resultado.
         dist_agregada = {}
 
-        for idx, count in enumerate(cartas_restantes):
+        for idx, count in enumerate(composicion.conteos):
             if count > 0:
                 prob = count / total_cartas
-                nuevas_cartas = cartas_restantes.copy(); nuevas_cartas[idx] -= 1
                 valor_carta = 11 if idx == 0 else idx + 1
                 
                 nuevo_valor, nueva_es_blanda = valor_actual + valor_carta, es_blanda or (valor_carta == 11)
                 if nuevo_valor > 21 and nueva_es_blanda:
                     nuevo_valor -= 10; nueva_es_blanda = False
 
-                dist_recursiva = self._calcular_dealer_recursivo(nuevo_valor, nueva_es_blanda, nuevas_cartas, memo)
+                composicion.quitar(idx)
+                dist_recursiva = self._calcular_dealer_recursivo(nuevo_valor, nueva_es_blanda, composicion, memo)
+                composicion.reponer(idx)
                 
                 # --- CORRECCIÓN AQUÍ ---
                 # Usar .get() para añadir de forma segura a la distribución.
@@ -119,32 +122,32 @@ class AgenteMarkov_RL(Agente):
             return self.memo_probabilidades[clave_cache]
 
         memo_sim = {}
-        cartas_sim = self.cartas_restantes.copy()
+        cartas_sim = self.conteo_zapato.composicion.copia()
         
         # Manejar el caso de que la carta del dealer no esté en el conteo (improbable)
         idx_visible = self._get_idx(carta_dealer_visible.valor)
-        if cartas_sim[idx_visible] > 0:
-            cartas_sim[idx_visible] -= 1
+        if cartas_sim.conteos[idx_visible] > 0:
+            cartas_sim.quitar(idx_visible)
         
-        total_ocultas = np.sum(cartas_sim)
+        total_ocultas = cartas_sim.total
         if total_ocultas == 0: return {carta_dealer_visible.valor: 1.0}
 
         # --- CORRECCIÓN AQUÍ ---
         # Inicializar como un diccionario vacío.
         dist_final = {}
 
-        for idx, count in enumerate(cartas_sim):
+        for idx, count in enumerate(cartas_sim.conteos):
             if count > 0:
                 prob_oculta = count / total_ocultas
                 valor_oculta = 11 if idx == 0 else idx + 1
                 
-                mazo_post = cartas_sim.copy(); mazo_post[idx] -= 1
-                
                 valor_ini, blanda_ini = carta_dealer_visible.valor + valor_oculta, carta_dealer_visible.rango == Rango.AS or (valor_oculta == 11)
                 if valor_ini > 21 and blanda_ini:
                     valor_ini -= 10; blanda_ini = False
                 
-                dist_parcial = {21: 1.0} if valor_ini == 21 else self._calcular_dealer_recursivo(valor_ini, blanda_ini, mazo_post, memo_sim)
+                cartas_sim.quitar(idx)
+                dist_parcial = {21: 1.0} if valor_ini == 21 else self._calcular_dealer_recursivo(valor_ini, blanda_ini, cartas_sim, memo_sim)
+                cartas_sim.reponer(idx)
                 
                 # --- CORRECCIÓN AQUÍ ---
                 # Usar .get() para añadir de forma segura.
@@ -215,6 +218,7 @@ class AgenteMarkov_RL(Agente):
                 dist_final_dividir[outcome] += prob * p_outcome
         return dist_final_dividir
 
+    @contar_nodos
     def decidir_accion(self, mano: Mano, carta_dealer: Carta) -> Accion:
         if mano.valor_total >= 21:
             return Accion.PLANTARSE
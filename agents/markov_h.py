@@ -1,8 +1,14 @@
 import numpy as np
 from .agente_base import Agente
+from .telemetria_cache import TelemetriaMarkov, contar_nodos
+from .memo_versionado import MemosPorVersion
+from .decision_anytime import DecisionAnytime
 from core.acciones import Accion
 from core.player import Jugador, Mano
 from core.cartas import Carta, Rango, Palo
+from core.composicion import Composicion, indice_carta
+from .dp_jugador import TablaValores, estado_mano, resolver_tabla
+from .dp_dealer import distribucion_final, probabilidades_resultado
 
 """
 El factor_riesgo_escala: Este es tu nuevo "dial de agresividad".
@@ -11,17 +17,22 @@ factor_riesgo_escala = 0.05 (defecto): El Hi-Lo da un pequeño "empujón". En la
 factor_riesgo_escala = 0.2: El Hi-Lo tiene una influencia muy fuerte y puede hacer que el agente tome decisiones que contradicen el cálculo de EV puro.
 """
 
-class AgenteHibrido_Markov_HiLo(Agente):
+class AgenteHibrido_Markov_HiLo(DecisionAnytime, MemosPorVersion, TelemetriaMarkov, Agente):
     """
     Agente Híbrido que combina un modelo MDP con un conteo Hi-Lo como factor de riesgo.
 
     1. Calcula el Valor Esperado (EV) de cada acción usando un modelo de Markov
-       con probabilidades actualizadas por umbrales.
+       con probabilidades actualizadas por umbrales (tabla por programación
+       dinámica, ver agents/dp_jugador.py, y el dealer como cadena absorbente,
+       ver agents/dp_dealer.py).
     2. Mantiene un conteo de cartas Hi-Lo paralelo.
     3. Usa el "Conteo Verdadero" del Hi-Lo para aplicar un "empujón" o "penalización"
        al EV de cada acción, ajustando la decisión final basada en el riesgo situacional.
     """
-    def __init__(self, jugador: Jugador, num_mazos: int = 4, recompensas: dict = None, factor_riesgo_escala: float = 0.05):
+    MEMOS = ('memo_valor_estado', 'memo_outcome_prob', 'memo_dealer_dist')
+
+    def __init__(self, jugador: Jugador, num_mazos: int = 4, recompensas: dict = None, factor_riesgo_escala: float = 0.05,
+                 presupuesto_ms: float = None, presupuesto_nodos: int = None):
         """
         Inicializa el agente híbrido.
 
@@ -31,6 +42,9 @@ class AgenteHibrido_Markov_HiLo(Agente):
             recompensas (dict, optional): Diccionario para personalizar las recompensas.
             factor_riesgo_escala (float, optional): Controla la influencia del conteo Hi-Lo.
                 Un valor más alto hace que el agente sea más sensible al conteo.
+            presupuesto_ms (float, optional): Tiempo máximo por decisión en milisegundos.
+            presupuesto_nodos (int, optional): Nodos de búsqueda máximos por decisión.
+                Con alguno de los dos la decisión es anytime (ver agents/decision_anytime.py).
         """
         super().__init__(jugador)
         self.num_mazos = num_mazos
@@ -42,10 +56,12 @@ class AgenteHibrido_Markov_HiLo(Agente):
         # Nuevo parámetro para la influencia del Hi-Lo
         self.factor_riesgo_escala = factor_riesgo_escala
 
+        self.configurar_presupuesto(presupuesto_ms, presupuesto_nodos)
         self.resetear_conteo()
     
     def set_recompensas(self, nuevas_recompensas: dict):
         self.recompensas.update(nuevas_recompensas)
+        self._invalidar_valores()
         
     def set_factor_riesgo(self, nuevo_factor: float):
         """
@@ -67,12 +83,22 @@ class AgenteHibrido_Markov_HiLo(Agente):
             self.prob_dist_actual = self.cartas_restantes / total_cartas
         else:
             self.prob_dist_actual = np.zeros_like(self.cartas_restantes)
+        # La distribución vigente se identifica en los memos por el hash de la composición que la generó;
+        # sus entradas se conservan hasta la próxima versión (ver agents/memo_versionado.py)
+        self.clave_dist_actual = self.composicion.hash
+        self._nueva_version_dist(self.clave_dist_actual)
+
+    def _clave_dist(self, prob_dist: np.ndarray):
+        if prob_dist is self.prob_dist_actual:
+            return self.clave_dist_actual
+        return self._clave_version(tuple(prob_dist))
 
     def observar_carta(self, carta: Carta):
         # --- Lógica del Modelo de Markov ---
         idx = self._get_idx(carta.valor)
         if self.cartas_restantes[idx] > 0:
             self.cartas_restantes[idx] -= 1
+            self.composicion.quitar(idx)
             umbral_mitad = self.cartas_iniciales[idx] / 2
             umbral_cero = 0
             if (self.cartas_restantes[idx] == umbral_mitad or 
@@ -91,10 +117,9 @@ class AgenteHibrido_Markov_HiLo(Agente):
         # --- Reseteo para el Modelo de Markov ---
         self.cartas_iniciales = np.array([4 * self.num_mazos] * 9 + [16 * self.num_mazos], dtype=float)
         self.cartas_restantes = self.cartas_iniciales.copy()
+        self._cerrar_zapato()
+        self.composicion = Composicion(self.cartas_iniciales)
         self._actualizar_probabilidades()
-        self.memo_valor_estado = {}
-        self.memo_outcome_prob = {}
-        self.memo_dealer_dist = {}
         
         # ================================================================= #
         # === NUEVO: Reseteo para el conteo Hi-Lo === #
@@ -109,56 +134,45 @@ class AgenteHibrido_Markov_HiLo(Agente):
     # --- Todos los métodos de cálculo de EV (_calcular_ev_*, _get_valor_estado, etc.) ---
     # --- permanecen SIN CAMBIOS. Calculan el EV "puro". ---
     # (Se omite el código de los métodos de cálculo por brevedad, es idéntico al anterior)
-    def _calcular_dealer_recursivo(self, mano_dealer: Mano, prob_dist: np.ndarray) -> dict:
-        valor_actual = mano_dealer.valor_total
-        key_recursiva = (valor_actual, mano_dealer.es_blanda, tuple(prob_dist))
-        if key_recursiva in self.memo_dealer_dist:
-            return self.memo_dealer_dist[key_recursiva]
-        if valor_actual >= 17:
-            return {valor_actual: 1.0}
-        dist_prob_final = {}
-        if np.sum(prob_dist) == 0:
-             return {valor_actual: 1.0}
-        for i, prob_carta in enumerate(prob_dist):
-            if prob_carta > 0:
-                valor_carta = 11 if i == 0 else (10 if i == 9 else i + 1)
-                nueva_carta = Carta(Palo.PICAS, Rango.from_valor(valor_carta))
-                sub_dist = self._calcular_dealer_recursivo(Mano(mano_dealer.cartas + [nueva_carta]), prob_dist)
-                for v_final, p_sub in sub_dist.items():
-                    dist_prob_final[v_final] = dist_prob_final.get(v_final, 0) + prob_carta * p_sub
-        self.memo_dealer_dist[key_recursiva] = dist_prob_final
-        return dist_prob_final
+    def _resultados_dealer(self, prob_dist: np.ndarray) -> tuple:
+        """(victoria, derrota, empate) de plantarse por total y carta del dealer; la cadena se resuelve una vez por distribución."""
+        clave = self._clave_dist(prob_dist)
+        if clave in self.memo_outcome_prob:
+            return self.memo_outcome_prob[clave]
+        if clave in self.memo_dealer_dist:
+            dist = self.memo_dealer_dist[clave]
+        else:
+            dist = distribucion_final(prob_dist, self._visitar_nodo)
+            self.memo_dealer_dist[clave] = dist
+        resultados = probabilidades_resultado(dist)
+        self.memo_outcome_prob[clave] = resultados
+        return resultados
 
     def _get_outcome_probabilities(self, valor_jugador: int, carta_dealer: Carta, prob_dist: np.ndarray) -> tuple[float, float, float]:
         if valor_jugador > 21:
             return (0.0, 1.0, 0.0)
-        prob_key = (valor_jugador, carta_dealer.valor, tuple(prob_dist))
-        if prob_key in self.memo_outcome_prob:
-            return self.memo_outcome_prob[prob_key]
-        dist_prob_dealer = self._calcular_dealer_recursivo(Mano([carta_dealer]), prob_dist)
-        prob_victoria, prob_derrota, prob_empate = 0.0, 0.0, 0.0
-        for valor_final_dealer, prob in dist_prob_dealer.items():
-            if valor_final_dealer > 21 or valor_jugador > valor_final_dealer:
-                prob_victoria += prob
-            elif valor_jugador < valor_final_dealer:
-                prob_derrota += prob
-            else:
-                prob_empate += prob
-        resultado = (prob_victoria, prob_derrota, prob_empate)
-        self.memo_outcome_prob[prob_key] = resultado
-        return resultado
+        victoria, derrota, empate = self._resultados_dealer(prob_dist)
+        j = indice_carta(carta_dealer.valor)
+        return (float(victoria[valor_jugador, j]), float(derrota[valor_jugador, j]), float(empate[valor_jugador, j]))
+
+    def _tabla_valores(self, prob_dist: np.ndarray) -> TablaValores:
+        """Tabla de valores del jugador para prob_dist, una por distribución y para todas las cartas del dealer."""
+        clave = self._clave_dist(prob_dist)
+        if clave in self.memo_valor_estado:
+            return self.memo_valor_estado[clave]
+        victoria, derrota, empate = self._resultados_dealer(prob_dist)
+        plantarse = (victoria * self.recompensas['victoria'] + derrota * self.recompensas['derrota'] +
+                     empate * self.recompensas['empate'])
+        tabla = resolver_tabla(prob_dist, plantarse, self.recompensas['derrota'], self._visitar_nodo)
+        self.memo_valor_estado[clave] = tabla
+        return tabla
 
     def _get_valor_estado(self, mano_jugador: Mano, carta_dealer: Carta, prob_dist: np.ndarray) -> float:
         if mano_jugador.valor_total > 21:
             return self.recompensas['derrota']
-        estado_key = (mano_jugador.valor_total, mano_jugador.es_blanda, len(mano_jugador.cartas), carta_dealer.valor, tuple(prob_dist))
-        if estado_key in self.memo_valor_estado:
-            return self.memo_valor_estado[estado_key]
-        ev_plantarse = self._calcular_ev_plantarse(mano_jugador.valor_total, carta_dealer, prob_dist)
-        ev_pedir = self._calcular_ev_pedir(mano_jugador, carta_dealer, prob_dist)
-        valor_optimo = max(ev_plantarse, ev_pedir)
-        self.memo_valor_estado[estado_key] = valor_optimo
-        return valor_optimo
+        tabla = self._tabla_valores(prob_dist)
+        total, blanda = estado_mano(mano_jugador)
+        return tabla.ev(tabla.valor, total, blanda, carta_dealer)
 
     def _calcular_ev_plantarse(self, valor_jugador: int, carta_dealer: Carta, prob_dist: np.ndarray) -> float:
         prob_victoria, prob_derrota, prob_empate = self._get_outcome_probabilities(valor_jugador, carta_dealer, prob_dist)
@@ -167,30 +181,15 @@ class AgenteHibrido_Markov_HiLo(Agente):
                 prob_empate * self.recompensas['empate'])
 
     def _calcular_ev_doblar(self, mano_jugador: Mano, carta_dealer: Carta, prob_dist: np.ndarray) -> float:
-        ev_total = 0.0
         if np.sum(prob_dist) == 0: return self.recompensas['derrota'] * 2
-        for i, prob_carta in enumerate(prob_dist):
-            if prob_carta > 0:
-                valor_carta = 11 if i == 0 else (10 if i == 9 else i + 1)
-                nueva_mano = Mano(mano_jugador.cartas + [Carta(Palo.PICAS, Rango.from_valor(valor_carta))])
-                prob_victoria, prob_derrota, prob_empate = self._get_outcome_probabilities(nueva_mano.valor_total, carta_dealer, prob_dist)
-                ev_una_carta = (prob_victoria * self.recompensas['victoria'] + 
-                                prob_derrota * self.recompensas['derrota'] + 
-                                prob_empate * self.recompensas['empate'])
-                ev_total += prob_carta * (ev_una_carta * 2)
-        return ev_total
-        
+        tabla = self._tabla_valores(prob_dist)
+        total, blanda = estado_mano(mano_jugador)
+        return tabla.ev(tabla.doblar, total, blanda, carta_dealer) * 2
+
     def _calcular_ev_pedir(self, mano_jugador: Mano, carta_dealer: Carta, prob_dist: np.ndarray) -> float:
-        ev_total = 0.0
-        if np.sum(prob_dist) == 0:
-            return self._calcular_ev_plantarse(mano_jugador.valor_total, carta_dealer, prob_dist)
-        for i, prob_carta in enumerate(prob_dist):
-            if prob_carta > 0:
-                valor_carta = 11 if i == 0 else (10 if i == 9 else i + 1)
-                nueva_mano = Mano(mano_jugador.cartas + [Carta(Palo.PICAS, Rango.from_valor(valor_carta))])
-                valor_siguiente_estado = self._get_valor_estado(nueva_mano, carta_dealer, prob_dist)
-                ev_total += prob_carta * valor_siguiente_estado
-        return ev_total
+        tabla = self._tabla_valores(prob_dist)
+        total, blanda = estado_mano(mano_jugador)
+        return tabla.ev(tabla.pedir, total, blanda, carta_dealer)
         
     def _calcular_ev_dividir(self, mano_jugador: Mano, carta_dealer: Carta, prob_dist: np.ndarray) -> float:
         carta_dividida_valor = mano_jugador.cartas[0].valor
@@ -198,14 +197,16 @@ class AgenteHibrido_Markov_HiLo(Agente):
         ev_mano = self._get_valor_estado(mano_dividida, carta_dealer, prob_dist)
         return ev_mano * 2
 
+    @contar_nodos
     def decidir_accion(self, mano: Mano, carta_dealer: Carta) -> Accion:
         if mano.es_blackjack or mano.valor_total > 21:
             return Accion.PLANTARSE
 
-        self.memo_valor_estado.clear()
-        self.memo_outcome_prob.clear()
-        self.memo_dealer_dist.clear()
-        
+        return self._decidir_anytime(mano, carta_dealer)
+
+    def _elegir_accion(self, mano: Mano, carta_dealer: Carta, profundidad: int = None) -> Accion:
+        # La tabla de valores se llena completa en una pasada: no hay búsqueda que truncar,
+        # así que profundidad no se usa y el presupuesto solo corta si no alcanza para la tabla
         prob_dist = self.prob_dist_actual
         
         # 1. Calcular los EV puros basados en el modelo de Markov
@@ -1,14 +1,24 @@
 import numpy as np
 from .agente_base import Agente
+from .telemetria_cache import TelemetriaMarkov, contar_nodos
+from .memo_versionado import MemosPorVersion
 from core.acciones import Accion
 from core.player import Jugador, Mano
 from core.cartas import Carta, Rango, Palo
+from core.composicion import Composicion, indice_carta
+from .dp_jugador import TablaValores, estado_mano, resolver_tabla
+from .dp_dealer import distribucion_final, probabilidades_resultado
 
-class AgenteMarkov_prob_estable_por_umbral(Agente):
+class AgenteMarkov_prob_estable_por_umbral(MemosPorVersion, TelemetriaMarkov, Agente):
     """
     Agente MDP con una estrategia de probabilidad estable actualizada por umbrales
-    y con recompensas personalizables.
+    y con recompensas personalizables. Como el vector de probabilidades queda fijo
+    entre umbrales, los valores de las manos salen de una tabla por programación
+    dinámica (agents/dp_jugador.py), los del dealer de una cadena absorbente
+    (agents/dp_dealer.py), y cada decisión es una consulta.
     """
+    MEMOS = ('memo_valor_estado', 'memo_outcome_prob', 'memo_dealer_dist')
+
     def __init__(self, jugador: Jugador, num_mazos: int = 4, recompensas: dict = None):
         """
         Inicializa el agente.
@@ -46,6 +56,7 @@ class AgenteMarkov_prob_estable_por_umbral(Agente):
                 Ejemplo: {'victoria': 1.5, 'derrota': -1.0, 'empate': -0.5}
         """
         self.recompensas.update(nuevas_recompensas)
+        self._invalidar_valores()
 
     def _get_idx(self, valor_carta: int) -> int:
         if valor_carta == 11: return 0  # As
@@ -57,11 +68,21 @@ class AgenteMarkov_prob_estable_por_umbral(Agente):
             self.prob_dist_actual = self.cartas_restantes / total_cartas
         else:
             self.prob_dist_actual = np.zeros_like(self.cartas_restantes)
+        # La distribución vigente se identifica en los memos por el hash de la composición que la generó;
+        # sus entradas se conservan hasta la próxima versión (ver agents/memo_versionado.py)
+        self.clave_dist_actual = self.composicion.hash
+        self._nueva_version_dist(self.clave_dist_actual)
+
+    def _clave_dist(self, prob_dist: np.ndarray):
+        if prob_dist is self.prob_dist_actual:
+            return self.clave_dist_actual
+        return self._clave_version(tuple(prob_dist))
 
     def observar_carta(self, carta: Carta):
         idx = self._get_idx(carta.valor)
         if self.cartas_restantes[idx] > 0:
             self.cartas_restantes[idx] -= 1
+            self.composicion.quitar(idx)
             umbral_mitad = self.cartas_iniciales[idx] / 2
             umbral_cero = 0
             if (self.cartas_restantes[idx] == umbral_mitad or 
@@ -72,65 +93,56 @@ class AgenteMarkov_prob_estable_por_umbral(Agente):
         self.cartas_iniciales = np.array([4 * self.num_mazos] * 9 + [16 * self.num_mazos], dtype=float)
         # CORRECCIÓN: Usar .copy() para evitar que ambos arrays apunten al mismo objeto
         self.cartas_restantes = self.cartas_iniciales.copy()
+        self._cerrar_zapato()
+        self.composicion = Composicion(self.cartas_iniciales)
         self._actualizar_probabilidades()
-        self.memo_valor_estado = {}
-        self.memo_outcome_prob = {}
-        self.memo_dealer_dist = {}
             
     def decidir_apuesta(self, capital_actual: int = None) -> int:
         return 5
 
-    def _calcular_dealer_recursivo(self, mano_dealer: Mano, prob_dist: np.ndarray) -> dict:
-        valor_actual = mano_dealer.valor_total
-        key_recursiva = (valor_actual, mano_dealer.es_blanda, tuple(prob_dist))
-        if key_recursiva in self.memo_dealer_dist:
-            return self.memo_dealer_dist[key_recursiva]
-        if valor_actual >= 17:
-            return {valor_actual: 1.0}
-        dist_prob_final = {}
-        if np.sum(prob_dist) == 0:
-             return {valor_actual: 1.0}
-        for i, prob_carta in enumerate(prob_dist):
-            if prob_carta > 0:
-                valor_carta = 11 if i == 0 else (10 if i == 9 else i + 1)
-                nueva_carta = Carta(Palo.PICAS, Rango.from_valor(valor_carta))
-                sub_dist = self._calcular_dealer_recursivo(Mano(mano_dealer.cartas + [nueva_carta]), prob_dist)
-                for v_final, p_sub in sub_dist.items():
-                    dist_prob_final[v_final] = dist_prob_final.get(v_final, 0) + prob_carta * p_sub
-        self.memo_dealer_dist[key_recursiva] = dist_prob_final
-        return dist_prob_final
+    def _resultados_dealer(self, prob_dist: np.ndarray) -> tuple:
+        """(victoria, derrota, empate) de plantarse por total y carta del dealer; la cadena se resuelve una vez por distribución."""
+        clave = self._clave_dist(prob_dist)
+        if clave in self.memo_outcome_prob:
+            return self.memo_outcome_prob[clave]
+        if clave in self.memo_dealer_dist:
+            dist = self.memo_dealer_dist[clave]
+        else:
+            dist = distribucion_final(prob_dist, self._visitar_nodo)
+            self.memo_dealer_dist[clave] = dist
+        resultados = probabilidades_resultado(dist)
+        self.memo_outcome_prob[clave] = resultados
+        return resultados
 
     def _get_outcome_probabilities(self, valor_jugador: int, carta_dealer: Carta, prob_dist: np.ndarray) -> tuple[float, float, float]:
         if valor_jugador > 21:
             return (0.0, 1.0, 0.0)
-        prob_key = (valor_jugador, carta_dealer.valor, tuple(prob_dist))
-        if prob_key in self.memo_outcome_prob:
-            return self.memo_outcome_prob[prob_key]
-        dist_prob_dealer = self._calcular_dealer_recursivo(Mano([carta_dealer]), prob_dist)
-        prob_victoria, prob_derrota, prob_empate = 0.0, 0.0, 0.0
-        for valor_final_dealer, prob in dist_prob_dealer.items():
-            if valor_final_dealer > 21 or valor_jugador > valor_final_dealer:
-                prob_victoria += prob
-            elif valor_jugador < valor_final_dealer:
-                prob_derrota += prob
-            else:
-                prob_empate += prob
-        resultado = (prob_victoria, prob_derrota, prob_empate)
-        self.memo_outcome_prob[prob_key] = resultado
-        return resultado
+        victoria, derrota, empate = self._resultados_dealer(prob_dist)
+        j = indice_carta(carta_dealer.valor)
+        return (float(victoria[valor_jugador, j]), float(derrota[valor_jugador, j]), float(empate[valor_jugador, j]))
+
+    def _visitar_nodo(self):
+        self.nodos_decision += 1
+
+    def _tabla_valores(self, prob_dist: np.ndarray) -> TablaValores:
+        """Tabla de valores del jugador para prob_dist, una por distribución y para todas las cartas del dealer."""
+        clave = self._clave_dist(prob_dist)
+        if clave in self.memo_valor_estado:
+            return self.memo_valor_estado[clave]
+        victoria, derrota, empate = self._resultados_dealer(prob_dist)
+        plantarse = (victoria * self.recompensas['victoria'] + derrota * self.recompensas['derrota'] +
+                     empate * self.recompensas['empate'])
+        tabla = resolver_tabla(prob_dist, plantarse, self.recompensas['derrota'], self._visitar_nodo)
+        self.memo_valor_estado[clave] = tabla
+        return tabla
 
     def _get_valor_estado(self, mano_jugador: Mano, carta_dealer: Carta, prob_dist: np.ndarray) -> float:
         # CAMBIO: La recompensa por pasarse ahora usa el diccionario de recompensas
         if mano_jugador.valor_total > 21:
             return self.recompensas['derrota']
-        estado_key = (mano_jugador.valor_total, mano_jugador.es_blanda, len(mano_jugador.cartas), carta_dealer.valor, tuple(prob_dist))
-        if estado_key in self.memo_valor_estado:
-            return self.memo_valor_estado[estado_key]
-        ev_plantarse = self._calcular_ev_plantarse(mano_jugador.valor_total, carta_dealer, prob_dist)
-        ev_pedir = self._calcular_ev_pedir(mano_jugador, carta_dealer, prob_dist)
-        valor_optimo = max(ev_plantarse, ev_pedir)
-        self.memo_valor_estado[estado_key] = valor_optimo
-        return valor_optimo
+        tabla = self._tabla_valores(prob_dist)
+        total, blanda = estado_mano(mano_jugador)
+        return tabla.ev(tabla.valor, total, blanda, carta_dealer)
 
     def _calcular_ev_plantarse(self, valor_jugador: int, carta_dealer: Carta, prob_dist: np.ndarray) -> float:
         prob_victoria, prob_derrota, prob_empate = self._get_outcome_probabilities(valor_jugador, carta_dealer, prob_dist)
@@ -140,33 +152,17 @@ class AgenteMarkov_prob_estable_por_umbral(Agente):
                 prob_empate * self.recompensas['empate'])
 
     def _calcular_ev_doblar(self, mano_jugador: Mano, carta_dealer: Carta, prob_dist: np.ndarray) -> float:
-        ev_total = 0.0
         # CAMBIO: La penalización por no poder doblar usa el diccionario de recompensas
         if np.sum(prob_dist) == 0: return self.recompensas['derrota'] * 2
+        # Una carta y plantarse, con la apuesta doble
+        tabla = self._tabla_valores(prob_dist)
+        total, blanda = estado_mano(mano_jugador)
+        return tabla.ev(tabla.doblar, total, blanda, carta_dealer) * 2
 
-        for i, prob_carta in enumerate(prob_dist):
-            if prob_carta > 0:
-                valor_carta = 11 if i == 0 else (10 if i == 9 else i + 1)
-                nueva_mano = Mano(mano_jugador.cartas + [Carta(Palo.PICAS, Rango.from_valor(valor_carta))])
-                prob_victoria, prob_derrota, prob_empate = self._get_outcome_probabilities(nueva_mano.valor_total, carta_dealer, prob_dist)
-                # CAMBIO: El EV se calcula usando el diccionario de recompensas y se duplica
-                ev_una_carta = (prob_victoria * self.recompensas['victoria'] + 
-                                prob_derrota * self.recompensas['derrota'] + 
-                                prob_empate * self.recompensas['empate'])
-                ev_total += prob_carta * (ev_una_carta * 2)
-        return ev_total
-        
     def _calcular_ev_pedir(self, mano_jugador: Mano, carta_dealer: Carta, prob_dist: np.ndarray) -> float:
-        ev_total = 0.0
-        if np.sum(prob_dist) == 0:
-            return self._calcular_ev_plantarse(mano_jugador.valor_total, carta_dealer, prob_dist)
-        for i, prob_carta in enumerate(prob_dist):
-            if prob_carta > 0:
-                valor_carta = 11 if i == 0 else (10 if i == 9 else i + 1)
-                nueva_mano = Mano(mano_jugador.cartas + [Carta(Palo.PICAS, Rango.from_valor(valor_carta))])
-                valor_siguiente_estado = self._get_valor_estado(nueva_mano, carta_dealer, prob_dist)
-                ev_total += prob_carta * valor_siguiente_estado
-        return ev_total
+        tabla = self._tabla_valores(prob_dist)
+        total, blanda = estado_mano(mano_jugador)
+        return tabla.ev(tabla.pedir, total, blanda, carta_dealer)
         
     def _calcular_ev_dividir(self, mano_jugador: Mano, carta_dealer: Carta, prob_dist: np.ndarray) -> float:
         # CORRECCIÓN: Acceder al valor de la carta correctamente
@@ -176,6 +172,7 @@ class AgenteMarkov_prob_estable_por_umbral(Agente):
         ev_mano = self._get_valor_estado(mano_dividida, carta_dealer, prob_dist)
         return ev_mano * 2
 
+    @contar_nodos
     def decidir_accion(self, mano: Mano, carta_dealer: Carta) -> Accion:
         if mano.es_blackjack or mano.valor_total > 21:
             return Accion.PLANTARSE
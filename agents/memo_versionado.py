@@ -0,0 +1,52 @@
+"""
+Retención de memos por versión del vector de probabilidades.
+
+Los agentes por umbral e híbrido solo cambian `prob_dist_actual` cuando
+`_actualizar_probabilidades` cruza un umbral (la mitad o cero de algún valor).
+Cada cambio es una versión nueva: las entradas de los memos se guardan bajo la
+clave de la distribución que las generó y se conservan mientras la versión no
+cambie, así que entre umbrales casi toda decisión es un acierto. Al pasar a una
+versión nueva se desalojan las claves de las versiones que quedan fuera de las
+VERSIONES_RETENIDAS más recientes, y los memos quedan acotados.
+
+Dentro de un zapato las cartas solo salen y una distribución vieja no vuelve,
+por eso alcanza con retener la vigente. Las recompensas no entran en la clave:
+cambiarlas vacía la tabla de valores del jugador (`_invalidar_valores`).
+"""
+
+from collections import OrderedDict
+
+
+class MemosPorVersion:
+    """
+    Mixin para agentes con TelemetriaMarkov (va antes en las bases). La subclase llama
+    a _nueva_version_dist(clave) en _actualizar_probabilidades y arma las claves de
+    las distribuciones que no son la vigente con _clave_version().
+    """
+    VERSIONES_RETENIDAS = 1
+    MEMOS_POR_RECOMPENSAS = ('memo_valor_estado',)
+
+    def __init__(self, jugador):
+        self.version_dist = 0
+        self._claves_por_version = OrderedDict()
+        super().__init__(jugador)
+
+    def _nueva_version_dist(self, clave):
+        """Registra la distribución vigente y desaloja las claves de las versiones viejas."""
+        self.version_dist += 1
+        self._claves_por_version[self.version_dist] = {clave}
+        while len(self._claves_por_version) > self.VERSIONES_RETENIDAS:
+            _, claves = self._claves_por_version.popitem(last=False)
+            for memo in self._memos().values():
+                for clave_vieja in claves:
+                    memo.desalojar(clave_vieja)
+
+    def _clave_version(self, clave):
+        """Anota en la versión vigente una clave de otra distribución (para desalojarla con ella)."""
+        self._claves_por_version[self.version_dist].add(clave)
+        return clave
+
+    def _invalidar_valores(self):
+        """Vacía los memos que dependen de las recompensas."""
+        for nombre in self.MEMOS_POR_RECOMPENSAS:
+            getattr(self, nombre).clear()
@@ -0,0 +1,257 @@
+"""
+Motor de EV por Monte Carlo para los agentes Markov, alternativo a la búsqueda exacta.
+
+La recursión exacta crece con la cantidad de mazos (el árbol del dealer se recorre
+con la composición exacta cada vez que falta una clave agrupada) y con las manos
+que piden muchas cartas. Este motor estima el EV de cada acción con muestras
+vectorizadas en NumPy, sacadas sin reposición de las cartas restantes:
+
+- Números aleatorios comunes: todas las acciones juegan las mismas cartas (el
+  jugador las toma desde el principio de la secuencia y el dealer desde el final),
+  así las diferencias entre acciones tienen mucha menos varianza que los EV.
+- Muestreo antitético: cada secuencia sale de u y su pareja de 1 - u; la unidad
+  de muestra es el promedio del par.
+- Corte temprano: por lotes, hasta que el intervalo de confianza de la diferencia
+  entre la mejor acción y cada una de las demás no contiene el cero (o hasta
+  max_muestras).
+
+Después de pedir (y en cada mano al dividir) el jugador sigue la estrategia básica
+en lugar del óptimo de la búsqueda: el EV de pedir es el de esa política, una cota
+inferior del exacto. El dealer se planta en todos los 17, como en la recursión.
+
+`SeleccionMotorEV` deja que el agente elija el motor en cada decisión:
+'exacto', 'montecarlo' o 'auto' (Monte Carlo solo cuando la clave agrupada del
+zapato todavía no se resolvió y el costo estimado de la búsqueda exacta supera
+costo_maximo_nodos).
+"""
+
+import numpy as np
+from core.acciones import Accion
+from .dp_jugador import TOTAL_MAXIMO, VALORES_POR_INDICE, estado_mano
+from .estrategia_basica import CARTAS_DEALER, TABLA_FIJA
+
+CARTAS_POR_MUESTRA = 24  # el jugador usa las primeras y el dealer las últimas
+CARTAS_JUGADOR = 12
+PLANTARSE_DEALER = 17
+_VALORES = np.array(VALORES_POR_INDICE)
+
+
+def tabla_pide(estrategia) -> np.ndarray:
+    """PIDE[blanda, total, carta del dealer (2..11)]: si la estrategia pide con más de dos cartas."""
+    pide = np.zeros((2, TOTAL_MAXIMO + 1, 12), dtype=bool)
+    for blanda in (0, 1):
+        for total in range(2, TOTAL_MAXIMO):
+            for dealer in CARTAS_DEALER:
+                pide[blanda, total, dealer] = estrategia.pide_carta(total, bool(blanda), dealer)
+    return pide
+
+
+PIDE = tabla_pide(TABLA_FIJA)
+
+
+def _sumar_carta(total: np.ndarray, blanda: np.ndarray, valor: np.ndarray, activas: np.ndarray):
+    """siguiente_estado vectorizado; solo cambia las filas activas."""
+    es_as = valor == 11
+    as_once = es_as & (total + 11 <= TOTAL_MAXIMO)
+    nuevo = np.where(es_as, np.where(as_once, total + 11, total + 1), total + valor)
+    nueva_blanda = blanda | as_once
+    baja = (nuevo > TOTAL_MAXIMO) & nueva_blanda
+    nuevo = np.where(baja, nuevo - 10, nuevo)
+    nueva_blanda = nueva_blanda & ~baja
+    return np.where(activas, nuevo, total), np.where(activas, nueva_blanda, blanda)
+
+
+def _resultado(total_jugador: np.ndarray, total_dealer: np.ndarray) -> np.ndarray:
+    """+1, 0 o -1 por muestra, al plantarse con total_jugador."""
+    pasado = total_jugador > TOTAL_MAXIMO
+    dealer_pasado = total_dealer > TOTAL_MAXIMO
+    comparacion = np.sign(total_jugador - total_dealer).astype(float)
+    return np.where(pasado, -1.0, np.where(dealer_pasado, 1.0, comparacion))
+
+
+class MotorMonteCarlo:
+    """Estimador de EV por acción con números comunes, pares antitéticos y corte temprano."""
+
+    def __init__(self, muestras_lote: int = 256, max_muestras: int = 8192, z: float = 2.58, semilla: int = None,
+                 estrategia=None):
+        """
+        :param muestras_lote: pares antitéticos por lote.
+        :param max_muestras: pares antitéticos máximos por decisión.
+        :param z: cuantil normal del intervalo de confianza (2.58 = 99%).
+        :param semilla: semilla del generador (None = aleatoria).
+        :param estrategia: TablaEstrategia que se sigue después de pedir (None = la fija);
+                           p. ej. tabla_estrategia(num_mazos) de agents/tablas_estrategia.py.
+        """
+        self.pide = PIDE if estrategia is None else tabla_pide(estrategia)
+        self.muestras_lote = muestras_lote
+        self.max_muestras = max_muestras
+        self.z = z
+        self.rng = np.random.default_rng(semilla)
+        self.ultimas_muestras = 0
+        self.ultima_semiamplitud = {}
+
+    def _cartas(self, conteos: np.ndarray, u: np.ndarray) -> np.ndarray:
+        """Valores de las cartas de cada fila, sacadas sin reposición por la inversa de la acumulada."""
+        restantes = np.tile(conteos, (len(u), 1))
+        filas = np.arange(len(u))
+        valores = np.empty(u.shape, dtype=int)
+        for j in range(u.shape[1]):
+            acumulada = np.cumsum(restantes, axis=1)
+            objetivo = u[:, j] * acumulada[:, -1]
+            indices = np.minimum((acumulada <= objetivo[:, None]).sum(axis=1), len(conteos) - 1)
+            valores[:, j] = _VALORES[indices]
+            restantes[filas, indices] -= 1
+        return valores
+
+    def _jugar(self, cartas: np.ndarray, mano, carta_dealer, acciones) -> dict:
+        """Resultado de cada acción en cada muestra (mismas cartas para todas)."""
+        n = len(cartas)
+        dealer = carta_dealer.valor
+        total_d = np.full(n, dealer)
+        blanda_d = np.full(n, dealer == 11)
+        for j in range(CARTAS_POR_MUESTRA - CARTAS_JUGADOR):
+            total_d, blanda_d = _sumar_carta(total_d, blanda_d, cartas[:, -1 - j], total_d < PLANTARSE_DEALER)
+
+        def seguir(total, blanda, desde):
+            for j in range(desde, CARTAS_JUGADOR):
+                pide = self.pide[blanda.astype(int), np.minimum(total, TOTAL_MAXIMO), dealer] & (total <= TOTAL_MAXIMO)
+                if not pide.any():
+                    break
+                total, blanda = _sumar_carta(total, blanda, cartas[:, j], pide)
+            return total
+
+        total, blanda = estado_mano(mano)
+        total_0 = np.full(n, total)
+        blanda_0 = np.full(n, blanda)
+        resultados = {}
+        if Accion.PLANTARSE in acciones:
+            resultados[Accion.PLANTARSE] = _resultado(total_0, total_d)
+        if Accion.PEDIR in acciones or Accion.DOBLAR in acciones:
+            total_1, blanda_1 = _sumar_carta(total_0, blanda_0, cartas[:, 0], np.ones(n, dtype=bool))
+            if Accion.DOBLAR in acciones:
+                resultados[Accion.DOBLAR] = 2 * _resultado(total_1, total_d)
+            if Accion.PEDIR in acciones:
+                resultados[Accion.PEDIR] = _resultado(seguir(total_1, blanda_1, 1), total_d)
+        if Accion.DIVIDIR in acciones:
+            valor = mano.cartas[0].valor
+            total_div, blanda_div = np.full(n, valor), np.full(n, valor == 11)
+            resultados[Accion.DIVIDIR] = 2 * _resultado(seguir(total_div, blanda_div, 0), total_d)
+        return resultados
+
+    def evaluar(self, conteos, mano, carta_dealer, acciones, fijas: dict = None) -> dict:
+        """
+        EV estimado de cada acción, o None si el zapato no alcanza para una muestra.
+
+        :param conteos: cartas restantes por índice (0 = As, 9 = 10).
+        :param acciones: acciones a estimar (PLANTARSE, PEDIR, DOBLAR, DIVIDIR).
+        :param fijas: acciones con EV conocido (p. ej. RENDIRSE: -0.5), cuentan para el corte.
+        """
+        conteos = np.asarray(conteos, dtype=int)
+        if conteos.sum() < CARTAS_POR_MUESTRA:
+            return None
+        fijas = fijas or {}
+        unidades = {accion: [] for accion in acciones}
+        pares = 0
+        while pares < self.max_muestras:
+            u = self.rng.random((self.muestras_lote, CARTAS_POR_MUESTRA))
+            directo = self._jugar(self._cartas(conteos, u), mano, carta_dealer, acciones)
+            antitetico = self._jugar(self._cartas(conteos, 1.0 - u), mano, carta_dealer, acciones)
+            for accion in acciones:
+                unidades[accion].append((directo[accion] + antitetico[accion]) / 2)
+            pares += self.muestras_lote
+            muestras = {accion: np.concatenate(lotes) for accion, lotes in unidades.items()}
+            if self._separadas(muestras, fijas, pares):
+                break
+
+        self.ultimas_muestras = 2 * pares
+        self.ultima_semiamplitud = {accion: self.z * m.std(ddof=1) / np.sqrt(pares) for accion, m in muestras.items()}
+        evs = {accion: float(m.mean()) for accion, m in muestras.items()}
+        evs.update(fijas)
+        return evs
+
+    def _separadas(self, muestras: dict, fijas: dict, pares: int) -> bool:
+        """True si el intervalo de la diferencia entre la mejor acción y cada otra excluye el cero."""
+        medias = {accion: m.mean() for accion, m in muestras.items()}
+        medias.update(fijas)
+        mejor = max(medias, key=medias.get)
+        for accion in medias:
+            if accion == mejor:
+                continue
+            if mejor in fijas and accion in fijas:
+                continue
+            if mejor in fijas or accion in fijas:
+                muestreada = muestras[accion if mejor in fijas else mejor]
+                dispersion = muestreada.std(ddof=1)
+            else:
+                dispersion = (muestras[mejor] - muestras[accion]).std(ddof=1)
+            if medias[mejor] - medias[accion] <= self.z * dispersion / np.sqrt(pares):
+                return False
+        return True
+
+
+class SeleccionMotorEV:
+    """
+    Mixin para agentes con PodaProbabilidad (va antes en las bases). La subclase llama
+    a configurar_motor() en __init__ antes de resetear_conteo, implementa
+    _clave_memo_actual() (la clave agrupada del zapato) y decide con
+    _decidir_con_motor() en lugar de _decidir_con_poda().
+    """
+
+    def configurar_motor(self, motor: str = 'exacto', costo_maximo_nodos: int = 20000, **opciones_mc):
+        """
+        :param motor: 'exacto', 'montecarlo' o 'auto'.
+        :param costo_maximo_nodos: en 'auto', nodos estimados desde los que conviene Monte Carlo.
+        :param opciones_mc: argumentos de MotorMonteCarlo (muestras_lote, max_muestras, z, semilla, estrategia).
+        """
+        if motor not in ('exacto', 'montecarlo', 'auto'):
+            raise ValueError(f"Motor de EV desconocido: {motor}")
+        self.motor_ev = motor
+        self.costo_maximo_nodos = costo_maximo_nodos
+        self.motor_mc = MotorMonteCarlo(**opciones_mc) if motor != 'exacto' else None
+        self.costo_frio_estimado = None  # nodos de una decisión exacta con la clave agrupada sin resolver
+        self._claves_resueltas = set()
+        self.decisiones_montecarlo = 0
+
+    def _usar_montecarlo(self, clave) -> bool:
+        if self.motor_ev != 'auto':
+            return self.motor_ev == 'montecarlo'
+        if clave in self._claves_resueltas or self.costo_frio_estimado is None:
+            return False
+        return self.costo_frio_estimado > self.costo_maximo_nodos
+
+    def _decidir_con_motor(self, mano, carta_dealer):
+        clave = (self._clave_memo_actual(), carta_dealer.valor)
+        if self._usar_montecarlo(clave):
+            accion = self._elegir_accion_montecarlo(mano, carta_dealer)
+            if accion is not None:
+                return accion
+
+        fria = clave not in self._claves_resueltas
+        nodos_antes = self.nodos_decision
+        accion = self._decidir_con_poda(mano, carta_dealer)
+        if fria:
+            # Promedio móvil del costo de las decisiones exactas con la clave sin resolver
+            nodos = self.nodos_decision - nodos_antes
+            previo = self.costo_frio_estimado
+            self.costo_frio_estimado = nodos if previo is None else 0.8 * previo + 0.2 * nodos
+            self._claves_resueltas.add(clave)
+        return accion
+
+    def _elegir_accion_montecarlo(self, mano, carta_dealer):
+        acciones = [Accion.PLANTARSE, Accion.PEDIR]
+        fijas = {}
+        if len(mano.cartas) == 2:
+            acciones.append(Accion.DOBLAR)
+            if mano.cartas[0].rango == mano.cartas[1].rango:
+                acciones.append(Accion.DIVIDIR)
+            fijas[Accion.RENDIRSE] = -0.5
+        evs = self.motor_mc.evaluar(self._conteo_busqueda().conteos, mano, carta_dealer, acciones, fijas)
+        if evs is None:
+            return None
+        self.decisiones_montecarlo += 1
+        self._ev_ultima_busqueda = evs
+        return max(evs, key=evs.get)
+
+    def _cerrar_zapato(self):
+        super()._cerrar_zapato()
+        self._claves_resueltas.clear()
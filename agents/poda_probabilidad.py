@@ -0,0 +1,114 @@
+"""
+Poda por probabilidad de camino, con cota de error, para los agentes Markov que
+recorren el árbol del dealer con la composición exacta del zapato.
+
+La mayor parte de los nodos de una decisión está en ese árbol (no tiene memo
+interno: cada clave agrupada que falta lo recorre entero). Con un umbral de poda,
+una rama cuya probabilidad acumulada desde la carta visible queda por debajo del
+umbral no se expande y su masa se descarta: la distribución final suma 1 - m.
+
+Como los EV de plantarse son victoria - derrota con recompensas de ±1, la masa
+que falta cambia un EV de plantarse en a lo sumo m, y pedir (esperanzas y máximos
+de esos EV) también en a lo sumo m. Doblar y dividir apuestan el doble (2m) y
+rendirse es fijo. Con recompensas más grandes (AgenteMarkov_arriesgado gana o
+pierde 2) las cotas se multiplican por ESCALA_RECOMPENSA. Los valores del jugador
+van por carta visible, así que con la mayor masa descartada en el zapato para esa
+carta (los memos duran un zapato: todo valor guardado salió de esas distribuciones)
+queda una cota del error de cada acción por decisión. Si con esa cota la acción
+elegida podría cambiar por otra, la decisión se repite sin poda, sobre memos exactos aparte
+(que también duran el zapato) para no mezclar valores podados con exactos.
+
+    agente = AgenteMarkov_normal(jugador, num_mazos=8, umbral_poda=1e-4)
+    agente.cota_error_ultima_decision, agente.decisiones_exactas
+
+Con presupuesto de tiempo o de nodos la decisión ya es aproximada y no se verifica.
+"""
+
+from core.acciones import Accion
+from .telemetria_cache import MemoInstrumentado
+
+ESCALA_ERROR = {Accion.DOBLAR: 2.0, Accion.DIVIDIR: 2.0, Accion.RENDIRSE: 0.0}
+
+
+class PodaProbabilidad:
+    """
+    Mixin para agentes con TelemetriaMarkov y DecisionAnytime (va antes que
+    TelemetriaMarkov en las bases). La subclase llama a configurar_poda() en
+    __init__ antes de resetear_conteo, consulta _podar(prob_camino) antes de
+    expandir una rama del dealer, pasa cada distribución del dealer nueva por
+    _registrar_dist_dealer(), guarda los EV de _elegir_accion en _ev_ultima_busqueda
+    (con RENDIRSE si está disponible) y decide con _decidir_con_poda() en lugar de
+    _decidir_anytime().
+    """
+    MEMOS_CHECKPOINT = ('_memos_exactos',)
+    # Mayor recompensa (en valor absoluto) de plantarse: la masa m mueve su EV en a lo sumo m por esto
+    ESCALA_RECOMPENSA = 1.0
+
+    def configurar_poda(self, umbral: float = None, verificar: bool = True):
+        """
+        :param umbral: probabilidad de camino mínima para expandir una rama del dealer (None = sin poda).
+        :param verificar: si True, repite sin poda las decisiones que la cota podría cambiar.
+        """
+        self.umbral_poda = umbral
+        self.verificar_poda = verificar
+        self._poda_activa = umbral is not None
+        self._memos_exactos = {nombre: MemoInstrumentado() for nombre in self.MEMOS}
+        self._ev_ultima_busqueda = None
+        self.masa_descartada_max = {}  # por valor de la carta visible del dealer
+        self.cota_error_ultima_decision = 0.0
+        self.decisiones_exactas = 0
+
+    def _podar(self, prob_camino: float) -> bool:
+        return self._poda_activa and prob_camino < self.umbral_poda
+
+    def _registrar_dist_dealer(self, dist: dict, valor_visible: int) -> dict:
+        """Anota la masa que la poda dejó afuera de una distribución del dealer recién calculada."""
+        if self._poda_activa:
+            masa = 1.0 - sum(dist.values())
+            if masa > self.masa_descartada_max.get(valor_visible, 0.0):
+                self.masa_descartada_max[valor_visible] = masa
+        return dist
+
+    def _cotas_error(self, carta_dealer) -> dict:
+        masa = self.masa_descartada_max.get(carta_dealer.valor, 0.0)
+        return {accion: masa * self.ESCALA_RECOMPENSA * ESCALA_ERROR.get(accion, 1.0) for accion in self._ev_ultima_busqueda}
+
+    def _podria_cambiar(self, elegida, carta_dealer) -> bool:
+        """True si, con las cotas de error, otra acción podría superar a la elegida."""
+        evs, cotas = self._ev_ultima_busqueda, self._cotas_error(carta_dealer)
+        piso = evs[elegida] - cotas[elegida]
+        return any(evs[accion] + cotas[accion] >= piso for accion in evs if accion != elegida)
+
+    def _decidir_con_poda(self, mano, carta_dealer):
+        self._ev_ultima_busqueda = None
+        accion = self._decidir_anytime(mano, carta_dealer)
+        if not self._poda_activa or self._ev_ultima_busqueda is None:
+            self.cota_error_ultima_decision = 0.0
+            return accion
+        self.cota_error_ultima_decision = max(self._cotas_error(carta_dealer).values())
+        con_presupuesto = self.presupuesto_ms is not None or self.presupuesto_nodos is not None
+        if self.verificar_poda and not con_presupuesto and self._podria_cambiar(accion, carta_dealer):
+            accion = self._elegir_accion_exacta(mano, carta_dealer)
+            self.cota_error_ultima_decision = 0.0
+        return accion
+
+    def _elegir_accion_exacta(self, mano, carta_dealer):
+        """Búsqueda completa sin poda sobre los memos exactos del zapato."""
+        self.decisiones_exactas += 1
+        podados = {nombre: getattr(self, nombre) for nombre in self.MEMOS}
+        for nombre, memo in self._memos_exactos.items():
+            setattr(self, nombre, memo)
+        self._poda_activa = False
+        try:
+            return self._elegir_accion(mano, carta_dealer)
+        finally:
+            self._poda_activa = True
+            for nombre, memo in podados.items():
+                setattr(self, nombre, memo)
+
+    def _cerrar_zapato(self):
+        super()._cerrar_zapato()
+        for memo in self._memos_exactos.values():
+            dict.clear(memo)
+            memo.reiniciar_contadores()
+        self.masa_descartada_max.clear()
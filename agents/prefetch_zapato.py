@@ -0,0 +1,199 @@
+"""
+Precálculo especulativo al barajar para los agentes Markov con memo agrupado.
+
+Las primeras rondas de cada zapato encuentran los memos vacíos y son las decisiones
+más lentas. Con el prefetch activado, `resetear_conteo` lanza un hilo que resuelve
+de antemano las decisiones de todas las manos de dos cartas contra todas las cartas
+del dealer, ordenadas de la más probable a la menos probable, primero con la
+composición inicial del zapato y después con dos vecinas: el zapato con un bucket
+menos de cartas bajas y con un bucket menos de altas (hacia donde suele moverse la
+clave agrupada en las primeras rondas).
+
+Las búsquedas del hilo y las decisiones del agente se turnan con un candado, así
+nunca recorren los memos a la vez. Una decisión que llega con el hilo a mitad de
+una mano lo interrumpe con el límite de tiempo de DecisionAnytime (lo vence en el
+acto): el hilo suelta el candado en el nodo siguiente, los subárboles que ya había
+terminado quedan en el memo y retoma esa mano después de la decisión. Por el GIL el hilo no agrega CPU: sirve cuando el agente
+tiene tiempo muerto entre decisiones (juego interactivo, otros jugadores lentos);
+en una simulación que corre sin pausas compite con ella y conviene dejarlo apagado.
+Las consultas del hilo cuentan en las estadísticas de los memos; sus nodos van a
+`prefetch_nodos`, no a los de las decisiones (mientras el hilo busca, nodos_decision
+cambia: la última decisión se lee con estadisticas_cache(), que toma el candado).
+"""
+
+import math
+import time
+import functools
+import logging
+import threading
+from core.player import Mano
+from core.cartas import Carta, Rango, Palo
+from .decision_anytime import PresupuestoAgotado
+
+VALORES_POR_INDICE = (11, 2, 3, 4, 5, 6, 7, 8, 9, 10)
+INDICES_BAJAS = (1, 2, 3, 4, 5)
+INDICES_ALTAS = (9,)
+
+
+def _quitar_bucket(conteo, indices: tuple, precision: int):
+    """Copia del conteo con un bucket (total / precision cartas) menos del grupo dado."""
+    vecino = conteo.copia()
+    for _ in range(math.ceil(conteo.total / precision)):
+        disponibles = [i for i in indices if vecino.conteos[i] > 0]
+        if not disponibles:
+            break
+        vecino.quitar(max(disponibles, key=lambda i: vecino.conteos[i]))
+    return vecino
+
+
+def _manos_por_probabilidad(conteo) -> list:
+    """(mano, carta_dealer) de dos cartas sin blackjack, de la más a la menos probable."""
+    total = conteo.total
+    if total == 0:
+        return []
+    prob = [c / total for c in conteo.conteos]
+    unidades = []
+    for i in range(len(prob)):
+        for j in range(i, len(prob)):
+            p_mano = prob[i] * prob[j] * (1 if i == j else 2)
+            mano = Mano([Carta(Palo.PICAS, Rango.from_valor(VALORES_POR_INDICE[i])),
+                         Carta(Palo.PICAS, Rango.from_valor(VALORES_POR_INDICE[j]))])
+            if p_mano == 0 or mano.es_blackjack:
+                continue
+            for d in range(len(prob)):
+                if prob[d] > 0:
+                    carta_dealer = Carta(Palo.CORAZONES, Rango.from_valor(VALORES_POR_INDICE[d]))
+                    unidades.append((p_mano * prob[d], mano, carta_dealer))
+    unidades.sort(key=lambda unidad: unidad[0], reverse=True)
+    return [(mano, carta_dealer) for _, mano, carta_dealer in unidades]
+
+
+def turno_busqueda(decidir_accion):
+    """Decorador de decidir_accion (por fuera de contar_nodos): interrumpe al hilo y toma el candado."""
+    @functools.wraps(decidir_accion)
+    def envoltura(self, *args, **kwargs):
+        self._decisiones_esperando += 1
+        self._limite_tiempo = 0.0  # si el hilo está buscando, corta en el próximo nodo
+        try:
+            with self._candado_busqueda:
+                self._limite_tiempo = None
+                return decidir_accion(self, *args, **kwargs)
+        finally:
+            self._decisiones_esperando -= 1
+    return envoltura
+
+
+class PrefetchZapato:
+    """
+    Mixin para agentes con DecisionAnytime y ConZapatoCompartido. La subclase llama a
+    configurar_prefetch() en __init__, a _detener_prefetch() al principio de
+    resetear_conteo y a _lanzar_prefetch() al final, decora decidir_accion con
+    @turno_busqueda y arma la búsqueda de _elegir_accion sobre _conteo_busqueda().
+    """
+    NO_CHECKPOINT = ('_candado_busqueda', '_cancelar_prefetch', '_hilo_prefetch', '_conteo_prefetch')
+
+    def configurar_prefetch(self, activo: bool = False, precision_agrupacion: int = 20):
+        """
+        :param activo: si True, cada zapato nuevo lanza el precálculo en segundo plano.
+        :param precision_agrupacion: precisión de la clave agrupada, para armar las vecinas.
+        """
+        self.prefetch = activo
+        self._precision_prefetch = precision_agrupacion
+        self._candado_busqueda = threading.Lock()
+        self._decisiones_esperando = 0
+        self._hilo_prefetch = None
+        self._cancelar_prefetch = threading.Event()
+        self._conteo_prefetch = None
+        self.prefetch_estados = 0
+        self.prefetch_nodos = 0
+        self.prefetch_segundos = 0.0
+
+    def estado_checkpoint(self, incluir_memos: bool = False) -> dict:
+        if incluir_memos:
+            # El hilo no puede seguir escribiendo en los memos mientras se guardan:
+            # se corta el precálculo de este zapato (el próximo zapato lanza otro)
+            self._detener_prefetch()
+        return super().estado_checkpoint(incluir_memos)
+
+    def restaurar_checkpoint(self, estado: dict):
+        self._detener_prefetch()
+        super().restaurar_checkpoint(estado)
+        self._lanzar_prefetch()
+
+    def _conteo_busqueda(self):
+        """Copia del conteo sobre la que trabaja una búsqueda: la foto del zapato en el hilo de prefetch."""
+        if self._conteo_prefetch is not None and threading.current_thread() is self._hilo_prefetch:
+            return self._conteo_prefetch.copia()
+        return self.conteo_zapato.copia()
+
+    def estadisticas_cache(self) -> dict:
+        with self._candado_busqueda:
+            return super().estadisticas_cache()
+
+    def _lanzar_prefetch(self):
+        if not self.prefetch:
+            return
+        self._cancelar_prefetch = threading.Event()
+        self._hilo_prefetch = threading.Thread(target=self._prefetch, args=(self.conteo_zapato.copia(), self._cancelar_prefetch),
+                                               name=f"prefetch-{self.jugador.nombre}", daemon=True)
+        self._hilo_prefetch.start()
+
+    def _detener_prefetch(self):
+        """Corta el precálculo del zapato anterior (en el próximo nodo que visite el hilo)."""
+        hilo = self._hilo_prefetch
+        if hilo is not None and hilo.is_alive():
+            self._cancelar_prefetch.set()
+            self._limite_tiempo = 0.0
+            hilo.join()
+            self._limite_tiempo = None
+        self._hilo_prefetch = None
+
+    def esperar_prefetch(self, timeout: float = None) -> bool:
+        """Espera a que termine el precálculo del zapato actual. Devuelve True si terminó."""
+        hilo = self._hilo_prefetch
+        if hilo is not None:
+            hilo.join(timeout)
+            return not hilo.is_alive()
+        return True
+
+    def _prefetch(self, conteo_inicial, cancelar: threading.Event):
+        fotos = [conteo_inicial,
+                 _quitar_bucket(conteo_inicial, INDICES_BAJAS, self._precision_prefetch),
+                 _quitar_bucket(conteo_inicial, INDICES_ALTAS, self._precision_prefetch)]
+        inicio = time.perf_counter()
+        try:
+            for foto in fotos:
+                for mano, carta_dealer in _manos_por_probabilidad(foto):
+                    while not self._resolver_mano(foto, mano, carta_dealer):
+                        if cancelar.is_set():
+                            return
+                    self.prefetch_estados += 1
+                    if cancelar.is_set():
+                        return
+        except Exception as e:
+            logging.warning(f"Prefetch de {self.jugador.nombre} interrumpido: {e}")
+        finally:
+            self.prefetch_segundos += time.perf_counter() - inicio
+
+    def _resolver_mano(self, foto, mano, carta_dealer) -> bool:
+        """Busca la mano hasta terminarla o hasta que la interrumpan. Devuelve True si la terminó."""
+        # Cede el turno a las decisiones del agente
+        while self._decisiones_esperando:
+            time.sleep(0.0005)
+        with self._candado_busqueda:
+            # Primero se limpia el límite y después se mira si hay decisiones esperando:
+            # una que llegue entre medio vuelve a vencerlo y la búsqueda corta enseguida
+            self._limite_tiempo = None
+            if self._decisiones_esperando or self._cancelar_prefetch.is_set():
+                return False
+            nodos_antes = self.nodos_decision
+            self._conteo_prefetch = foto
+            try:
+                self._elegir_accion(mano, carta_dealer)
+                return True
+            except PresupuestoAgotado:
+                return False
+            finally:
+                self._conteo_prefetch = None
+                self.prefetch_nodos += self.nodos_decision - nodos_antes
+                self.nodos_decision = nodos_antes
@@ -0,0 +1,201 @@
+"""
+Estrategia básica generada para las reglas de Casino, de 1 a 8 mazos o con mazo infinito,
+guardada en disco la primera vez que se pide.
+
+Para cada carta visible del dealer y cada mano inicial de dos cartas se resuelven
+con la composición que queda (zapato sin esas tres cartas) la tabla de valores del
+jugador (agents/dp_jugador.py) y la distribución del dealer (agents/dp_dealer.py).
+Cada fila de duras y blandas elige la acción con mejor EV promediado sobre las
+manos de dos cartas con ese total, pesadas por su probabilidad, y para las manos de
+más cartas compara plantarse con pedir (los códigos de agents/estrategia_basica.py:
+D/d, R/r). Un par se divide si dos veces el EV de jugar una mitad supera a la mejor
+acción sin dividir; la mitad puede doblar, rendirse o sacar blackjack (en Casino, A
+y 10 después de dividir paga 3:2), y no se cuenta volver a dividir.
+
+Las tablas se guardan como JSON en CARPETA_TABLAS con la versión y un hash de las
+reglas en el nombre, así un cambio en cualquiera de las dos genera tablas nuevas sin
+pisar las viejas. Dentro del proceso quedan en memoria después de la primera carga.
+
+    tabla = tabla_estrategia(num_mazos=6)
+    tabla.accion(mano, carta_dealer), tabla.pide_carta(total, blanda, carta_dealer)
+"""
+
+import os
+import json
+import hashlib
+import numpy as np
+from core.composicion import Composicion
+from .dp_jugador import TOTAL_MAXIMO, VALORES_POR_INDICE, siguiente_estado, resolver_tabla
+from .dp_dealer import distribucion_final, probabilidades_resultado
+from .estrategia_basica import CARTAS_DEALER, TablaEstrategia
+
+CARPETA_TABLAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tablas")
+MAZOS_INFINITOS = None
+
+# Se incrementa cuando cambia la forma de generar las tablas
+VERSION_TABLAS = 1
+
+# Reglas de core/casino.py que cambian la estrategia; todo entra en el hash del archivo
+REGLAS = {
+    "version": VERSION_TABLAS,
+    "dealer_17_blando": "se planta",
+    "mira_carta_oculta": False,
+    "pago_blackjack": 1.5,
+    "blackjack_despues_de_dividir": True,
+    "doblar": "dos cartas, también después de dividir",
+    "rendicion": "media apuesta, dos cartas",
+}
+
+PAGO_BLACKJACK = REGLAS["pago_blackjack"]
+PAGO_RENDIRSE = -0.5
+LETRAS = ("S", "H", "D", "R")  # orden de los EV de _evs_dos_cartas
+DURAS = range(4, TOTAL_MAXIMO + 1)
+BLANDAS = range(12, TOTAL_MAXIMO + 1)
+
+_CARGADAS = {}
+
+
+def _estado(*indices) -> tuple:
+    total, blanda = 0, False
+    for indice in indices:
+        total, blanda = siguiente_estado(total, blanda, VALORES_POR_INDICE[indice])
+    return total, blanda
+
+
+class _Resolutor:
+    """Tablas del jugador y del dealer por composición, para un zapato finito o infinito."""
+
+    def __init__(self, num_mazos):
+        self.infinito = num_mazos is MAZOS_INFINITOS
+        self.zapato = np.array(Composicion.zapato(1 if self.infinito else num_mazos).conteos, dtype=float)
+        self._memo = {}
+
+    def quitar(self, conteos: np.ndarray, *indices) -> np.ndarray:
+        if self.infinito:
+            return conteos
+        conteos = conteos.copy()
+        for indice in indices:
+            conteos[indice] -= 1
+        return conteos
+
+    def resolver(self, conteos: np.ndarray) -> tuple:
+        """(TablaValores, distribución final del dealer) con esta composición."""
+        clave = tuple(conteos)
+        resultado = self._memo.get(clave)
+        if resultado is None:
+            prob_dist = conteos / conteos.sum()
+            dist = distribucion_final(prob_dist)
+            victoria, derrota, _ = probabilidades_resultado(dist)
+            resultado = (resolver_tabla(prob_dist, victoria - derrota, -1.0), dist)
+            self._memo[clave] = resultado
+        return resultado
+
+
+def _evs_dos_cartas(tabla, dist, total: int, blanda: bool, visible: int) -> np.ndarray:
+    """EV de plantarse, pedir, doblar y rendirse con dos cartas (S, H, D, R)."""
+    if total == TOTAL_MAXIMO:
+        plantarse = PAGO_BLACKJACK * (1.0 - dist[visible, TOTAL_MAXIMO])
+    else:
+        plantarse = tabla.plantarse[total, visible]
+    return np.array([plantarse,
+                     tabla.pedir[int(blanda), total, visible],
+                     2 * tabla.doblar[int(blanda), total, visible],
+                     PAGO_RENDIRSE])
+
+
+def _codigo_fila(evs: np.ndarray) -> str:
+    """Código de la fila: la mejor acción con dos cartas y, si es doblar o rendirse, qué hacer con más."""
+    letra = LETRAS[int(np.argmax(evs))]
+    pide_con_mas = evs[1] > evs[0]
+    if letra == "D" and not pide_con_mas:
+        return "d"
+    if letra == "R" and not pide_con_mas:
+        return "r"
+    return letra
+
+
+def generar_tabla(num_mazos=MAZOS_INFINITOS) -> TablaEstrategia:
+    """
+    Estrategia básica óptima por total para las reglas de Casino (sin caché).
+
+    :param num_mazos: mazos del zapato, o MAZOS_INFINITOS (sin efecto de las cartas que salen).
+    """
+    resolutor = _Resolutor(num_mazos)
+    duras = {total: [] for total in DURAS}
+    blandas = {total: [] for total in BLANDAS}
+    pares = {valor: [] for valor in sorted(set(VALORES_POR_INDICE))}
+
+    for valor_dealer in CARTAS_DEALER:
+        visible = VALORES_POR_INDICE.index(valor_dealer)
+        base = resolutor.quitar(resolutor.zapato, visible)
+        suma_evs = {}
+        for a in range(len(VALORES_POR_INDICE)):
+            for b in range(a, len(VALORES_POR_INDICE)):
+                peso = base[a] * resolutor.quitar(base, a)[b] * (1 if a == b else 2)
+                if peso <= 0:
+                    continue
+                conteos = resolutor.quitar(base, a, b)
+                tabla, dist = resolutor.resolver(conteos)
+                total, blanda = _estado(a, b)
+                evs = _evs_dos_cartas(tabla, dist, total, blanda, visible)
+                suma_evs[(blanda, total)] = suma_evs.get((blanda, total), 0.0) + peso * evs
+                if a == b:
+                    prob_dist = conteos / conteos.sum()
+                    mitad = sum(p * _evs_dos_cartas(tabla, dist, *_estado(a, c), visible).max()
+                                for c, p in enumerate(prob_dist) if p > 0)
+                    par = "P" if 2 * mitad > evs.max() else LETRAS[int(np.argmax(evs))]
+                    pares[VALORES_POR_INDICE[a]].append(par)
+
+        # Totales sin manos de dos cartas (21 duro): plantarse o pedir con el zapato sin la visible
+        tabla_base, _ = resolutor.resolver(base)
+        for blanda, filas in ((False, duras), (True, blandas)):
+            for total, fila in filas.items():
+                evs = suma_evs.get((blanda, total))
+                if evs is None:
+                    pide = tabla_base.pedir[int(blanda), total, visible] > tabla_base.plantarse[total, visible]
+                    fila.append("H" if pide else "S")
+                else:
+                    fila.append(_codigo_fila(evs))
+
+    return TablaEstrategia({total: "".join(fila) for total, fila in duras.items()},
+                           {total: "".join(fila) for total, fila in blandas.items()},
+                           {valor: "".join(fila) for valor, fila in pares.items()})
+
+
+def clave_reglas() -> str:
+    return hashlib.sha256(json.dumps(REGLAS, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def ruta_tabla(num_mazos=MAZOS_INFINITOS, carpeta: str = CARPETA_TABLAS) -> str:
+    nombre = "infinito" if num_mazos is MAZOS_INFINITOS else f"{num_mazos}_mazos"
+    return os.path.join(carpeta, f"estrategia_v{VERSION_TABLAS}_{nombre}_{clave_reglas()}.json")
+
+
+def tabla_estrategia(num_mazos=MAZOS_INFINITOS, carpeta: str = CARPETA_TABLAS) -> TablaEstrategia:
+    """
+    Tabla de estrategia básica para num_mazos (1 a 8, o MAZOS_INFINITOS): de memoria,
+    del archivo o generada y guardada si todavía no existe.
+    """
+    ruta = ruta_tabla(num_mazos, carpeta)
+    tabla = _CARGADAS.get(ruta)
+    if tabla is not None:
+        return tabla
+
+    if not os.path.exists(ruta):
+        tabla = generar_tabla(num_mazos)
+        # Se escribe en un archivo temporal y se renombra al final,
+        # así un proceso interrumpido no deja una tabla a medias.
+        os.makedirs(carpeta, exist_ok=True)
+        ruta_tmp = f"{ruta}.{os.getpid()}.tmp"
+        with open(ruta_tmp, "w") as f:
+            json.dump({"reglas": REGLAS, "num_mazos": num_mazos, "duras": tabla.duras,
+                       "blandas": tabla.blandas, "pares": tabla.pares}, f, indent=4, ensure_ascii=False)
+        os.replace(ruta_tmp, ruta)
+    else:
+        with open(ruta) as f:
+            datos = json.load(f)
+        tabla = TablaEstrategia(*({int(clave): fila for clave, fila in datos[nombre].items()}
+                                  for nombre in ("duras", "blandas", "pares")))
+
+    _CARGADAS[ruta] = tabla
+    return tabla
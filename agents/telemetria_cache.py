@@ -0,0 +1,155 @@
+"""
+Telemetría de cachés para los agentes de la familia Markov.
+
+Cada memo de un agente es un `MemoInstrumentado`: un dict que cuenta aciertos y
+fallos en cada `clave in memo` (el patrón que usan todos los agentes) y desalojos
+cuando se vacía con `clear()` o se saca una entrada con `desalojar()`. `TelemetriaMarkov` agrega además el conteo de nodos
+de recursión por decisión y guarda una foto de las estadísticas por zapato, que se
+puede volcar a un archivo JSON por línea:
+
+    agente.estadisticas_cache()            # zapato en curso
+    agente.telemetria_por_zapato           # zapatos ya terminados
+    agente.volcar_telemetria("telemetria.jsonl")
+
+Vaciar los memos al barajar no cuenta como desalojo: cierra el zapato.
+"""
+
+import sys
+import json
+import functools
+
+
+def _tamano_aproximado(objeto) -> int:
+    """sys.getsizeof recorriendo tuplas, listas y dicts (las claves y valores de los memos)"""
+    tamano = sys.getsizeof(objeto)
+    if isinstance(objeto, dict):
+        tamano += sum(_tamano_aproximado(k) + _tamano_aproximado(v) for k, v in objeto.items())
+    elif isinstance(objeto, (tuple, list)):
+        tamano += sum(_tamano_aproximado(elemento) for elemento in objeto)
+    return tamano
+
+
+class MemoInstrumentado(dict):
+    """dict que cuenta aciertos, fallos (consultas con `in`) y desalojos (`clear` y `desalojar`)."""
+
+    def __init__(self):
+        super().__init__()
+        self.reiniciar_contadores()
+
+    def reiniciar_contadores(self):
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def __contains__(self, clave) -> bool:
+        if dict.__contains__(self, clave):
+            self.aciertos += 1
+            return True
+        self.fallos += 1
+        return False
+
+    def clear(self):
+        self.desalojos += len(self)
+        dict.clear(self)
+
+    def desalojar(self, clave):
+        """Saca una entrada (si está) contándola como desalojo."""
+        if dict.pop(self, clave, None) is not None:
+            self.desalojos += 1
+
+    def bytes_aproximados(self) -> int:
+        return _tamano_aproximado(self)
+
+    def estadisticas(self) -> dict:
+        consultas = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'desalojos': self.desalojos,
+            'entradas': len(self),
+            'bytes': self.bytes_aproximados(),
+            'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+        }
+
+
+def contar_nodos(decidir_accion):
+    """Decorador para decidir_accion: reinicia el contador de nodos y registra la decisión."""
+    @functools.wraps(decidir_accion)
+    def envoltura(self, *args, **kwargs):
+        self.nodos_decision = 0
+        accion = decidir_accion(self, *args, **kwargs)
+        self._registrar_decision()
+        return accion
+    return envoltura
+
+
+class TelemetriaMarkov:
+    """
+    Mixin para los agentes Markov. La subclase declara en MEMOS los nombres de sus
+    memos (se crean como MemoInstrumentado), suma 1 a self.nodos_decision en cada
+    nodo de sus recursiones, decora decidir_accion con @contar_nodos y llama a
+    _cerrar_zapato() desde resetear_conteo en lugar de vaciar los memos.
+    """
+    MEMOS = ()
+
+    def __init__(self, jugador):
+        super().__init__(jugador)
+        for nombre in self.MEMOS:
+            setattr(self, nombre, MemoInstrumentado())
+        self.telemetria_por_zapato = []
+        self.nodos_decision = 0
+        self._reiniciar_contadores_decision()
+
+    def _reiniciar_contadores_decision(self):
+        self.decisiones = 0
+        self.nodos_total = 0
+        self.nodos_max = 0
+
+    def _registrar_decision(self):
+        self.decisiones += 1
+        self.nodos_total += self.nodos_decision
+        self.nodos_max = max(self.nodos_max, self.nodos_decision)
+
+    def _memos(self) -> dict:
+        return {nombre: getattr(self, nombre) for nombre in self.MEMOS}
+
+    def estadisticas_cache(self) -> dict:
+        """Estadísticas del zapato en curso: contadores por memo y nodos por decisión."""
+        return {
+            'agente': type(self).__name__,
+            'zapato': len(self.telemetria_por_zapato),
+            'memos': {nombre: memo.estadisticas() for nombre, memo in self._memos().items()},
+            'decisiones': self.decisiones,
+            'nodos_total': self.nodos_total,
+            'nodos_max': self.nodos_max,
+            'nodos_promedio': self.nodos_total / self.decisiones if self.decisiones else 0.0,
+            'nodos_ultima_decision': self.nodos_decision,
+        }
+
+    def estado_checkpoint(self, incluir_memos: bool = False) -> dict:
+        estado = super().estado_checkpoint(incluir_memos)
+        if not incluir_memos:
+            for nombre in self.MEMOS:
+                estado.pop(nombre, None)
+        return estado
+
+    def _cerrar_zapato(self):
+        """Guarda la foto del zapato que termina (si se usó) y deja los memos vacíos."""
+        memos = self._memos()
+        usado = self.decisiones or any(memo.aciertos or memo.fallos or len(memo) for memo in memos.values())
+        if usado:
+            self.telemetria_por_zapato.append(self.estadisticas_cache())
+        for memo in memos.values():
+            dict.clear(memo)
+            memo.reiniciar_contadores()
+        self.nodos_decision = 0
+        self._reiniciar_contadores_decision()
+
+    def volcar_telemetria(self, ruta: str, incluir_actual: bool = True):
+        """Agrega una línea JSON por zapato al archivo (los terminados y, opcionalmente, el actual)."""
+        zapatos = list(self.telemetria_por_zapato)
+        if incluir_actual:
+            zapatos.append(self.estadisticas_cache())
+        with open(ruta, "a") as f:
+            for zapato in zapatos:
+                f.write(json.dumps(zapato) + "\n")
@@ -0,0 +1,189 @@
+"""
+Historial de benchmarks y detección de regresiones.
+
+Cada corrida de benchmarks/suite.py se agrega como una línea JSON en el historial,
+con el commit y la huella de la máquina. `comparar` toma dos corridas de la misma
+máquina y, para cada benchmark, calcula un intervalo de confianza bootstrap del
+cociente de medianas (actual / base). Un benchmark es una regresión si el intervalo
+queda entero por debajo de 1 y la caída estimada supera el umbral.
+
+Las corridas hechas con cambios sin commit (meta["cambios_sin_commit"]) no miden el
+código del commit que registran, así que no se comparan salvo con --incluir-sin-commit.
+
+Uso:
+    python -m benchmarks.historial listar
+    python -m benchmarks.historial comparar --umbral 0.05
+    python -m benchmarks.historial comparar --base <commit> --actual <commit>
+    python -m benchmarks.historial comparar --incluir-sin-commit
+
+`comparar` sale con código 1 si hay regresiones y con 2 si no hay datos para comparar.
+"""
+
+import os
+import sys
+import json
+import argparse
+import numpy as np
+
+RUTA_HISTORIAL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "historial.jsonl")
+UMBRAL = 0.05
+CONFIANZA = 0.95
+NUM_BOOTSTRAP = 5000
+
+
+def agregar(reporte: dict, ruta: str = RUTA_HISTORIAL):
+    """Agrega una corrida (el dict que devuelve suite.ejecutar_suite) al final del historial."""
+    entrada = {
+        "commit": reporte["meta"]["commit"],
+        "maquina": reporte["meta"]["maquina"],
+        "fecha": reporte["meta"]["fecha"],
+        "meta": reporte["meta"],
+        "resultados": {r["nombre"]: {"unidad": r["unidad"], "muestras": r["muestras"]} for r in reporte["resultados"]},
+    }
+    carpeta = os.path.dirname(os.path.abspath(ruta))
+    os.makedirs(carpeta, exist_ok=True)
+    with open(ruta, "a") as f:
+        f.write(json.dumps(entrada) + "\n")
+
+
+def cargar(ruta: str = RUTA_HISTORIAL) -> list:
+    """Devuelve las corridas del historial en orden de agregado."""
+    if not os.path.exists(ruta):
+        return []
+    with open(ruta) as f:
+        return [json.loads(linea) for linea in f if linea.strip()]
+
+
+def sin_commit(entrada: dict) -> bool:
+    """True si la corrida se hizo con cambios sin commit en el árbol."""
+    return bool(entrada.get("meta", {}).get("cambios_sin_commit", False))
+
+
+def muestras_por_commit(historial: list, commit: str, maquina: str, incluir_sin_commit: bool = False) -> dict:
+    """
+    Junta las muestras de todas las corridas de un commit en una máquina: nombre -> lista.
+    Las corridas con cambios sin commit quedan afuera salvo con incluir_sin_commit.
+    """
+    muestras = {}
+    for entrada in historial:
+        if sin_commit(entrada) and not incluir_sin_commit:
+            continue
+        if entrada["maquina"] == maquina and entrada["commit"].startswith(commit):
+            for nombre, datos in entrada["resultados"].items():
+                muestras.setdefault(nombre, []).extend(datos["muestras"])
+    return muestras
+
+
+def bootstrap_cociente(base, actual, confianza: float = CONFIANZA, num_bootstrap: int = NUM_BOOTSTRAP,
+                       semilla: int = 0) -> tuple:
+    """
+    Intervalo bootstrap del cociente de medianas actual / base (métricas "por segundo":
+    un cociente menor a 1 es más lento).
+    :return: (cociente, inferior, superior)
+    """
+    rng = np.random.default_rng(semilla)
+    base, actual = np.asarray(base, dtype=float), np.asarray(actual, dtype=float)
+    medianas_base = np.median(rng.choice(base, (num_bootstrap, len(base))), axis=1)
+    medianas_actual = np.median(rng.choice(actual, (num_bootstrap, len(actual))), axis=1)
+    cocientes = medianas_actual / medianas_base
+    alfa = (1 - confianza) / 2
+    inferior, superior = np.quantile(cocientes, [alfa, 1 - alfa])
+    return float(np.median(actual) / np.median(base)), float(inferior), float(superior)
+
+
+def comparar(muestras_base: dict, muestras_actual: dict, umbral: float = UMBRAL,
+             confianza: float = CONFIANZA) -> list:
+    """
+    Compara dos conjuntos de muestras benchmark a benchmark.
+    :return: lista de dicts con nombre, cociente, intervalo y si es regresión.
+    """
+    filas = []
+    for nombre in sorted(set(muestras_base) & set(muestras_actual)):
+        cociente, inferior, superior = bootstrap_cociente(muestras_base[nombre], muestras_actual[nombre], confianza)
+        filas.append({
+            "nombre": nombre,
+            "cociente": cociente,
+            "inferior": inferior,
+            "superior": superior,
+            "regresion": superior < 1 and (1 - cociente) > umbral,
+            "mejora": inferior > 1 and (cociente - 1) > umbral,
+        })
+    return filas
+
+
+def elegir_commits(historial: list, base: str = None, actual: str = None, maquina: str = None,
+                   incluir_sin_commit: bool = False) -> tuple:
+    """
+    Por defecto compara la última corrida con la corrida anterior de otro commit en la misma máquina
+    (sin contar las corridas con cambios sin commit, salvo con incluir_sin_commit).
+    :return: (commit_base, commit_actual, maquina) o None si no hay con qué comparar.
+    """
+    historial = [e for e in historial if incluir_sin_commit or not sin_commit(e)]
+    if not historial:
+        return None
+    if actual is None:
+        ultima = next((e for e in reversed(historial) if maquina is None or e["maquina"] == maquina), None)
+        if ultima is None:
+            return None
+        actual, maquina = ultima["commit"], ultima["maquina"]
+    elif maquina is None:
+        maquina = next((e["maquina"] for e in reversed(historial) if e["commit"].startswith(actual)), None)
+    if base is None:
+        base = next((e["commit"] for e in reversed(historial)
+                     if e["maquina"] == maquina and not e["commit"].startswith(actual)), None)
+    if base is None or maquina is None:
+        return None
+    return base, actual, maquina
+
+
+def imprimir_comparacion(filas: list, base: str, actual: str, maquina: str, umbral: float):
+    print(f"Base: {base[:10]}  Actual: {actual[:10]}  Máquina: {maquina}  Umbral: {umbral:.0%}")
+    print(f"{'benchmark':55} {'actual/base':>11} {'IC':>17}")
+    for fila in filas:
+        marca = "  REGRESIÓN" if fila["regresion"] else ("  mejora" if fila["mejora"] else "")
+        print(f"{fila['nombre']:55} {fila['cociente']:11.3f} [{fila['inferior']:.3f}, {fila['superior']:.3f}]{marca}")
+    regresiones = [f for f in filas if f["regresion"]]
+    print(f"\n{len(regresiones)} regresiones de {len(filas)} benchmarks comparados")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Historial de benchmarks y comparación entre commits")
+    parser.add_argument("--historial", default=RUTA_HISTORIAL, help="Archivo del historial (JSON por línea)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    sub.add_parser("listar", help="Muestra las corridas guardadas")
+    parser_comparar = sub.add_parser("comparar", help="Compara dos commits y reporta regresiones")
+    parser_comparar.add_argument("--base", help="Commit base (por defecto, el anterior al actual)")
+    parser_comparar.add_argument("--actual", help="Commit a evaluar (por defecto, la última corrida)")
+    parser_comparar.add_argument("--maquina", help="Huella de la máquina (por defecto, la de la corrida actual)")
+    parser_comparar.add_argument("--umbral", type=float, default=UMBRAL, help="Caída mínima para fallar (0.05 = 5%%)")
+    parser_comparar.add_argument("--confianza", type=float, default=CONFIANZA, help="Nivel del intervalo bootstrap")
+    parser_comparar.add_argument("--incluir-sin-commit", action="store_true",
+                                 help="Usa también las corridas hechas con cambios sin commit")
+    args = parser.parse_args(argv)
+
+    historial = cargar(args.historial)
+
+    if args.comando == "listar":
+        for entrada in historial:
+            marca = "  (cambios sin commit)" if sin_commit(entrada) else ""
+            print(f"{entrada['fecha']}  {entrada['commit'][:10]}  {entrada['maquina']}  "
+                  f"{len(entrada['resultados'])} benchmarks{marca}")
+        return 0
+
+    commits = elegir_commits(historial, args.base, args.actual, args.maquina, args.incluir_sin_commit)
+    if commits is None:
+        print("No hay dos commits distintos de la misma máquina para comparar")
+        return 2
+    base, actual, maquina = commits
+    filas = comparar(muestras_por_commit(historial, base, maquina, args.incluir_sin_commit),
+                     muestras_por_commit(historial, actual, maquina, args.incluir_sin_commit),
+                     args.umbral, args.confianza)
+    if not filas:
+        print("Los commits no tienen benchmarks en común")
+        return 2
+    imprimir_comparacion(filas, base, actual, maquina, args.umbral)
+    return 1 if any(fila["regresion"] for fila in filas) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
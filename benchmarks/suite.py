@@ -0,0 +1,383 @@
+"""
+Suite de benchmarks del simulador.
+
+Mide, con semillas y zapatos fijos:
+    - Mazo: creación + barajado y reparto completo, y zapatos leídos de un banco pregenerado.
+    - Mano: acceso a valor_total / es_blanda / es_blackjack / es_divisible.
+    - Casino._jugar_ronda: rondas por segundo con cada clase de agente.
+    - decidir_accion: latencia p50/p99 de cada agente con 1, 4, 6 y 8 mazos.
+    - DataCollector: registros por segundo al registrar y al escribir a disco.
+
+Cada benchmark se repite varias veces y se guardan todas las muestras en un JSON,
+así dos corridas se pueden comparar entre commits.
+
+Cada corrida se agrega además al historial (benchmarks/historial.py), que permite
+comparar commits y detectar regresiones.
+
+Uso:
+    python -m benchmarks.suite --salida bench.json
+    python -m benchmarks.suite --rapido --filtro casino
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import logging
+import platform
+import argparse
+import datetime
+import subprocess
+import tempfile
+import contextlib
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.cartas import Mazo
+from core.banco_zapatos import generar_banco, BancoZapatos, MazoBanco
+from core.player import Jugador, Mano
+from core.casino import Casino
+from core.acciones import Accion
+from core.data_collector import DataCollector
+from agents.agente_aleatorio import AgenteAleatorio
+from agents.agente_A_5 import AgenteAleatorio_5
+from agents.agente_HiLo import AgenteHiLo
+from agents.markov import AgenteMarkov_normal, AgenteMarkov_arriesgado
+from agents.markov_umbral import AgenteMarkov_prob_estable_por_umbral
+from agents.markov_h import AgenteHibrido_Markov_HiLo
+from agents.markov_RL import AgenteMarkov_RL
+from agents.markovPoliticaApuestas import AgenteMarkov_PoliticaApuestas
+from benchmarks import historial
+
+SEMILLA = 1234
+VERSION_SUITE = 1
+CAPITAL = 10**12
+MAZOS_LATENCIA = [1, 4, 6, 8]
+# Tiempo mínimo por muestra: la carga de trabajo se calibra una vez para llegar a este tiempo
+TIEMPO_MINIMO = 0.2
+TIEMPO_MINIMO_RAPIDO = 0.05
+# Rondas mínimas en los benchmarks de latencia, para tener suficientes decisiones en p99
+RONDAS_MINIMAS_DECISION = 10
+
+MODELO_RF = "resultados/randomForestClass6/rf_action_clf.joblib"
+ENCODER_RF = "resultados/randomForestClass6/label_encoder.joblib"
+
+
+def _crear_random_forest(jugador, num_mazos):
+    from agents.agente_randomForest import AgenteRandomForest
+    return AgenteRandomForest(jugador, MODELO_RF, ENCODER_RF)
+
+
+# nombre -> fábrica(jugador, num_mazos). Los agentes que no dependen del número de mazos lo ignoran.
+AGENTES = {
+    "AgenteAleatorio": lambda jugador, num_mazos: AgenteAleatorio(jugador),
+    "AgenteAleatorio_5": lambda jugador, num_mazos: AgenteAleatorio_5(jugador),
+    "AgenteHiLo": lambda jugador, num_mazos: AgenteHiLo(jugador),
+    "AgenteMarkov_normal": lambda jugador, num_mazos: AgenteMarkov_normal(jugador, num_mazos=num_mazos),
+    "AgenteMarkov_arriesgado": lambda jugador, num_mazos: AgenteMarkov_arriesgado(jugador, num_mazos=num_mazos),
+    "AgenteMarkov_prob_estable_por_umbral": lambda jugador, num_mazos: AgenteMarkov_prob_estable_por_umbral(jugador, num_mazos=num_mazos),
+    "AgenteHibrido_Markov_HiLo": lambda jugador, num_mazos: AgenteHibrido_Markov_HiLo(jugador, num_mazos=num_mazos),
+    "AgenteMarkov_RL": lambda jugador, num_mazos: AgenteMarkov_RL(jugador, num_mazos=num_mazos),
+    "AgenteMarkov_PoliticaApuestas": lambda jugador, num_mazos: AgenteMarkov_PoliticaApuestas(jugador, num_mazos=num_mazos),
+    "AgenteRandomForest": _crear_random_forest,
+}
+
+
+def sembrar(semilla: int = SEMILLA):
+    """Fija las semillas de random y numpy para que cada muestra use los mismos zapatos."""
+    random.seed(semilla)
+    np.random.seed(semilla)
+
+
+def crear_agente(nombre: str, num_mazos: int = 4):
+    return AGENTES[nombre](Jugador(nombre, CAPITAL), num_mazos)
+
+
+def calibrar(funcion, tiempo_minimo: float, n_minimo: int = 1) -> int:
+    """
+    Busca cuántas iteraciones de `funcion(n)` hacen falta para que una muestra dure
+    al menos tiempo_minimo (como timeit.autorange). Se mide el tiempo total de la llamada,
+    incluida la preparación, así los benchmarks de latencia no crecen sin límite.
+    """
+    n = n_minimo
+    while True:
+        inicio = time.perf_counter()
+        funcion(n)
+        if time.perf_counter() - inicio >= tiempo_minimo or n >= 1 << 20:
+            return n
+        n *= 2
+
+
+# ========== BENCHMARKS ==========
+# Cada función recibe `n` (tamaño de la carga) y devuelve (segundos, operaciones, extra).
+
+def bench_mazo_barajar(n: int, num_mazos: int = 6):
+    sembrar()
+    inicio = time.perf_counter()
+    for _ in range(n):
+        Mazo(num_mazos=num_mazos)
+    return time.perf_counter() - inicio, n, {}
+
+
+def bench_mazo_repartir(n: int, num_mazos: int = 6):
+    sembrar()
+    mazos = [Mazo(num_mazos=num_mazos) for _ in range(n)]
+    cartas = sum(len(mazo) for mazo in mazos)
+    inicio = time.perf_counter()
+    for mazo in mazos:
+        while mazo.cartas:
+            mazo.repartir()
+    return time.perf_counter() - inicio, cartas, {}
+
+
+def bench_banco_zapato(n: int, num_mazos: int = 6):
+    """Zapatos sacados de un banco en disco (core/banco_zapatos.py), para comparar con mazo/barajar."""
+    with tempfile.TemporaryDirectory() as carpeta:
+        banco = BancoZapatos(generar_banco(os.path.join(carpeta, "banco.npy"), 1000, num_mazos, semilla=SEMILLA))
+        inicio = time.perf_counter()
+        for i in range(n):
+            MazoBanco(banco, i)
+        segundos = time.perf_counter() - inicio
+        del banco  # suelta la memoria mapeada antes de borrar la carpeta
+    return segundos, n, {}
+
+
+def _manos_fijas(cantidad: int = 256):
+    sembrar()
+    mazo = Mazo(num_mazos=8)
+    manos = []
+    for _ in range(cantidad):
+        num_cartas = random.randint(2, 5)
+        if len(mazo) < num_cartas:
+            mazo = Mazo(num_mazos=8)
+        manos.append(Mano([mazo.repartir() for _ in range(num_cartas)]))
+    return manos
+
+
+def bench_mano_propiedades(n: int):
+    manos = _manos_fijas()
+    inicio = time.perf_counter()
+    for _ in range(n):
+        for mano in manos:
+            mano.valor_total
+            mano.es_blanda
+            mano.es_blackjack
+            mano.es_divisible
+    return time.perf_counter() - inicio, n * len(manos) * 4, {}
+
+
+def bench_casino(n: int, agente: str, num_mazos: int = 4):
+    sembrar()
+    casino = Casino([crear_agente(agente, num_mazos)], num_mazos=num_mazos)
+    inicio = time.perf_counter()
+    for _ in range(n):
+        casino._jugar_ronda()
+    return time.perf_counter() - inicio, n, {}
+
+
+def bench_decision(n: int, agente: str, num_mazos: int):
+    """Juega n rondas y mide cada llamada a decidir_accion con el hook de decisión del Casino."""
+    sembrar()
+    casino = Casino([crear_agente(agente, num_mazos)], num_mazos=num_mazos)
+    latencias = []
+    casino.agregar_hook("decision", lambda agente, mano, carta_dealer, accion, segundos: latencias.append(segundos))
+    for _ in range(n):
+        casino._jugar_ronda()
+
+    latencias = np.array(latencias) * 1e6
+    extra = {
+        "p50_us": float(np.percentile(latencias, 50)) if len(latencias) else 0.0,
+        "p99_us": float(np.percentile(latencias, 99)) if len(latencias) else 0.0,
+    }
+    return float(latencias.sum() / 1e6), len(latencias), extra
+
+
+def _llenar_collector(collector: DataCollector, n: int):
+    sembrar()
+    agente = crear_agente("AgenteAleatorio")
+    mazo = Mazo(num_mazos=8)
+    manos = []
+    for _ in range(n):
+        if len(mazo) < 10:
+            mazo = Mazo(num_mazos=8)
+        mano = Mano([mazo.repartir(), mazo.repartir()])
+        mano.apuesta = 5
+        collector.registrar_decision(agente, mano, mazo.repartir(), random.choice(list(Accion)))
+        manos.append(mano)
+    return manos
+
+
+def bench_collector_registrar(n: int):
+    with tempfile.TemporaryDirectory() as carpeta:
+        collector = DataCollector(os.path.join(carpeta, "bench.csv"), chunk_size=n + 1)
+        inicio = time.perf_counter()
+        manos = _llenar_collector(collector, n)
+        for mano in manos:
+            collector.registrar_resultado(mano, 5)
+        return time.perf_counter() - inicio, n, {}
+
+
+def bench_collector_flush(n: int):
+    with tempfile.TemporaryDirectory() as carpeta:
+        collector = DataCollector(os.path.join(carpeta, "bench.csv"), chunk_size=n + 1)
+        manos = _llenar_collector(collector, n)
+        for registro in collector.registros:
+            registro["ganancia_neta"] = 5
+        del manos
+        inicio = time.perf_counter()
+        collector._flush_to_disk()
+        return time.perf_counter() - inicio, n, {}
+
+
+def definir_benchmarks() -> list:
+    """
+    Lista de (nombre, unidad, función(n) -> (segundos, operaciones, extra), n mínimo).
+    La unidad siempre es por segundo: mayor es mejor.
+    """
+    benchmarks = [
+        ("mazo/barajar_6", "mazos/s", bench_mazo_barajar, 1),
+        ("mazo/repartir_6", "cartas/s", bench_mazo_repartir, 1),
+        ("banco/zapato_6", "mazos/s", bench_banco_zapato, 1),
+        ("mano/propiedades", "accesos/s", bench_mano_propiedades, 1),
+        ("collector/registrar", "registros/s", bench_collector_registrar, 1),
+        ("collector/flush", "registros/s", bench_collector_flush, 1),
+    ]
+    for agente in AGENTES:
+        benchmarks.append((f"casino/{agente}", "rondas/s",
+                           lambda n, agente=agente: bench_casino(n, agente), 1))
+    for agente in AGENTES:
+        for num_mazos in MAZOS_LATENCIA:
+            benchmarks.append((f"decision/{agente}/{num_mazos}_mazos", "decisiones/s",
+                               lambda n, agente=agente, num_mazos=num_mazos: bench_decision(n, agente, num_mazos),
+                               RONDAS_MINIMAS_DECISION))
+    return benchmarks
+
+
+# ========== METADATOS ==========
+
+def commit_actual() -> str:
+    try:
+        salida = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        return salida.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def hay_cambios_sin_commit() -> bool:
+    try:
+        salida = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                                text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        return bool(salida.stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return False
+
+
+def huella_maquina() -> str:
+    """Identificador estable de la máquina (hardware + intérprete), sin datos personales."""
+    datos = [platform.system(), platform.machine(), platform.processor(), str(os.cpu_count()),
+             platform.python_implementation(), platform.python_version()]
+    return hashlib.sha256("|".join(datos).encode()).hexdigest()[:12]
+
+
+def metadatos(repeticiones: int, tiempo_minimo: float) -> dict:
+    return {
+        "version_suite": VERSION_SUITE,
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit_actual(),
+        "cambios_sin_commit": hay_cambios_sin_commit(),
+        "maquina": huella_maquina(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "semilla": SEMILLA,
+        "repeticiones": repeticiones,
+        "tiempo_minimo": tiempo_minimo,
+    }
+
+
+# ========== EJECUCIÓN ==========
+
+def ejecutar_benchmark(nombre: str, unidad: str, funcion, repeticiones: int, tiempo_minimo: float,
+                       n_minimo: int = 1) -> dict:
+    """Calibra la carga y toma `repeticiones` muestras de operaciones por segundo."""
+    n = calibrar(funcion, tiempo_minimo, n_minimo)
+    muestras = []
+    extras = []
+    for _ in range(repeticiones):
+        segundos, operaciones, extra = funcion(n)
+        muestras.append(operaciones / segundos if segundos > 0 else float("inf"))
+        extras.append(extra)
+
+    resultado = {
+        "nombre": nombre,
+        "unidad": unidad,
+        "n": n,
+        "mediana": float(np.median(muestras)),
+        "muestras": muestras,
+    }
+    # Las métricas extra (p50/p99) se resumen con la mediana entre repeticiones
+    for clave in extras[0]:
+        resultado[clave] = float(np.median([extra[clave] for extra in extras]))
+    return resultado
+
+
+def ejecutar_suite(repeticiones: int = 5, tiempo_minimo: float = TIEMPO_MINIMO, filtro: str = None) -> dict:
+    """
+    Ejecuta todos los benchmarks (o los que contienen `filtro` en el nombre).
+    Los agentes que no se pueden crear (por ejemplo sin el modelo de RandomForest) se reportan en 'omitidos'.
+    """
+    logging.disable(logging.CRITICAL)
+    resultados, omitidos = [], []
+    try:
+        for nombre, unidad, funcion, n_minimo in definir_benchmarks():
+            if filtro and filtro not in nombre:
+                continue
+            try:
+                # Los agentes imprimen mensajes propios; se descartan para no mezclarlos con el reporte
+                with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+                    resultado = ejecutar_benchmark(nombre, unidad, funcion, repeticiones, tiempo_minimo, n_minimo)
+            except (FileNotFoundError, ImportError) as e:
+                omitidos.append({"nombre": nombre, "motivo": str(e)})
+                print(f"[omitido] {nombre}: {e}")
+                continue
+            resultados.append(resultado)
+            linea = f"{nombre:55} {resultado['mediana']:14.1f} {unidad}"
+            if "p50_us" in resultado:
+                linea += f"  p50={resultado['p50_us']:.1f}us p99={resultado['p99_us']:.1f}us"
+            print(linea)
+    finally:
+        logging.disable(logging.NOTSET)
+    return {"meta": metadatos(repeticiones, tiempo_minimo), "resultados": resultados, "omitidos": omitidos}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del simulador de Blackjack")
+    parser.add_argument("--salida", help="Archivo JSON de salida (por defecto, solo se imprime)")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Muestras por benchmark")
+    parser.add_argument("--rapido", action="store_true", help="Muestras más cortas, para pruebas rápidas")
+    parser.add_argument("--filtro", help="Solo benchmarks cuyo nombre contenga este texto")
+    parser.add_argument("--historial", default=historial.RUTA_HISTORIAL,
+                        help="Historial donde se agrega la corrida (ver benchmarks/historial.py)")
+    parser.add_argument("--sin-historial", action="store_true", help="No agregar la corrida al historial")
+    args = parser.parse_args()
+
+    tiempo_minimo = TIEMPO_MINIMO_RAPIDO if args.rapido else TIEMPO_MINIMO
+    reporte = ejecutar_suite(args.repeticiones, tiempo_minimo, args.filtro)
+
+    if args.salida:
+        with open(args.salida, "w") as f:
+            json.dump(reporte, f, indent=4)
+        print(f"Resultados guardados en: {args.salida}")
+    else:
+        print(json.dumps(reporte["meta"], indent=4))
+
+    if not args.sin_historial:
+        historial.agregar(reporte, args.historial)
+        print(f"Corrida agregada al historial: {args.historial}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Banco de zapatos pregenerados para repetir las mismas cartas en muchas simulaciones.
+
+generar_banco escribe en un archivo .npy millones de zapatos barajados: por zapato,
+el código de cada carta (palo * 13 + rango, en el orden de Palo y Rango, un byte)
+y la posición de la tarjeta de corte (limite_barajado, con la misma distribución
+que Mazo). El archivo se abre como memoria mapeada, así que los procesos que usan
+el mismo banco comparten las páginas en el caché del sistema en lugar de barajar
+cada uno sus zapatos.
+
+MazoBanco reparte el zapato i del banco sin barajar ni crear cartas; al barajar,
+Casino le pide el siguiente zapato (ver Casino._nuevo_mazo):
+
+    generar_banco("zapatos_6.npy", num_zapatos=1_000_000, num_mazos=6, semilla=1)
+    banco = abrir_banco("zapatos_6.npy")
+    casino = Casino(agentes, num_mazos=6, mazo=MazoBanco(banco, 0))
+
+Para repartir un banco entre procesos, el proceso k de W arranca en el zapato k
+con paso W.
+"""
+
+import os
+import numpy as np
+from .cartas import Carta, Mazo, Palo, Rango
+
+# Las 52 cartas en el orden de los códigos; los zapatos del banco comparten estos objetos
+CARTAS = [Carta(palo=palo, rango=rango) for palo in Palo for rango in Rango]
+CARTAS_POR_MAZO = len(CARTAS)
+
+_ABIERTOS = {}
+
+
+def _dtype(num_mazos: int) -> np.dtype:
+    return np.dtype([("limite", "<i4"), ("cartas", "u1", (CARTAS_POR_MAZO * num_mazos,))])
+
+
+def generar_banco(ruta: str, num_zapatos: int, num_mazos: int = 6, zapato: float = 0.75,
+                  semilla: int = None, lote: int = 10_000) -> str:
+    """
+    Escribe num_zapatos zapatos barajados en `ruta` (.npy). Con la misma semilla y lote, el mismo banco.
+
+    :param zapato: Porcentaje de cartas que se juegan antes de barajar (como en Mazo).
+    :param lote: Zapatos barajados por vez; solo el lote está en memoria.
+
+    :raises ValueError: Si los parámetros no son válidos.
+    """
+    if num_zapatos < 1 or num_mazos < 1:
+        raise ValueError("El banco necesita al menos un zapato y un mazo.")
+    if not (0 < zapato <= 1):
+        raise ValueError("El zapato debe ser un valor entre 0 y 1.")
+
+    rng = np.random.default_rng(semilla)
+    n_cartas = CARTAS_POR_MAZO * num_mazos
+    cartas_sin_jugar = int(n_cartas * (1 - zapato))
+    ordenado = np.tile(np.arange(CARTAS_POR_MAZO, dtype=np.uint8), num_mazos)
+
+    # Se escribe en un archivo temporal y se renombra al final,
+    # así un proceso que lo esté leyendo nunca ve un banco a medias.
+    ruta_tmp = f"{ruta}.tmp"
+    banco = np.lib.format.open_memmap(ruta_tmp, mode="w+", dtype=_dtype(num_mazos), shape=(num_zapatos,))
+    for inicio in range(0, num_zapatos, lote):
+        fin = min(inicio + lote, num_zapatos)
+        cartas = np.tile(ordenado, (fin - inicio, 1))
+        rng.permuted(cartas, axis=1, out=cartas)
+        banco["cartas"][inicio:fin] = cartas
+        banco["limite"][inicio:fin] = rng.integers(int(cartas_sin_jugar * 0.6), cartas_sin_jugar + 1, size=fin - inicio)
+    banco.flush()
+    del banco
+    os.replace(ruta_tmp, ruta)
+    _ABIERTOS.pop(os.path.abspath(ruta), None)
+    return ruta
+
+
+class BancoZapatos:
+    def __init__(self, ruta: str):
+        """
+        Banco de zapatos de generar_banco, abierto como memoria mapeada de solo lectura.
+        Conviene abrirlo con abrir_banco, que lo abre una sola vez por proceso.
+        """
+        self.ruta = os.path.abspath(ruta)
+        self.zapatos = np.load(self.ruta, mmap_mode="r")
+        self.num_mazos = self.zapatos.dtype["cartas"].shape[0] // CARTAS_POR_MAZO
+
+    def __len__(self):
+        return len(self.zapatos)
+
+    def cartas(self, indice: int) -> np.ndarray:
+        """Códigos de las cartas del zapato, en orden de reparto."""
+        return self.zapatos["cartas"][indice]
+
+    def limite(self, indice: int) -> int:
+        return int(self.zapatos["limite"][indice])
+
+
+def abrir_banco(ruta: str) -> BancoZapatos:
+    ruta = os.path.abspath(ruta)
+    banco = _ABIERTOS.get(ruta)
+    if banco is None:
+        banco = BancoZapatos(ruta)
+        _ABIERTOS[ruta] = banco
+    return banco
+
+
+class MazoBanco(Mazo):
+    """
+    Mazo que reparte el zapato `indice` de un BancoZapatos, en su orden y sin barajar.
+    siguiente_zapato() devuelve el zapato indice + paso (vuelve al principio al
+    terminar el banco). Al guardarlo con pickle (checkpoints, procesos) se guarda
+    la ruta del banco y la posición, no las cartas.
+    """
+
+    def __init__(self, banco: BancoZapatos, indice: int = 0, paso: int = 1):
+        # Sin Mazo.__init__: no hay cartas que crear ni barajar. La lista va al revés
+        # porque Mazo.repartir saca la última.
+        self.banco = banco
+        self.indice = indice % len(banco)
+        self.paso = paso
+        self.num_mazos = banco.num_mazos
+        self.cartas = [CARTAS[codigo] for codigo in banco.cartas(self.indice)[::-1].tolist()]
+        self.limite_barajado = banco.limite(self.indice)
+
+    def barajar(self):
+        """El orden lo fija el banco; para otro orden se usa otro zapato."""
+
+    def siguiente_zapato(self) -> "MazoBanco":
+        return MazoBanco(self.banco, self.indice + self.paso, self.paso)
+
+    def __getstate__(self):
+        return {"ruta": self.banco.ruta, "indice": self.indice, "paso": self.paso, "quedan": len(self.cartas)}
+
+    def __setstate__(self, estado):
+        self.__init__(abrir_banco(estado["ruta"]), estado["indice"], estado["paso"])
+        del self.cartas[estado["quedan"]:]
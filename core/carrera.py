@@ -0,0 +1,207 @@
+"""
+Carrera entre muchas configuraciones candidatas de un agente, repartiendo las rondas
+según lo que ya se sabe de cada una.
+
+Cada candidato juega solo, con los mismos zapatos de un banco (core/banco_zapatos.py):
+el zapato k es el mismo para todos, así que la ganancia por zapato se compara de a
+pares (números aleatorios comunes) y las diferencias tienen mucha menos varianza que
+las ganancias sueltas. La carrera avanza por etapas: en cada una los candidatos que
+siguen en carrera juegan los zapatos nuevos (8, 16, 32, ... en total), repartidos
+entre procesos que comparten el banco por el caché de páginas, y después se
+descartan los dominados: un candidato sale cuando al menos `mejores` de los otros lo
+superan según la secuencia de confianza de core/comparacion_secuencial.py, que se
+puede mirar después de cada etapa sin inflar el error. Con `reduccion` además se
+queda, como en successive halving, solo con la mejor fracción 1/reduccion de cada
+etapa (más rápido, sin garantía estadística para los que salen por ese corte).
+
+    candidatos = {f"hibrido_{f}": partial(AgenteHibrido_Markov_HiLo, num_mazos=6, factor_riesgo_escala=f)
+                  for f in (0.0, 0.02, 0.05, 0.1, 0.2)}
+    resultado = Carrera(candidatos, "zapatos_6.npy", mejores=2, workers=8).correr()
+    print("\\n".join(resultado.resumen()))
+
+Las fábricas reciben el Jugador y devuelven el agente; con workers > 1 tienen que
+poder pasarse a otro proceso (clases o functools.partial, no lambdas).
+"""
+
+import math
+import random
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from .casino import Casino
+from .player import Jugador
+from .banco_zapatos import abrir_banco, MazoBanco
+from .comparacion_secuencial import radio_confianza
+
+CAPITAL = 10**12
+
+
+def jugar_zapatos(fabrica, ruta_banco: str, inicio: int, fin: int, nombre: str = "candidato") -> tuple:
+    """
+    Juega con un candidato los zapatos [inicio, fin) del banco, uno detrás de otro.
+    La ganancia es la de cada mano al pagarse (hook "pago" del Casino).
+
+    :return: (ganancia por zapato, rondas jugadas)
+    """
+    banco = abrir_banco(ruta_banco)
+    agente = fabrica(Jugador(nombre, CAPITAL))
+    casino = Casino([agente], num_mazos=banco.num_mazos, mazo=MazoBanco(banco, inicio))
+    ganancias = np.zeros(fin - inicio)
+    zapato = None
+
+    def sumar_pago(agente, mano, ganancia):
+        ganancias[zapato] += ganancia
+
+    casino.agregar_hook("pago", sumar_pago)
+    rondas = 0
+    while True:
+        # La ronda que sigue empieza un zapato nuevo si hay que barajar
+        siguiente = casino.mazo.indice + (1 if casino.mazo.necesita_barajar() else 0)
+        if siguiente >= fin:
+            break
+        if zapato != siguiente - inicio:
+            zapato = siguiente - inicio
+            # Los agentes con azar juegan igual cada zapato, sin importar cómo se repartan entre procesos
+            random.seed(siguiente)
+        casino._jugar_ronda()
+        rondas += 1
+    return ganancias, rondas
+
+
+class ResultadoCarrera:
+    """
+    ganancias: ganancia por zapato de cada candidato (los zapatos 0..n-1 que jugó).
+    ranking: los que terminaron en carrera, del mejor al peor por ganancia media.
+    eliminados: nombre -> (etapa, zapatos jugados, motivo).
+    """
+
+    def __init__(self, ganancias: dict, ranking: list, eliminados: dict, rondas: dict, etapas: int):
+        self.ganancias = ganancias
+        self.ranking = ranking
+        self.eliminados = eliminados
+        self.rondas = rondas
+        self.etapas = etapas
+
+    @property
+    def rondas_totales(self) -> int:
+        return sum(self.rondas.values())
+
+    @property
+    def rondas_sin_carrera(self) -> int:
+        """Rondas que hubiera costado jugar todos los candidatos hasta el final (estimadas)."""
+        zapatos_finales = max(len(ganancias) for ganancias in self.ganancias.values())
+        return sum(round(self.rondas[nombre] * zapatos_finales / len(self.ganancias[nombre]))
+                   for nombre in self.ganancias)
+
+    def media(self, nombre: str) -> float:
+        return float(self.ganancias[nombre].mean())
+
+    def resumen(self) -> list[str]:
+        lineas = [f"{posicion}. {nombre}: {self.media(nombre):+.2f} por zapato ({len(self.ganancias[nombre])} zapatos)"
+                  for posicion, nombre in enumerate(self.ranking, start=1)]
+        for nombre, (etapa, zapatos, motivo) in sorted(self.eliminados.items(), key=lambda item: -item[1][1]):
+            lineas.append(f"   {nombre}: fuera en la etapa {etapa} ({zapatos} zapatos, {motivo}), "
+                          f"{self.media(nombre):+.2f} por zapato")
+        lineas.append(f"Rondas jugadas: {self.rondas_totales} (sin carrera: ~{self.rondas_sin_carrera})")
+        return lineas
+
+
+class Carrera:
+    def __init__(self, candidatos: dict, ruta_banco: str, mejores: int = 1, confianza: float = 0.95,
+                 zapatos_iniciales: int = 8, crecimiento: float = 2, zapatos_maximos: int = None,
+                 zapatos_objetivo: int = 100, reduccion: float = None, workers: int = 1):
+        """
+        :param candidatos: nombre -> fábrica(jugador) del agente.
+        :param ruta_banco: Banco de zapatos (generar_banco); tiene que tener al menos zapatos_maximos.
+        :param mejores: Cuántos candidatos se buscan; la carrera termina cuando quedan esos.
+        :param confianza: Confianza conjunta de todas las eliminaciones por dominancia.
+        :param zapatos_iniciales: Zapatos de la primera etapa.
+        :param crecimiento: Factor por el que crecen los zapatos jugados en cada etapa.
+        :param zapatos_maximos: Tope de zapatos por candidato (por defecto, todo el banco).
+        :param zapatos_objetivo: Zapatos en los que el intervalo de las comparaciones queda más ajustado.
+        :param reduccion: Si se da, cada etapa deja además solo la mejor fracción 1/reduccion.
+        :param workers: Procesos para jugar los zapatos (1: en este proceso).
+
+        :raises ValueError: Si los parámetros no son válidos.
+        """
+        if len(candidatos) < 2:
+            raise ValueError("Hacen falta al menos dos candidatos.")
+        if not (1 <= mejores < len(candidatos)):
+            raise ValueError("mejores debe estar entre 1 y la cantidad de candidatos - 1.")
+        if crecimiento <= 1 or (reduccion is not None and reduccion <= 1):
+            raise ValueError("crecimiento y reduccion deben ser mayores que 1.")
+        self.candidatos = dict(candidatos)
+        self.ruta_banco = ruta_banco
+        self.mejores = mejores
+        self.zapatos_iniciales = max(zapatos_iniciales, 2)
+        self.crecimiento = crecimiento
+        total_banco = len(abrir_banco(ruta_banco))
+        self.zapatos_maximos = min(zapatos_maximos or total_banco, total_banco)
+        self.zapatos_objetivo = zapatos_objetivo
+        self.reduccion = reduccion
+        self.workers = workers
+        # Bonferroni sobre todos los pares que se pueden llegar a comparar
+        num_pares = len(candidatos) * (len(candidatos) - 1) // 2
+        self.alfa = (1 - confianza) / num_pares
+
+    def _tareas(self, vivos: list, inicio: int, fin: int) -> list:
+        """(nombre, inicio, fin) con los zapatos nuevos partidos para ocupar a todos los workers."""
+        partes = max(1, math.ceil(self.workers / len(vivos)))
+        tamano = max(1, math.ceil((fin - inicio) / partes))
+        return [(nombre, desde, min(desde + tamano, fin)) for nombre in vivos for desde in range(inicio, fin, tamano)]
+
+    def _jugar(self, tareas: list) -> list:
+        argumentos = [(self.candidatos[nombre], self.ruta_banco, desde, hasta, nombre) for nombre, desde, hasta in tareas]
+        if self.workers <= 1:
+            return [jugar_zapatos(*args) for args in argumentos]
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(jugar_zapatos, *zip(*argumentos)))
+
+    def _dominados(self, vivos: list, ganancias: dict, zapatos: int) -> dict:
+        """Candidatos superados con la confianza pedida por al menos `mejores` de los otros."""
+        dominados = {}
+        for nombre in vivos:
+            superado_por = []
+            for otro in vivos:
+                if otro == nombre:
+                    continue
+                diferencias = ganancias[otro] - ganancias[nombre]
+                varianza = diferencias.var(ddof=1)
+                if varianza == 0:
+                    # Diferencias todas iguales: el intervalo tendría ancho 0, todavía no se pueden separar
+                    continue
+                radio = radio_confianza(len(diferencias), varianza, self.alfa, self.zapatos_objetivo)
+                if diferencias.mean() - radio > 0:
+                    superado_por.append(otro)
+            if len(superado_por) >= self.mejores:
+                dominados[nombre] = f"superado por {', '.join(superado_por)}"
+        return dominados
+
+    def correr(self) -> ResultadoCarrera:
+        vivos = list(self.candidatos)
+        ganancias = {nombre: np.zeros(0) for nombre in vivos}
+        rondas = {nombre: 0 for nombre in vivos}
+        eliminados = {}
+        zapatos, etapa = 0, 0
+
+        while len(vivos) > self.mejores and zapatos < self.zapatos_maximos:
+            etapa += 1
+            nuevos = min(max(self.zapatos_iniciales, math.ceil(zapatos * self.crecimiento)), self.zapatos_maximos)
+            tareas = self._tareas(vivos, zapatos, nuevos)
+            for (nombre, _, _), (ganancia, rondas_tarea) in zip(tareas, self._jugar(tareas)):
+                ganancias[nombre] = np.concatenate([ganancias[nombre], ganancia])
+                rondas[nombre] += rondas_tarea
+            zapatos = nuevos
+
+            for nombre, motivo in self._dominados(vivos, ganancias, zapatos).items():
+                eliminados[nombre] = (etapa, zapatos, motivo)
+            vivos = [nombre for nombre in vivos if nombre not in eliminados]
+
+            if self.reduccion is not None and len(vivos) > self.mejores:
+                vivos.sort(key=lambda nombre: -ganancias[nombre].mean())
+                quedan = max(self.mejores, math.ceil(len(vivos) / self.reduccion))
+                for nombre in vivos[quedan:]:
+                    eliminados[nombre] = (etapa, zapatos, "reducción")
+                vivos = vivos[:quedan]
+
+        ranking = sorted(vivos, key=lambda nombre: -ganancias[nombre].mean())
+        return ResultadoCarrera(ganancias, ranking, eliminados, rondas, etapa)
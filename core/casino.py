@@ -1,11 +1,25 @@
 import logging
+import os
+import time
 from .acciones import Accion
 from .player import Jugador, Mano
 from .cartas import Mazo, Carta
 from .data_collector import DataCollector
+from .composicion import ConteoZapato
+from .checkpoint import guardar_checkpoint, cargar_checkpoint, restaurar_checkpoint
 from agents.agente_base import Agente
 
 
+# Eventos a los que se pueden registrar hooks y los argumentos que reciben:
+#   inicio_ronda(casino)
+#   fin_ronda(casino)
+#   fase(nombre_fase, segundos)          -> preparacion, apuestas, reparto, jugadores, dealer, pagos
+#   decision(agente, mano, carta_dealer, accion, segundos)
+#   barajado(casino, motivo)             -> motivo: "zapato" o "emergencia"
+#   pago(agente, mano, ganancia)
+EVENTOS = ("inicio_ronda", "fin_ronda", "fase", "decision", "barajado", "pago")
+
+
 class Casino:
     def __init__(self, agentes: list[Agente], num_mazos: int = 4, zapato: float = 0.75, mazo: Mazo = None, data_collector: DataCollector = None):
 
@@ -25,25 +39,66 @@ class Casino:
         else:
             self.mazo = Mazo(num_mazos=num_mazos, zapato=zapato)
 
+        # evento -> lista de funciones. Los eventos sin hooks no miden tiempos ni llaman nada.
+        self.hooks = {evento: [] for evento in EVENTOS}
+
+        # Conteo compartido: se actualiza una vez por carta y los agentes que lo aceptan lo leen
+        # por referencia. Solo se notifica carta por carta a los que implementan su propio observar_carta.
+        self.conteo_zapato = ConteoZapato(num_mazos)
+        self.observadores = [agente for agente in agentes
+                             if not agente.conectar_zapato(self.conteo_zapato)
+                             and type(agente).observar_carta is not Agente.observar_carta]
+
+    def agregar_hook(self, evento: str, funcion):
+        """
+        Registra una función que se llama cuando ocurre el evento (ver EVENTOS).
+        :raises ValueError: Si el evento no existe.
+        """
+        if evento not in self.hooks:
+            raise ValueError(f"Evento desconocido: {evento}. Eventos válidos: {', '.join(EVENTOS)}")
+        self.hooks[evento].append(funcion)
+
+    def quitar_hook(self, evento: str, funcion):
+        """
+        Elimina un hook registrado con agregar_hook.
+        """
+        if evento in self.hooks and funcion in self.hooks[evento]:
+            self.hooks[evento].remove(funcion)
+
+    def _emitir(self, evento: str, *args):
+        for funcion in self.hooks[evento]:
+            funcion(*args)
+
     def _notificar_observadores(self, carta: Carta):
-        for agente in self.agentes:
-                # Solo los que tienen implementado observar haran algo
-                agente.observar_carta(carta)
+        self.conteo_zapato.observar(carta)
+        for agente in self.observadores:
+            agente.observar_carta(carta)
     
     def _resetear_conteo_agentes(self):
         """
         Notifica a los agentes que se ha barajado el mazo
         """
+        self.conteo_zapato.reiniciar()
         for agente in self.agentes:
             if hasattr(agente, 'resetear_conteo'):
                 agente.resetear_conteo()
                 # Registramos en el logger del Casino
                 self.logger.info(
-                    "Conteo de cartas de '%s' reseteado a %d",
+                    "Conteo de cartas de '%s' reseteado a %s",
                     agente.jugador.nombre,
                     getattr(agente, 'conteo', None)
                 )
 
+    def _nuevo_mazo(self) -> Mazo:
+        """
+        Zapato nuevo al barajar. Si el mazo actual sabe cuál sigue (MazoBanco, ver
+        core/banco_zapatos.py) se usa ese; si no, se baraja un Mazo nuevo.
+        """
+        siguiente_zapato = getattr(self.mazo, "siguiente_zapato", None)
+        if siguiente_zapato is not None:
+            return siguiente_zapato()
+        return Mazo(num_mazos=self.num_mazos, zapato=self.zapato)
+
     def _repartir_carta_segura(self) -> Carta:
         """
         Intenta repartir una carta. Si el mazo está vacío, lo baraja,
@@ -53,28 +108,49 @@ class Casino:
             return self.mazo.repartir()
         except IndexError:
             self.logger.warning("Mazo vacío a mitad de ronda. Barajando de emergencia...")
-            self.mazo = Mazo(num_mazos=self.num_mazos, zapato=self.zapato)
+            self.mazo = self._nuevo_mazo()
             self.logger.info("Mazo barajado - Reseteando conteos de agentes.")
             self._resetear_conteo_agentes()
+            if self.hooks["barajado"]:
+                self._emitir("barajado", self, "emergencia")
             return self.mazo.repartir()
 
+    def _marcar_fase(self, nombre: str, inicio: float) -> float:
+        """
+        Emite la duración de la fase que empezó en `inicio` y devuelve el inicio de la siguiente.
+        Solo se llama si hay hooks de fase registrados.
+        """
+        ahora = time.perf_counter()
+        self._emitir("fase", nombre, ahora - inicio)
+        return ahora
+
     def _jugar_ronda(self):
         self.logger.info("------ INICIO DE RONDA ------")
+        if self.hooks["inicio_ronda"]:
+            self._emitir("inicio_ronda", self)
+        medir_fases = bool(self.hooks["fase"])
+        medir_decisiones = bool(self.hooks["decision"])
+        if medir_fases:
+            inicio_fase = time.perf_counter()
         #1. Fase de Preparacion
         self.logger.info("*** Fase de preparación: Barajando y reseteando manos. ***")
 
         # Barajar el mazo si es necesario (Crearlo de nuevo)
         if self.mazo.necesita_barajar():
-            self.mazo = Mazo(num_mazos=self.num_mazos, zapato=self.zapato)
+            self.mazo = self._nuevo_mazo()
             # Notificar a los agentes que se ha barajado
             self._resetear_conteo_agentes()
             self.logger.info("Mazo barajado - Conteos reseteados")
+            if self.hooks["barajado"]:
+                self._emitir("barajado", self, "zapato")
         self.logger.info("No fue necesario barajar el mazo.")
         self.logger.info("*** Fin de Fase de Preparacion. ***\n")
 
         for agente in self.agentes:
             agente.jugador.reset_manos()
         self.dealer.reset_manos()
+        if medir_fases:
+            inicio_fase = self._marcar_fase("preparacion", inicio_fase)
 
         #2. Fase de Apuestas
         self.logger.info("*** Fase de apuestas: Jugadores deciden sus apuestas. ***")
@@ -89,6 +165,8 @@ class Casino:
                 print(f"Jugador '{agente.jugador.nombre}' no puede apostar ${apuesta}. Capital: ${agente.jugador.capital}")
                 self.logger.info(f"Jugador '{agente.jugador.nombre}' no puede apostar ${apuesta}. Capital: ${agente.jugador.capital}")
         self.logger.info("*** Fin de Fase de Apuestas. ***\n")
+        if medir_fases:
+            inicio_fase = self._marcar_fase("apuestas", inicio_fase)
 
         #3. Fase de Reparto
         self.logger.info("*** Fase de reparto: Repartiendo cartas iniciales. ***")
@@ -120,6 +198,8 @@ class Casino:
         self.carta_oculta_dealer = self._repartir_carta_segura()
         self.logger.info(f"Dealer recibe carta oculta.")
         self.logger.info("*** Fin de Fase de Reparto. ***\n")
+        if medir_fases:
+            inicio_fase = self._marcar_fase("reparto", inicio_fase)
 
         # 4. Fase de Jugadores
         self.logger.info("*** Fase de jugadores: Cada jugador toma decisiones. ***")
@@ -135,7 +215,13 @@ class Casino:
                     carta_visible_dealer = self.dealer.manos[0].cartas[0]
 
                     # Pedir decision al agente
-                    accion = agente.decidir_accion(mano_actual, carta_visible_dealer)
+                    if medir_decisiones:
+                        inicio_decision = time.perf_counter()
+                        accion = agente.decidir_accion(mano_actual, carta_visible_dealer)
+                        self._emitir("decision", agente, mano_actual, carta_visible_dealer, accion,
+                                     time.perf_counter() - inicio_decision)
+                    else:
+                        accion = agente.decidir_accion(mano_actual, carta_visible_dealer)
 
                     # Registramos la accion
                     if self.data_collector is not None:
@@ -215,6 +301,8 @@ class Casino:
                             ganancia= -recupera
                             if self.data_collector is not None:
                                 self.data_collector.registrar_resultado(mano=mano_actual, ganancia=ganancia)
+                            if self.hooks["pago"]:
+                                self._emitir("pago", agente, mano_actual, ganancia)
                             agente.jugador.rendirse(mano_actual)
                             self.logger.info(f"   '{agente.jugador.nombre}' se rinde con {mano_actual}. Recupera ${recupera}. Mano terminada.")
                             mano_actual.turno_terminado = True
@@ -222,6 +310,8 @@ class Casino:
                 self.logger.info(f"   Fin de mano {indice_mano_actual+1}: {mano_actual}.\n")
                 indice_mano_actual += 1
         self.logger.info("*** Fin de Fase de Jugadores. ***\n")
+        if medir_fases:
+            inicio_fase = self._marcar_fase("jugadores", inicio_fase)
 
         # 5. Fase de Dealer
         self.logger.info("*** Fase del dealer: Revelando carta oculta y jugando turno. ***")
@@ -243,6 +333,8 @@ class Casino:
         else:
             self.logger.info(f"Dealer se planta con {self.dealer.manos[0]}.")
         self.logger.info("*** Fin de Fase de Dealer. ***\n")
+        if medir_fases:
+            inicio_fase = self._marcar_fase("dealer", inicio_fase)
 
         # 6. Fase de pagos
         self.logger.info("*** Fase de pagos: Calculando resultados y pagos. ***")
@@ -266,6 +358,8 @@ class Casino:
                         ganancia = 0
                         agente.jugador.capital += mano.apuesta
                         self.logger.info(f"'{agente.jugador.nombre}' empata con {mano}. Capital despues: ${agente.jugador.capital}")
+                    if self.hooks["pago"]:
+                        self._emitir("pago", agente, mano, ganancia)
                     continue
 
                 valor_mano_jugador = mano.valor_total
@@ -309,23 +403,39 @@ class Casino:
 
                 if self.data_collector is not None:
                     self.data_collector.registrar_resultado(mano=mano, ganancia=ganancia)
+                if self.hooks["pago"]:
+                    self._emitir("pago", agente, mano, ganancia)
         self.logger.info("*** Fin de Fase de Pagos. ***\n")
 
         self.logger.info("------ FIN DE RONDA ------\n")
         if self.data_collector is not None:
             self.data_collector.check_and_flush()
+        if medir_fases:
+            self._marcar_fase("pagos", inicio_fase)
+        if self.hooks["fin_ronda"]:
+            self._emitir("fin_ronda", self)
 
 
-    def jugar_partida(self, num_rondas:int):
+    def jugar_partida(self, num_rondas:int, ruta_checkpoint: str = None, checkpoint_cada: int = 100,
+                      incluir_memos: bool = False):
         """
         Punto de entrada para iniciar la simulacion
+        :param ruta_checkpoint: Si se da, guarda un checkpoint ahí cada `checkpoint_cada` rondas y al final,
+                                y si el archivo ya existe retoma desde la ronda guardada (ver core/checkpoint.py).
+        :param incluir_memos: Si es True, los checkpoints guardan también los memos de los agentes.
         """
+        ronda_inicial = 0
+        if ruta_checkpoint is not None and os.path.exists(ruta_checkpoint):
+            ronda_inicial = restaurar_checkpoint(self, cargar_checkpoint(ruta_checkpoint))["ronda"]
+            print(f"Retomando partida desde la ronda {ronda_inicial + 1}")
         print(f"Iniciando partida de {num_rondas} rondas")
-        for i in range(num_rondas):
+        for i in range(ronda_inicial, num_rondas):
             print(f"Ronda {i + 1} / {num_rondas}")
             self._jugar_ronda()
             for agente in self.agentes:
                 print(f"'{agente.jugador.nombre}': Capital = {agente.jugador.capital}")
+            if ruta_checkpoint is not None and ((i + 1) % checkpoint_cada == 0 or i + 1 == num_rondas):
+                guardar_checkpoint(self, ruta_checkpoint, i + 1, incluir_memos)
         if self.data_collector is not None:
             self.data_collector.close()
         print("Partida terminada")
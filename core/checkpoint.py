@@ -0,0 +1,116 @@
+"""
+Checkpoints de simulaciones largas de Casino, tomados entre rondas.
+
+Un checkpoint guarda todo lo que cambia de una ronda a otra: el Mazo (cartas que
+quedan y limite_barajado), el ConteoZapato compartido, el estado de random y de
+numpy, el estado de cada agente (capital, contadores, conteos propios y, si se
+pide, sus memos; ver Agente.estado_checkpoint) y la posición del DataCollector en
+su CSV. Se escribe en un solo pickle, así las referencias compartidas (el conteo
+del casino que leen los agentes) siguen compartidas al cargarlo.
+
+Para retomar se arma el casino igual que la primera vez (mismos agentes, mismos
+nombres, mismos hooks) y se restaura el checkpoint: la simulación sigue en la
+ronda siguiente a la guardada, con las mismas cartas que habría repartido.
+
+    casino.jugar_partida(5000, ruta_checkpoint="corrida.ckpt", checkpoint_cada=100)
+
+Los modelos, hilos y loggers de los agentes no se guardan: son los del proceso nuevo.
+"""
+
+import os
+import pickle
+import random
+import numpy as np
+
+# Se incrementa cuando cambia el contenido del checkpoint
+VERSION_CHECKPOINT = 1
+
+
+def _estado_collector(data_collector) -> dict:
+    """
+    Hasta dónde llega el CSV y los registros que todavía no se escribieron. No se fuerza
+    la escritura: el archivo se escribe en los mismos chunks que sin checkpoints.
+    """
+    if data_collector is None:
+        return None
+    ruta = data_collector.filepath
+    return {
+        "filepath": ruta,
+        "offset": os.path.getsize(ruta) if os.path.exists(ruta) else 0,
+        "header_written": data_collector._header_written,
+        "registros": list(data_collector.registros),
+    }
+
+
+def _restaurar_collector(data_collector, estado: dict):
+    """Corta el CSV donde estaba al guardar: las filas escritas después se vuelven a generar."""
+    if data_collector is None or estado is None:
+        return
+    ruta = data_collector.filepath
+    if os.path.exists(ruta):
+        with open(ruta, "r+b") as f:
+            f.truncate(estado["offset"])
+    data_collector._header_written = estado["header_written"]
+    data_collector.registros = estado["registros"]
+
+
+def estado_casino(casino, ronda: int, incluir_memos: bool = False, extra=None) -> dict:
+    """
+    :param ronda: rondas ya jugadas (la simulación retoma en la siguiente).
+    :param incluir_memos: si True, guarda también los memos de los agentes (más grande, sin arranque en frío).
+    :param extra: estado propio del script que simula (acumuladores, nombres de archivos...).
+    """
+    return {
+        "version": VERSION_CHECKPOINT,
+        "ronda": ronda,
+        "random": random.getstate(),
+        "numpy": np.random.get_state(),
+        "mazo": casino.mazo,
+        "conteo_zapato": casino.conteo_zapato,
+        "agentes": {agente.jugador.nombre: agente.estado_checkpoint(incluir_memos) for agente in casino.agentes},
+        "data_collector": _estado_collector(casino.data_collector),
+        "extra": extra,
+    }
+
+
+def guardar_checkpoint(casino, ruta: str, ronda: int, incluir_memos: bool = False, extra=None):
+    """Escribe el checkpoint en un archivo temporal y lo renombra, así nunca queda uno a medias."""
+    estado = estado_casino(casino, ronda, incluir_memos, extra)
+    carpeta = os.path.dirname(os.path.abspath(ruta))
+    os.makedirs(carpeta, exist_ok=True)
+    ruta_tmp = f"{ruta}.tmp"
+    with open(ruta_tmp, "wb") as f:
+        pickle.dump(estado, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(ruta_tmp, ruta)
+
+
+def cargar_checkpoint(ruta: str) -> dict:
+    """
+    :raises ValueError: Si el checkpoint es de otra versión.
+    """
+    with open(ruta, "rb") as f:
+        estado = pickle.load(f)
+    if estado.get("version") != VERSION_CHECKPOINT:
+        raise ValueError(f"Checkpoint de versión {estado.get('version')}, se esperaba {VERSION_CHECKPOINT}")
+    return estado
+
+
+def restaurar_checkpoint(casino, estado: dict) -> dict:
+    """
+    Deja el casino y sus agentes como estaban al guardar. Devuelve el checkpoint
+    (estado["ronda"] son las rondas ya jugadas, estado["extra"] lo del script).
+
+    :raises ValueError: Si los agentes del casino no son los del checkpoint.
+    """
+    nombres = [agente.jugador.nombre for agente in casino.agentes]
+    if sorted(nombres) != sorted(estado["agentes"]):
+        raise ValueError(f"Los agentes del casino ({nombres}) no son los del checkpoint ({list(estado['agentes'])})")
+
+    casino.mazo = estado["mazo"]
+    casino.conteo_zapato = estado["conteo_zapato"]
+    for agente in casino.agentes:
+        agente.restaurar_checkpoint(estado["agentes"][agente.jugador.nombre])
+    _restaurar_collector(casino.data_collector, estado["data_collector"])
+    random.setstate(estado["random"])
+    np.random.set_state(estado["numpy"])
+    return estado
@@ -0,0 +1,158 @@
+"""
+Parada secuencial para comparar agentes que juegan las mismas rondas.
+
+Para cada par (a, b) se toma la diferencia por ronda de sus cambios de capital,
+d = cambio_a - cambio_b (mismas cartas del dealer, mismo momento del zapato), y se
+mantiene una secuencia de confianza para su media: un intervalo que vale a la vez
+para todas las rondas, así se puede mirar después de cada ronda y cortar sin
+inflar el error (a diferencia de repetir un intervalo común en cada ronda).
+
+Se usa la secuencia de confianza asintótica de Waudby-Smith et al. (mezcla normal
+con la varianza empírica), que no necesita acotar las apuestas:
+
+    media ± σ · sqrt(2 (n ρ² + 1) / (n² ρ²) · log(sqrt(n ρ² + 1) / α))
+
+con ρ elegido para que el intervalo sea lo más angosto posible en `rondas_objetivo`.
+Con varios pares, α se reparte entre ellos (Bonferroni).
+
+Un par queda resuelto cuando el intervalo deja de contener el 0 (uno de los dos
+gana más por ronda), cuando entra entero en ±margen (equivalentes en la práctica)
+o, sin ninguna de las dos, al llegar a rondas_maximas (indistinguibles). Mientras
+todas las diferencias de un par sean iguales no se decide nada antes de rondas_maximas.
+
+    comparacion = ComparacionSecuencial([("Markov_Normal", "HiLo")], confianza=0.95, rondas_maximas=5000)
+    comparacion.agregar({"Markov_Normal": -5, "HiLo": 10})   # una vez por ronda
+    if comparacion.resuelta: ...
+"""
+
+import math
+
+MEJOR_A = "a"
+MEJOR_B = "b"
+EQUIVALENTES = "equivalentes"
+INDISTINGUIBLES = "indistinguibles"
+
+
+def radio_confianza(n: int, varianza: float, alfa: float, rondas_objetivo: int) -> float:
+    """Semiancho de la secuencia de confianza de la media tras n rondas."""
+    log_alfa = -2 * math.log(alfa)
+    rho2 = (log_alfa + math.log(log_alfa + 1)) / rondas_objetivo
+    n_rho2 = n * rho2
+    return math.sqrt(varianza * 2 * (n_rho2 + 1) / (n * n_rho2) * math.log(math.sqrt(n_rho2 + 1) / alfa))
+
+
+class ComparacionPar:
+    """
+    Estado de un par: media y varianza de las diferencias (Welford) y, una vez
+    resuelto, la decisión y la ronda en que se tomó.
+    """
+
+    def __init__(self, a: str, b: str):
+        self.a = a
+        self.b = b
+        self.n = 0
+        self.media = 0.0
+        self._m2 = 0.0
+        self.radio = math.inf
+        self.decision = None
+        self.ronda_decision = None
+
+    @property
+    def varianza(self) -> float:
+        return self._m2 / (self.n - 1) if self.n > 1 else math.inf
+
+    @property
+    def intervalo(self) -> tuple:
+        return self.media - self.radio, self.media + self.radio
+
+    def agregar(self, diferencia: float):
+        self.n += 1
+        delta = diferencia - self.media
+        self.media += delta / self.n
+        self._m2 += delta * (diferencia - self.media)
+
+    def __repr__(self):
+        inferior, superior = self.intervalo
+        return (f"ComparacionPar({self.a} - {self.b}: {self.media:+.3f} por ronda "
+                f"[{inferior:+.3f}, {superior:+.3f}], n={self.n}, decision={self.decision})")
+
+
+class ComparacionSecuencial:
+    def __init__(self, pares: list[tuple], confianza: float = 0.95, rondas_minimas: int = 100,
+                 rondas_maximas: int = None, margen: float = None, rondas_objetivo: int = 1000):
+        """
+        :param pares: Pares (agente_a, agente_b) a comparar, por nombre del jugador.
+        :param confianza: Confianza conjunta de todas las decisiones.
+        :param rondas_minimas: Rondas antes de decidir algo (la varianza empírica necesita datos).
+        :param rondas_maximas: Rondas tras las que un par sin decisión queda como indistinguible.
+        :param margen: Diferencia por ronda (en unidades de capital) por debajo de la cual
+                       dos agentes se consideran equivalentes. Sin margen, solo se corta
+                       cuando uno supera al otro.
+        :param rondas_objetivo: Rondas en las que el intervalo queda más ajustado.
+
+        :raises ValueError: Si no hay pares o la confianza no está entre 0 y 1.
+        """
+        if not pares:
+            raise ValueError("Hace falta al menos un par de agentes.")
+        if not (0 < confianza < 1):
+            raise ValueError("La confianza debe estar entre 0 y 1.")
+        self.pares = [ComparacionPar(a, b) for a, b in pares]
+        self.alfa = (1 - confianza) / len(self.pares)
+        self.rondas_minimas = max(rondas_minimas, 2)
+        self.rondas_maximas = rondas_maximas
+        self.margen = margen
+        self.rondas_objetivo = rondas_objetivo
+        self.rondas = 0
+
+    @property
+    def resuelta(self) -> bool:
+        return all(par.decision is not None for par in self.pares)
+
+    def agregar(self, cambios: dict) -> bool:
+        """
+        Agrega una ronda: cambio de capital por nombre de agente.
+        :return: True si ya están resueltos todos los pares.
+        """
+        self.rondas += 1
+        for par in self.pares:
+            if par.decision is not None:
+                continue
+            par.agregar(cambios[par.a] - cambios[par.b])
+            if par.n < self.rondas_minimas:
+                continue
+            # Con diferencias todas iguales (p. ej. los dos sin capital, o jugando igual) la varianza
+            # empírica es 0 y el intervalo tendría ancho 0: no hay evidencia para decidir
+            varianza = par.varianza
+            par.radio = radio_confianza(par.n, varianza, self.alfa, self.rondas_objetivo) if varianza > 0 else math.inf
+            self._decidir(par)
+        return self.resuelta
+
+    def _decidir(self, par: ComparacionPar):
+        inferior, superior = par.intervalo
+        if inferior > 0:
+            par.decision = MEJOR_A
+        elif superior < 0:
+            par.decision = MEJOR_B
+        elif self.margen is not None and -self.margen < inferior and superior < self.margen:
+            par.decision = EQUIVALENTES
+        elif self.rondas_maximas is not None and par.n >= self.rondas_maximas:
+            par.decision = INDISTINGUIBLES
+        if par.decision is not None:
+            par.ronda_decision = self.rondas
+
+    def resumen(self) -> list[str]:
+        """Una línea por par, para imprimir al final del torneo."""
+        lineas = []
+        for par in self.pares:
+            inferior, superior = par.intervalo
+            if par.decision in (MEJOR_A, MEJOR_B):
+                ganador, perdedor = (par.a, par.b) if par.decision == MEJOR_A else (par.b, par.a)
+                texto = f"{ganador} supera a {perdedor}"
+            elif par.decision == EQUIVALENTES:
+                texto = f"{par.a} y {par.b} son equivalentes (margen {self.margen})"
+            else:
+                texto = f"{par.a} y {par.b} no se distinguen"
+            ronda = f"ronda {par.ronda_decision}" if par.ronda_decision is not None else f"sin decidir, {par.n} rondas"
+            lineas.append(f"{texto} ({ronda}): {par.a} - {par.b} = {par.media:+.3f} por ronda "
+                          f"[{inferior:+.3f}, {superior:+.3f}]")
+        return lineas
@@ -0,0 +1,158 @@
+"""
+Composición exacta del zapato con hash Zobrist incremental.
+
+Los conteos van por índice como en los agentes Markov (0 = As, 1..8 = 2..9,
+9 = 10/J/Q/K). El hash es el XOR de un número aleatorio de 64 bits por cada par
+(índice, conteo), así quitar o reponer una carta cuesta dos XOR y el hash sirve
+como clave de memo en lugar de tuple(cartas_restantes). Dos composiciones
+distintas comparten hash con probabilidad ~2^-64.
+
+ConteoZapato suma a la composición el Hi-Lo y los totales por grupo; es el conteo
+compartido que publica el casino.
+"""
+
+import random
+
+NUM_INDICES = 10
+SEMILLA_ZOBRIST = 0x5EED
+CONTEO_MINIMO_TABLA = 16 * 8  # alcanza para los 10 de un zapato de 8 mazos
+_TABLA = [[] for _ in range(NUM_INDICES)]
+
+
+def _tabla_zobrist(max_conteo: int) -> list:
+    """
+    Tabla [índice][conteo] de enteros de 64 bits. Cada fila sale de su propia semilla,
+    así al crecer conserva los valores ya usados y las composiciones viejas siguen valiendo.
+    """
+    if len(_TABLA[0]) <= max_conteo:
+        tamano = max(max_conteo, CONTEO_MINIMO_TABLA) + 1
+        for indice, fila in enumerate(_TABLA):
+            rng = random.Random(SEMILLA_ZOBRIST * NUM_INDICES + indice)
+            fila[:] = [rng.getrandbits(64) for _ in range(tamano)]
+    return _TABLA
+
+
+class Composicion:
+    """Conteos exactos de cartas restantes y su hash Zobrist, actualizados carta a carta."""
+
+    __slots__ = ("conteos", "total", "hash", "_tabla")
+
+    def __init__(self, conteos):
+        self.conteos = [int(c) for c in conteos]
+        self.total = sum(self.conteos)
+        self._tabla = _tabla_zobrist(max(self.conteos))
+        self.hash = 0
+        for indice, conteo in enumerate(self.conteos):
+            self.hash ^= self._tabla[indice][conteo]
+
+    @classmethod
+    def zapato(cls, num_mazos: int):
+        """Zapato completo: 4 cartas por mazo de cada valor y 16 de valor 10."""
+        return cls([4 * num_mazos] * 9 + [16 * num_mazos])
+
+    def quitar(self, indice: int):
+        conteo = self.conteos[indice]
+        fila = self._tabla[indice]
+        self.hash ^= fila[conteo] ^ fila[conteo - 1]
+        self.conteos[indice] = conteo - 1
+        self.total -= 1
+
+    def reponer(self, indice: int):
+        conteo = self.conteos[indice]
+        fila = self._tabla[indice]
+        self.hash ^= fila[conteo] ^ fila[conteo + 1]
+        self.conteos[indice] = conteo + 1
+        self.total += 1
+
+    def copia(self) -> "Composicion":
+        nueva = Composicion.__new__(Composicion)
+        nueva.conteos = list(self.conteos)
+        nueva.total = self.total
+        nueva.hash = self.hash
+        nueva._tabla = self._tabla
+        return nueva
+
+    def __len__(self):
+        return self.total
+
+    def __repr__(self):
+        return f"Composicion({self.conteos})"
+
+
+# Hi-Lo y grupos (ases, bajas 2-6, medias 7-9, altas 10) por índice
+HILO_POR_INDICE = (-1, 1, 1, 1, 1, 1, 0, 0, 0, -1)
+GRUPO_POR_INDICE = (0, 1, 1, 1, 1, 1, 2, 2, 2, 3)
+
+
+def indice_carta(valor_carta: int) -> int:
+    """Índice de un valor de carta (As = 11) en los conteos."""
+    if valor_carta == 11:
+        return 0
+    return valor_carta - 1 if valor_carta < 10 else 9
+
+
+class ConteoZapato:
+    """
+    Conteo del zapato que mantiene el casino y que los agentes leen por referencia.
+
+    Se actualiza una vez por carta repartida con agregados incrementales: la
+    composición exacta (con su hash), el Hi-Lo acumulado y los totales por grupo.
+    Un conteo que ya llegó a cero no se descuenta (como hacían los agentes con su
+    propio array), pero el Hi-Lo cuenta toda carta vista.
+    """
+
+    def __init__(self, num_mazos: int = 4):
+        self.num_mazos = num_mazos
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.composicion = Composicion.zapato(self.num_mazos)
+        self.hilo = 0
+        self.grupos = [4 * self.num_mazos, 20 * self.num_mazos, 12 * self.num_mazos, 16 * self.num_mazos]
+
+    def observar(self, carta):
+        self.observar_indice(indice_carta(carta.valor))
+
+    def observar_indice(self, indice: int):
+        if self.composicion.conteos[indice] > 0:
+            self.quitar(indice)
+        else:
+            self.hilo += HILO_POR_INDICE[indice]
+
+    def quitar(self, indice: int):
+        """Saca una carta (que tiene que quedar) actualizando todos los agregados en O(1)."""
+        self.composicion.quitar(indice)
+        self.grupos[GRUPO_POR_INDICE[indice]] -= 1
+        self.hilo += HILO_POR_INDICE[indice]
+
+    def reponer(self, indice: int):
+        """Deshace quitar(); las búsquedas la usan para recorrer retiros hipotéticos sin copiar."""
+        self.composicion.reponer(indice)
+        self.grupos[GRUPO_POR_INDICE[indice]] += 1
+        self.hilo -= HILO_POR_INDICE[indice]
+
+    def copia(self) -> "ConteoZapato":
+        nuevo = ConteoZapato.__new__(ConteoZapato)
+        nuevo.num_mazos = self.num_mazos
+        nuevo.composicion = self.composicion.copia()
+        nuevo.hilo = self.hilo
+        nuevo.grupos = list(self.grupos)
+        return nuevo
+
+    @property
+    def conteos(self) -> list:
+        return self.composicion.conteos
+
+    @property
+    def total(self) -> int:
+        return self.composicion.total
+
+    @property
+    def mazos_restantes(self) -> float:
+        return self.composicion.total / 52.0
+
+    @property
+    def conteo_verdadero(self) -> float:
+        """Hi-Lo acumulado dividido por los mazos que quedan (0 con el zapato vacío)."""
+        total = self.composicion.total
+        return self.hilo * 52.0 / total if total else 0.0
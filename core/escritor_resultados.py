@@ -0,0 +1,134 @@
+"""
+Escritura incremental de los resultados por ronda de un torneo entre agentes.
+
+Las filas se acumulan en memoria y se agregan al CSV cada `cada` filas, con el
+esquema fijo que se da al crear el escritor (en tests/test_all.py,
+generar_fieldnames_csv). La memoria no crece con las rondas y, si la simulación se
+corta, el CSV tiene todo lo escrito hasta el último bloque. Cada bloque se escribe
+con una sola escritura, así data_viewer/markov_resumen.py puede leer el archivo
+mientras el torneo sigue.
+
+Junto al CSV se mantiene un resumen (`<csv sin extensión>.resumen.json`) con las
+rondas escritas y, por agente, victorias, derrotas, empates, ganancia acumulada y
+capital. Se reemplaza en cada bloque.
+
+    escritor = EscritorResultados("resultados.csv", fieldnames, cada=100)
+    escritor.agregar(fila)   # una por ronda
+    escritor.cerrar()
+"""
+
+import io
+import os
+import csv
+import copy
+import json
+
+SUFIJO_RESULTADO = "_result"
+SUFIJO_CAPITAL = "_capital_change"
+
+
+def ruta_resumen(filepath: str) -> str:
+    return f"{os.path.splitext(filepath)[0]}.resumen.json"
+
+
+class EscritorResultados:
+    def __init__(self, filepath: str, fieldnames: list[str], cada: int = 100, capitales_iniciales: dict = None):
+        """
+        :param filepath: CSV de resultados. Se crea con el encabezado; si ya existe, se agrega al final.
+        :param fieldnames: Columnas del CSV. Los agentes son los prefijos de las columnas '<prefijo>_result'.
+        :param cada: Filas acumuladas antes de escribir un bloque.
+        :param capitales_iniciales: Capital inicial por prefijo, para el capital del resumen.
+
+        :raises ValueError: Si cada es menor que 1.
+        """
+        if cada < 1:
+            raise ValueError("cada debe ser al menos 1.")
+        self.filepath = filepath
+        self.fieldnames = list(fieldnames)
+        self.cada = cada
+        self.pendientes = []
+        if not os.path.exists(filepath) or os.path.getsize(filepath) == 0:
+            # El encabezado va desde el principio: el CSV se puede leer antes del primer bloque
+            with open(filepath, "w", newline="", encoding="utf-8") as f:
+                csv.DictWriter(f, fieldnames=self.fieldnames).writeheader()
+
+        capitales_iniciales = capitales_iniciales or {}
+        prefijos = [columna[:-len(SUFIJO_RESULTADO)] for columna in self.fieldnames
+                    if columna.endswith(SUFIJO_RESULTADO)]
+        self.resumen = {
+            "rondas": 0,
+            "agentes": {prefijo: {"victorias": 0, "derrotas": 0, "empates": 0, "ganancia": 0,
+                                  "capital": capitales_iniciales.get(prefijo)}
+                        for prefijo in prefijos},
+        }
+
+    def agregar(self, fila: dict):
+        """
+        Agrega la fila de una ronda y escribe el bloque si ya hay `cada` filas.
+
+        :raises ValueError: Si la fila tiene columnas fuera del esquema.
+        """
+        sobrantes = fila.keys() - set(self.fieldnames)
+        if sobrantes:
+            raise ValueError(f"Columnas fuera del esquema: {sorted(sobrantes)}")
+        self.pendientes.append(fila)
+        if len(self.pendientes) >= self.cada:
+            self.escribir()
+
+    def _actualizar_resumen(self, filas: list[dict]):
+        self.resumen["rondas"] += len(filas)
+        for prefijo, agente in self.resumen["agentes"].items():
+            for fila in filas:
+                resultado = fila.get(prefijo + SUFIJO_RESULTADO)
+                if resultado is None:
+                    continue
+                clave = "victorias" if resultado > 0 else "derrotas" if resultado < 0 else "empates"
+                agente[clave] += 1
+                cambio = fila.get(prefijo + SUFIJO_CAPITAL) or 0
+                agente["ganancia"] += cambio
+                if agente["capital"] is not None:
+                    agente["capital"] += cambio
+
+    def escribir(self):
+        """Agrega las filas pendientes al CSV y actualiza el resumen."""
+        if not self.pendientes:
+            return
+        bloque = io.StringIO()
+        csv.DictWriter(bloque, fieldnames=self.fieldnames).writerows(self.pendientes)
+
+        # Una sola escritura por bloque: quien lee el CSV a la vez ve filas completas
+        with open(self.filepath, "a", newline="", encoding="utf-8") as f:
+            f.write(bloque.getvalue())
+        self._actualizar_resumen(self.pendientes)
+        self.pendientes = []
+        self._escribir_resumen()
+
+    def _escribir_resumen(self):
+        ruta = ruta_resumen(self.filepath)
+        ruta_tmp = f"{ruta}.tmp"
+        with open(ruta_tmp, "w", encoding="utf-8") as f:
+            # Los capitales pueden venir como escalares de numpy
+            json.dump(self.resumen, f, indent=4, ensure_ascii=False, default=lambda valor: valor.item())
+        os.replace(ruta_tmp, ruta)
+
+    def cerrar(self):
+        self.escribir()
+
+    def estado_checkpoint(self) -> dict:
+        """Hasta dónde llega el CSV, las filas sin escribir y el resumen (ver core/checkpoint.py)."""
+        return {
+            "filepath": self.filepath,
+            "offset": os.path.getsize(self.filepath) if os.path.exists(self.filepath) else 0,
+            "pendientes": list(self.pendientes),
+            "resumen": copy.deepcopy(self.resumen),
+        }
+
+    def restaurar_checkpoint(self, estado: dict):
+        """Vuelve al CSV del checkpoint, cortando las filas escritas después de guardarlo."""
+        self.filepath = estado["filepath"]
+        if os.path.exists(self.filepath):
+            with open(self.filepath, "r+b") as f:
+                f.truncate(estado["offset"])
+        self.pendientes = list(estado["pendientes"])
+        self.resumen = estado["resumen"]
+        self._escribir_resumen()
@@ -0,0 +1,126 @@
+"""
+Kernels vectorizados para el análisis de resultados (markov_resumen y futuros dashboards).
+
+Todas las funciones trabajan sobre arrays de NumPy. Las que reciben una matriz
+esperan una columna por agente (filas = rondas), así se procesan todos los
+prefijos de una sola vez en lugar de filtrar el DataFrame agente por agente.
+"""
+
+import numpy as np
+
+def result_matrix(df, prefixes, suffix='result', dtype=np.int8):
+    """Matriz (rondas x agentes) con la columna '<prefijo>_<suffix>' de cada agente"""
+    if not prefixes:
+        return np.zeros((len(df), 0), dtype=dtype)
+    return np.column_stack([df[f'{prefix}_{suffix}'].to_numpy(dtype=dtype) for prefix in prefixes])
+
+def run_lengths(values):
+    """
+    Run-length encoding de un array 1D.
+    :return: (valores, largos) de cada racha, en orden.
+    """
+    values = np.asarray(values)
+    if len(values) == 0:
+        return values[:0], np.zeros(0, dtype=np.int64)
+    cortes = np.flatnonzero(values[1:] != values[:-1]) + 1
+    inicios = np.concatenate(([0], cortes))
+    largos = np.diff(np.concatenate((inicios, [len(values)])))
+    return values[inicios], largos
+
+def streak_stats(results):
+    """
+    Rachas de victorias (1) y derrotas (-1); los empates cortan ambas.
+    :return: (max_win, avg_win, max_loss, avg_loss)
+    """
+    valores, largos = run_lengths(results)
+    stats = []
+    for signo in (1, -1):
+        rachas = largos[valores == signo]
+        stats += [int(rachas.max()), rachas.mean()] if len(rachas) else [0, 0]
+    return tuple(stats)
+
+def result_counts(matrix):
+    """Cantidad de victorias, derrotas y empates por agente: array (agentes x 3)"""
+    matrix = np.asarray(matrix)
+    return np.stack([(matrix == 1).sum(axis=0), (matrix == -1).sum(axis=0), (matrix == 0).sum(axis=0)], axis=1)
+
+def cumulative(matrix):
+    """Suma acumulada por columna (ganancia acumulada de cada agente)"""
+    return np.cumsum(matrix, axis=0, dtype=np.int64)
+
+def rolling_mean(matrix, window):
+    """
+    Media móvil por columna usando sumas acumuladas (O(n) sin importar la ventana).
+    Igual que pandas rolling(window).mean(): las primeras window-1 filas son NaN.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    es_vector = matrix.ndim == 1
+    if es_vector:
+        matrix = matrix[:, None]
+    salida = np.full(matrix.shape, np.nan)
+    if len(matrix) >= window:
+        acumulado = np.cumsum(matrix, axis=0)
+        acumulado = np.vstack((np.zeros((1, matrix.shape[1])), acumulado))
+        salida[window - 1:] = (acumulado[window:] - acumulado[:-window]) / window
+    return salida[:, 0] if es_vector else salida
+
+def bin_index(values, bins):
+    """
+    Índice de bin de cada valor con intervalos (a, b] como pd.cut.
+    Los valores fuera de rango quedan con -1.
+    """
+    values = np.asarray(values)
+    indices = np.searchsorted(bins, values, side='left') - 1
+    indices[(values <= bins[0]) | (values > bins[-1])] = -1
+    return indices
+
+def binned_result_stats(keys, matrix, bins):
+    """
+    Estadísticas de resultados por bin para todos los agentes.
+    :param keys: valores a agrupar (por ejemplo cartas restantes).
+    :param matrix: resultados (rondas x agentes).
+    :param bins: bordes de los bins, como en pd.cut.
+    :return: dict de arrays (bins x agentes): 'count', 'sum', 'wins', 'losses', 'ties'.
+    """
+    matrix = np.asarray(matrix)
+    indices = bin_index(keys, bins)
+    validos = indices >= 0
+    indices, matrix = indices[validos], matrix[validos]
+    num_bins = len(bins) - 1
+
+    def por_bin(pesos):
+        return np.stack([np.bincount(indices, weights=pesos[:, j], minlength=num_bins)
+                         for j in range(matrix.shape[1])], axis=1).astype(np.int64)
+
+    count = np.bincount(indices, minlength=num_bins).astype(np.int64)
+    return {
+        'count': np.repeat(count[:, None], matrix.shape[1], axis=1),
+        'sum': por_bin(matrix.astype(np.float64)),
+        'wins': por_bin((matrix == 1).astype(np.float64)),
+        'losses': por_bin((matrix == -1).astype(np.float64)),
+        'ties': por_bin((matrix == 0).astype(np.float64)),
+    }
+
+def minmax_decimate(x, y, max_points):
+    """
+    Reduce una serie a lo sumo ~max_points puntos conservando los extremos visibles:
+    divide la serie en max_points/2 buckets y en cada uno guarda el mínimo y el máximo
+    (en su orden original), además del primer y el último punto. Los NaN se ignoran.
+    :return: (x, y) decimados; si la serie ya es chica se devuelve sin cambios.
+    """
+    x, y = np.asarray(x), np.asarray(y, dtype=np.float64)
+    n = len(y)
+    num_buckets = max(max_points // 2, 1)
+    if n <= max_points:
+        return x, y
+
+    tam = -(-n // num_buckets)  # ceil
+    relleno = num_buckets * tam - n
+    bloques = np.concatenate((y, np.full(relleno, np.nan))).reshape(num_buckets, tam)
+    es_nan = np.isnan(bloques)
+    minimos = np.argmin(np.where(es_nan, np.inf, bloques), axis=1)
+    maximos = np.argmax(np.where(es_nan, -np.inf, bloques), axis=1)
+    base = np.arange(num_buckets) * tam
+    indices = np.concatenate(([0], base + minimos, base + maximos, [n - 1]))
+    indices = np.unique(np.minimum(indices, n - 1))
+    return x[indices], y[indices]
@@ -3,10 +3,17 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
+import argparse
 import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 
-def load_latest_csv():
-    """Carga el archivo CSV más reciente de los resultados de comparación de Markov"""
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from data_viewer import kernels
+
+def find_latest_csv():
+    """Busca el archivo CSV más reciente de resultados. Devuelve (ruta, tipo)"""
     csv_files = glob.glob("test_markov_comparison_*.csv")
     if not csv_files:
         # Fallback a archivos antiguos
@@ -15,233 +22,276 @@ def load_latest_csv():
             raise FileNotFoundError("No se encontraron archivos CSV de resultados")
         
         latest_file = max(csv_files, key=lambda x: Path(x).stat().st_mtime)
-        print(f"Cargando archivo antiguo: {latest_file}")
-        return pd.read_csv(latest_file), "old"
+        return latest_file, "old"
     
     latest_file = max(csv_files, key=lambda x: Path(x).stat().st_mtime)
-    print(f"Cargando archivo de comparación: {latest_file}")
-    return pd.read_csv(latest_file), "comparison"
+    return latest_file, "comparison"
+
+def tipo_csv(columnas):
+    """'comparison' si el CSV tiene columnas '<prefijo>_result' de varios agentes, 'old' si no"""
+    return "comparison" if any(c.endswith('_result') and c != 'result' for c in columnas) else "old"
+
+def load_latest_csv():
+    """Carga el archivo CSV más reciente de los resultados de comparación de Markov"""
+    latest_file, file_type = find_latest_csv()
+    if file_type == "old":
+        print(f"Cargando archivo antiguo: {latest_file}")
+    else:
+        print(f"Cargando archivo de comparación: {latest_file}")
+    return pd.read_csv(latest_file), file_type
 
 def calculate_streaks(results):
     """Calcula las rachas de victorias y derrotas"""
-    if len(results) == 0:
-        return 0, 0, 0, 0
-    
-    win_streaks = []
-    loss_streaks = []
-    current_win_streak = 0
-    current_loss_streak = 0
-    
-    for result in results:
-        if result == 1:  # Victoria
-            current_win_streak += 1
-            if current_loss_streak > 0:
-                loss_streaks.append(current_loss_streak)
-                current_loss_streak = 0
-        elif result == -1:  # Derrota
-            current_loss_streak += 1
-            if current_win_streak > 0:
-                win_streaks.append(current_win_streak)
-                current_win_streak = 0
-        else:  # Empate
-            if current_win_streak > 0:
-                win_streaks.append(current_win_streak)
-                current_win_streak = 0
-            if current_loss_streak > 0:
-                loss_streaks.append(current_loss_streak)
-                current_loss_streak = 0
-    
-    # Agregar rachas finales si existen
-    if current_win_streak > 0:
-        win_streaks.append(current_win_streak)
-    if current_loss_streak > 0:
-        loss_streaks.append(current_loss_streak)
-    
-    max_win_streak = max(win_streaks) if win_streaks else 0
-    avg_win_streak = np.mean(win_streaks) if win_streaks else 0
-    max_loss_streak = max(loss_streaks) if loss_streaks else 0
-    avg_loss_streak = np.mean(loss_streaks) if loss_streaks else 0
-    
-    return max_win_streak, avg_win_streak, max_loss_streak, avg_loss_streak
+    return kernels.streak_stats(np.asarray(results))
 
-def analyze_agent_performance(df, agent_name, prefix):
-    """Analiza el rendimiento detallado de un agente específico"""
+CARDS_BINS = [0, 50, 100, 150, 200, 300]
+CARDS_LABELS = ['0-50', '51-100', '101-150', '151-200', '201+']
+PERCENTILES = [50, 75, 90, 95, 99]
+
+# Prefijos del formato viejo con nombre conocido
+AGENTES_CONOCIDOS = {
+    'normal': 'Markov Normal',
+    'arriesgado': 'Markov Arriesgado',
+    'rl': 'Markov RL (Optimizado)',
+}
+
+def detectar_agentes(columnas):
+    """
+    Detecta los agentes presentes a partir de las columnas '<prefijo>_result'.
+    Devuelve una lista de (nombre, prefijo) en el orden del CSV.
+    """
+    agents = []
+    for columna in columnas:
+        if columna.endswith('_result'):
+            prefix = columna[:-len('_result')]
+            agents.append((AGENTES_CONOCIDOS.get(prefix, prefix.replace('_', ' ').title()), prefix))
+    return agents
+
+def print_agent_performance(agent_name, resumen):
+    """Imprime el resumen de rendimiento (victorias, derrotas, rachas) de un agente"""
     print("="*60)
     print(f"RESUMEN DE RENDIMIENTO DEL AGENTE {agent_name.upper()}")
     print("="*60)
-    
-    total_rounds = len(df)
-    wins = len(df[df[f'{prefix}_result'] == 1])
-    losses = len(df[df[f'{prefix}_result'] == -1])
-    ties = len(df[df[f'{prefix}_result'] == 0])
-    
+
+    total_rounds = resumen['total_rounds']
+    wins, losses, ties = resumen['wins'], resumen['losses'], resumen['ties']
+
     print(f"Total de rondas jugadas: {total_rounds}")
     print(f"Victorias: {wins} ({wins/total_rounds*100:.2f}%)")
     print(f"Derrotas: {losses} ({losses/total_rounds*100:.2f}%)")
     print(f"Empates: {ties} ({ties/total_rounds*100:.2f}%)")
     if losses > 0:
         print(f"Ratio Victoria/Derrota: {wins/losses:.2f}")
-    
-    # Calcular rachas
-    results = df[f'{prefix}_result'].values
-    max_win, avg_win, max_loss, avg_loss = calculate_streaks(results)
+
+    max_win, avg_win, max_loss, avg_loss = resumen['streaks']
     print(f"Racha de victorias más larga: {max_win}")
     print(f"Racha promedio de victorias: {avg_win:.2f}")
     print(f"Racha de derrotas más larga: {max_loss}")
     print(f"Racha promedio de derrotas: {avg_loss:.2f}")
 
-def analyze_agent_decision_times(df, agent_name, prefix):
-    """Analiza los tiempos de decisión de un agente específico"""
+def analyze_agent_performance(df, agent_name, prefix):
+    """Analiza el rendimiento detallado de un agente específico"""
+    results = df[f'{prefix}_result'].to_numpy()
+    wins, losses, ties = kernels.result_counts(results[:, None])[0]
+    resumen = {
+        'total_rounds': len(df),
+        'wins': wins,
+        'losses': losses,
+        'ties': ties,
+        'streaks': calculate_streaks(results),
+    }
+    print_agent_performance(agent_name, resumen)
+
+def print_agent_decision_times(agent_name, resumen):
+    """Imprime las estadísticas de tiempos de decisión de un agente"""
     print("\n" + "="*60)
     print(f"ANÁLISIS DE TIEMPOS DE DECISIÓN - {agent_name.upper()}")
     print("="*60)
-    
+
+    if resumen is None:
+        print("No hay datos de decisiones para este agente")
+        return
+
+    print(f"Rondas con decisiones: {resumen['rounds']}")
+    print(f"Total de decisiones tomadas: {resumen['total_decisions']}")
+    print(f"Tiempo total de decisión: {resumen['total_time']} ms")
+    print(f"Tiempo promedio por decisión: {resumen['avg_time']:.2f} ms")
+    print(f"Tiempo más rápido por decisión: {resumen['min_time']:.2f} ms")
+    print(f"Tiempo más lento por decisión: {resumen['max_time']:.2f} ms")
+    print(f"Desviación estándar: {resumen['std_time']:.2f} ms")
+
+    # Percentiles
+    print(f"\nPercentiles de tiempo por decisión:")
+    for p, value in resumen['percentiles'].items():
+        print(f"  P{p}: {value:.2f} ms")
+
+def analyze_agent_decision_times(df, agent_name, prefix):
+    """Analiza los tiempos de decisión de un agente específico"""
     # Filtrar rondas con decisiones
     df_agent = df[df[f'{prefix}_decisions'] > 0].copy()
-    
+
     if len(df_agent) == 0:
-        print("No hay datos de decisiones para este agente")
+        print_agent_decision_times(agent_name, None)
         return
-    
+
     # Calcular tiempo promedio por decisión
     df_agent['avg_time'] = df_agent[f'{prefix}_decision_time_ms'] / df_agent[f'{prefix}_decisions']
-    
-    total_decisions = df_agent[f'{prefix}_decisions'].sum()
-    total_time = df_agent[f'{prefix}_decision_time_ms'].sum()
-    avg_time = df_agent['avg_time'].mean()
-    min_time = df_agent['avg_time'].min()
-    max_time = df_agent['avg_time'].max()
-    std_time = df_agent['avg_time'].std()
-    
-    print(f"Rondas con decisiones: {len(df_agent)}")
-    print(f"Total de decisiones tomadas: {total_decisions}")
-    print(f"Tiempo total de decisión: {total_time} ms")
-    print(f"Tiempo promedio por decisión: {avg_time:.2f} ms")
-    print(f"Tiempo más rápido por decisión: {min_time:.2f} ms")
-    print(f"Tiempo más lento por decisión: {max_time:.2f} ms")
-    print(f"Desviación estándar: {std_time:.2f} ms")
-    
-    # Percentiles
-    print(f"\nPercentiles de tiempo por decisión:")
-    percentiles = [50, 75, 90, 95, 99]
-    for p in percentiles:
-        value = np.percentile(df_agent['avg_time'], p)
-        print(f"  P{p}: {value:.2f} ms")
 
-def analyze_agent_by_cards_remaining(df, agent_name, prefix):
-    """Analiza el rendimiento de un agente por cartas restantes"""
+    resumen = {
+        'rounds': len(df_agent),
+        'total_decisions': df_agent[f'{prefix}_decisions'].sum(),
+        'total_time': df_agent[f'{prefix}_decision_time_ms'].sum(),
+        'avg_time': df_agent['avg_time'].mean(),
+        'min_time': df_agent['avg_time'].min(),
+        'max_time': df_agent['avg_time'].max(),
+        'std_time': df_agent['avg_time'].std(),
+        'percentiles': {p: np.percentile(df_agent['avg_time'], p) for p in PERCENTILES},
+    }
+    print_agent_decision_times(agent_name, resumen)
+
+def print_agent_by_cards_remaining(agent_name, bins, correlation):
+    """
+    Imprime el rendimiento por rango de cartas restantes.
+    :param bins: lista de (bin_name, count, mean, sum, wins, losses, ties) solo con bins no vacíos.
+    """
     print("\n" + "="*60)
     print(f"ANÁLISIS POR CARTAS RESTANTES EN EL MAZO - {agent_name.upper()}")
     print("="*60)
-    
-    # Crear bins para cartas restantes
-    df['cards_bin'] = pd.cut(df['cards_remaining'], 
-                            bins=[0, 50, 100, 150, 200, 300],
-                            labels=['0-50', '51-100', '101-150', '151-200', '201+'])
-    
-    # Análisis por bins
-    grouped = df.groupby('cards_bin', observed=True)[f'{prefix}_result'].agg(['count', 'mean', 'sum'])
-    
+
     print("Rendimiento por rango de cartas restantes:")
     print("           count   mean  sum  win_rate_%  loss_rate_%  tie_rate_%")
     print("cards_bin")
-    
-    for bin_name in grouped.index:
-        bin_data = df[df['cards_bin'] == bin_name]
-        wins = len(bin_data[bin_data[f'{prefix}_result'] == 1])
-        losses = len(bin_data[bin_data[f'{prefix}_result'] == -1])
-        ties = len(bin_data[bin_data[f'{prefix}_result'] == 0])
-        total = len(bin_data)
-        
+
+    for bin_name, count, mean, total_sum, wins, losses, ties in bins:
+        total = wins + losses + ties
         win_rate = wins / total * 100 if total > 0 else 0
         loss_rate = losses / total * 100 if total > 0 else 0
         tie_rate = ties / total * 100 if total > 0 else 0
-        
-        print(f"{bin_name:8} {grouped.loc[bin_name, 'count']:8} {grouped.loc[bin_name, 'mean']:7.3f} {grouped.loc[bin_name, 'sum']:4} {win_rate:10.2f} {loss_rate:11.2f} {tie_rate:10.2f}")
-    
-    # Correlación
-    correlation = df['cards_remaining'].corr(df[f'{prefix}_result'])
+
+        print(f"{bin_name:8} {count:8} {mean:7.3f} {total_sum:4} {win_rate:10.2f} {loss_rate:11.2f} {tie_rate:10.2f}")
+
     print(f"\nCorrelación entre cartas restantes y resultado: {correlation:.4f}")
-    
+
     # Desglose detallado
     print(f"\nDesglose detallado:")
-    for bin_name in grouped.index:
-        bin_data = df[df['cards_bin'] == bin_name]
-        wins = len(bin_data[bin_data[f'{prefix}_result'] == 1])
-        losses = len(bin_data[bin_data[f'{prefix}_result'] == -1])
-        ties = len(bin_data[bin_data[f'{prefix}_result'] == 0])
-        total = len(bin_data)
-        print(f"  {bin_name}: {wins}W/{losses}L/{ties}T de {total} rondas")
+    for bin_name, count, mean, total_sum, wins, losses, ties in bins:
+        print(f"  {bin_name}: {wins}W/{losses}L/{ties}T de {wins + losses + ties} rondas")
 
-def analyze_agent_decision_complexity(df, agent_name, prefix):
-    """Analiza la complejidad de decisiones de un agente"""
+def cards_bins_summary(stats, columna=0):
+    """Convierte binned_result_stats en la lista de bins no vacíos de un agente"""
+    bins = []
+    for i, bin_name in enumerate(CARDS_LABELS):
+        count = stats['count'][i, columna]
+        if count > 0:
+            total_sum = stats['sum'][i, columna]
+            bins.append((bin_name, count, total_sum / count, total_sum,
+                         stats['wins'][i, columna], stats['losses'][i, columna], stats['ties'][i, columna]))
+    return bins
+
+def analyze_agent_by_cards_remaining(df, agent_name, prefix):
+    """Analiza el rendimiento de un agente por cartas restantes"""
+    stats = kernels.binned_result_stats(df['cards_remaining'].to_numpy(), kernels.result_matrix(df, [prefix]), CARDS_BINS)
+    bins = cards_bins_summary(stats)
+
+    # Correlación
+    correlation = df['cards_remaining'].corr(df[f'{prefix}_result'])
+    print_agent_by_cards_remaining(agent_name, bins, correlation)
+
+def print_agent_decision_complexity(agent_name, prefix, correlation, filas):
+    """
+    Imprime el rendimiento por número de decisiones por ronda.
+    :param filas: lista de (decisions, count, mean_time, std_time, mean_result) o None si no hay datos.
+    """
     print("\n" + "="*60)
     print(f"ANÁLISIS DE COMPLEJIDAD DE DECISIONES - {agent_name.upper()}")
     print("="*60)
-    
+
+    if filas is None:
+        print("No hay datos de decisiones para este agente")
+        return
+
+    print(f"Correlación decisiones vs tiempo total: {correlation:.4f}")
+
+    print(f"\nRendimiento por número de decisiones por ronda:")
+    print("                total_decision_time_ms                 result")
+    print("                                 count    mean     std   mean")
+    print(f"{prefix}_decisions")
+
+    for decisions, count, mean_time, std_time, mean_result in filas:
+        std_str = f"{std_time:.2f}" if not pd.isna(std_time) else "NaN"
+        print(f"{decisions:15} {count:8} {mean_time:8.2f} {std_str:8} {mean_result:6.2f}")
+
+def analyze_agent_decision_complexity(df, agent_name, prefix):
+    """Analiza la complejidad de decisiones de un agente"""
     # Filtrar rondas con decisiones
     df_agent = df[df[f'{prefix}_decisions'] > 0].copy()
-    
+
     if len(df_agent) == 0:
-        print("No hay datos de decisiones para este agente")
+        print_agent_decision_complexity(agent_name, prefix, None, None)
         return
-    
+
     # Correlación entre número de decisiones y tiempo total
     correlation = df_agent[f'{prefix}_decisions'].corr(df_agent[f'{prefix}_decision_time_ms'])
-    print(f"Correlación decisiones vs tiempo total: {correlation:.4f}")
-    
+
     # Rendimiento por número de decisiones
     grouped = df_agent.groupby(f'{prefix}_decisions').agg({
         f'{prefix}_decision_time_ms': ['count', 'mean', 'std'],
         f'{prefix}_result': 'mean'
     })
-    
-    print(f"\nRendimiento por número de decisiones por ronda:")
-    print("                total_decision_time_ms                 result")
-    print("                                 count    mean     std   mean")
-    print(f"{prefix}_decisions")
-    
+
+    filas = []
     for decisions in grouped.index:
-        count = grouped.loc[decisions, (f'{prefix}_decision_time_ms', 'count')]
-        mean_time = grouped.loc[decisions, (f'{prefix}_decision_time_ms', 'mean')]
-        std_time = grouped.loc[decisions, (f'{prefix}_decision_time_ms', 'std')]
-        mean_result = grouped.loc[decisions, (f'{prefix}_result', 'mean')]
-        
-        std_str = f"{std_time:.2f}" if not pd.isna(std_time) else "NaN"
-        print(f"{decisions:15} {count:8} {mean_time:8.2f} {std_str:8} {mean_result:6.2f}")
+        filas.append((
+            decisions,
+            grouped.loc[decisions, (f'{prefix}_decision_time_ms', 'count')],
+            grouped.loc[decisions, (f'{prefix}_decision_time_ms', 'mean')],
+            grouped.loc[decisions, (f'{prefix}_decision_time_ms', 'std')],
+            grouped.loc[decisions, (f'{prefix}_result', 'mean')],
+        ))
+    print_agent_decision_complexity(agent_name, prefix, correlation, filas)
+
+def print_comparison(comparison_data):
+    """Imprime la tabla comparativa entre agentes y los mejores por tasa de victoria y tiempo"""
+    print("\n" + "="*60)
+    print("COMPARACIÓN ENTRE AGENTES MARKOV")
+    print("="*60)
+
+    if not comparison_data:
+        print("No hay agentes para comparar (el CSV no tiene columnas '<agente>_result')")
+        return
+
+    comparison_df = pd.DataFrame(comparison_data)
+    print(comparison_df.to_string(index=False))
+
+    # Mejor agente por tasa de victoria
+    best_agent = comparison_df.loc[comparison_df['Tasa_Victoria_%'].idxmax()]
+    print(f"\n✓ Mejor agente por tasa de victoria: {best_agent['Agente']} ({best_agent['Tasa_Victoria_%']:.2f}%)")
+
+    # Agente más eficiente (menor tiempo de decisión)
+    fastest_agent = comparison_df.loc[comparison_df['Tiempo_Promedio_ms'].idxmin()]
+    print(f"✓ Agente más eficiente: {fastest_agent['Agente']} ({fastest_agent['Tiempo_Promedio_ms']:.2f} ms promedio)")
 
 def analyze_comparison_performance(df):
-    """Analiza el rendimiento de los tres agentes Markov en comparación"""
+    """Analiza el rendimiento de los agentes Markov en comparación"""
     # Detectar qué agentes están presentes en el dataset
-    agents = []
-    if 'normal_result' in df.columns:
-        agents.append(('Markov Normal', 'normal'))
-    if 'arriesgado_result' in df.columns:
-        agents.append(('Markov Arriesgado', 'arriesgado'))
-    if 'rl_result' in df.columns:
-        agents.append(('Markov RL (Optimizado)', 'rl'))
-    
+    agents = detectar_agentes(df.columns)
+
     # Análisis detallado por agente
     for agent_name, prefix in agents:
         analyze_agent_performance(df, agent_name, prefix)
         analyze_agent_decision_times(df, agent_name, prefix)
         analyze_agent_by_cards_remaining(df, agent_name, prefix)
         analyze_agent_decision_complexity(df, agent_name, prefix)
-    
+
     # Comparación entre agentes
-    print("\n" + "="*60)
-    print("COMPARACIÓN ENTRE AGENTES MARKOV")
-    print("="*60)
-    
     total_rounds = len(df)
     comparison_data = []
-    
-    for agent_name, prefix in agents:
-        wins = len(df[df[f'{prefix}_result'] == 1])
-        losses = len(df[df[f'{prefix}_result'] == -1])
-        ties = len(df[df[f'{prefix}_result'] == 0])
+    counts = kernels.result_counts(kernels.result_matrix(df, [prefix for _, prefix in agents]))
+
+    for i, (agent_name, prefix) in enumerate(agents):
+        wins, losses, ties = counts[i]
         winrate = wins / total_rounds * 100
-        
+
         # Tiempo promedio de decisión
         df_agent = df[df[f'{prefix}_decisions'] > 0].copy()
         if len(df_agent) > 0:
@@ -249,7 +299,7 @@ def analyze_comparison_performance(df):
             avg_decision_time = df_agent['avg_time'].mean()
         else:
             avg_decision_time = 0
-        
+
         comparison_data.append({
             'Agente': agent_name,
             'Victorias': wins,
@@ -258,132 +308,419 @@ def analyze_comparison_performance(df):
             'Tasa_Victoria_%': winrate,
             'Tiempo_Promedio_ms': avg_decision_time
         })
-    
-    comparison_df = pd.DataFrame(comparison_data)
-    print(comparison_df.to_string(index=False))
-    
-    # Mejor agente por tasa de victoria
-    best_agent = comparison_df.loc[comparison_df['Tasa_Victoria_%'].idxmax()]
-    print(f"\n✓ Mejor agente por tasa de victoria: {best_agent['Agente']} ({best_agent['Tasa_Victoria_%']:.2f}%)")
-    
-    # Agente más eficiente (menor tiempo de decisión)
-    fastest_agent = comparison_df.loc[comparison_df['Tiempo_Promedio_ms'].idxmin()]
-    print(f"✓ Agente más eficiente: {fastest_agent['Agente']} ({fastest_agent['Tiempo_Promedio_ms']:.2f} ms promedio)")
 
-def create_comparison_visualizations(df):
-    """Crea visualizaciones comparativas para todos los agentes disponibles"""
-    print("\n" + "="*60)
-    print("GENERANDO VISUALIZACIONES COMPARATIVAS")
-    print("="*60)
-    
-    # Detectar agentes disponibles
-    agents = []
-    if 'normal_result' in df.columns:
-        agents.append(('Normal', 'normal'))
-    if 'arriesgado_result' in df.columns:
-        agents.append(('Arriesgado', 'arriesgado'))
-    if 'rl_result' in df.columns:
-        agents.append(('RL', 'rl'))
-    
-    plt.style.use('seaborn-v0_8')
-    fig, axes = plt.subplots(2, 3, figsize=(18, 12))
-    
-    # 1. Ganancia acumulada comparativa
+    print_comparison(comparison_data)
+
+# ---------------------------------------------------------------------------
+# Modo streaming: lee el CSV por bloques y acumula las mismas estadísticas
+# sin cargar el archivo completo en memoria.
+# ---------------------------------------------------------------------------
+
+def dtypes_compactos(columnas):
+    """Tipos compactos para las columnas del CSV de comparación"""
+    dtypes = {}
+    for columna in columnas:
+        if columna == 'round':
+            dtypes[columna] = 'int32'
+        elif columna == 'cards_remaining':
+            dtypes[columna] = 'int16'
+        elif columna.endswith('_result'):
+            dtypes[columna] = 'int8'
+        elif columna.endswith('_decisions'):
+            dtypes[columna] = 'int16'
+        elif columna.endswith('_decision_time_ms') or columna.endswith('_capital_change'):
+            dtypes[columna] = 'int64'
+    return dtypes
+
+def percentile_from_histogram(valores, cuentas, p):
+    """
+    Percentil con interpolación lineal (igual que np.percentile) a partir de
+    un histograma exacto de valores ordenados y sus frecuencias.
+    """
+    n = cuentas.sum()
+    posicion = p / 100 * (n - 1)
+    acumulado = np.cumsum(cuentas)
+    inferior = int(np.floor(posicion))
+    superior = int(np.ceil(posicion))
+    valor_inferior = valores[np.searchsorted(acumulado, inferior, side='right')]
+    valor_superior = valores[np.searchsorted(acumulado, superior, side='right')]
+    return valor_inferior + (valor_superior - valor_inferior) * (posicion - inferior)
+
+def pearson_from_sums(n, sx, sy, sxx, syy, sxy):
+    """Correlación de Pearson a partir de sumas acumuladas (NaN si alguna varianza es 0)"""
+    if n < 2:
+        return np.nan
+    cov = sxy - sx * sy / n
+    var_x = sxx - sx * sx / n
+    var_y = syy - sy * sy / n
+    if var_x <= 0 or var_y <= 0:
+        return np.nan
+    return cov / np.sqrt(var_x * var_y)
+
+class StreakAccumulator:
+    """
+    Rachas de victorias/derrotas calculadas por bloques.
+    Guarda la racha abierta al final de cada bloque para continuarla en el siguiente.
+    """
+    def __init__(self):
+        self.stats = {1: [0, 0, 0], -1: [0, 0, 0]}  # signo -> [cantidad, suma, máximo]
+        self.abierta_signo = 0
+        self.abierta_largo = 0
+
+    def _cerrar(self, signo, largo):
+        if signo in self.stats and largo > 0:
+            stats = self.stats[signo]
+            stats[0] += 1
+            stats[1] += largo
+            stats[2] = max(stats[2], largo)
+
+    def update(self, results):
+        if len(results) == 0:
+            return
+        # Run-length encoding del bloque
+        signos, largos = kernels.run_lengths(np.asarray(results, dtype=np.int8))
+
+        # La primera racha del bloque puede continuar la que quedó abierta
+        if signos[0] == self.abierta_signo:
+            largos[0] += self.abierta_largo
+        else:
+            self._cerrar(self.abierta_signo, self.abierta_largo)
+
+        for signo in (1, -1):
+            mascara = signos[:-1] == signo
+            if mascara.any():
+                stats = self.stats[signo]
+                stats[0] += int(mascara.sum())
+                stats[1] += int(largos[:-1][mascara].sum())
+                stats[2] = max(stats[2], int(largos[:-1][mascara].max()))
+
+        self.abierta_signo = int(signos[-1])
+        self.abierta_largo = int(largos[-1])
+
+    def result(self):
+        """Devuelve (max_win, avg_win, max_loss, avg_loss) como calculate_streaks"""
+        stats = {signo: list(valores) for signo, valores in self.stats.items()}
+        if self.abierta_signo in stats and self.abierta_largo > 0:
+            stats[self.abierta_signo][0] += 1
+            stats[self.abierta_signo][1] += self.abierta_largo
+            stats[self.abierta_signo][2] = max(stats[self.abierta_signo][2], self.abierta_largo)
+        win_n, win_sum, win_max = stats[1]
+        loss_n, loss_sum, loss_max = stats[-1]
+        return (win_max, win_sum / win_n if win_n else 0,
+                loss_max, loss_sum / loss_n if loss_n else 0)
+
+class AgentStreamAccumulator:
+    """Acumula por bloques todas las estadísticas del reporte para un agente"""
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.total_rounds = 0
+        self.counts = {1: 0, -1: 0, 0: 0}
+        self.streaks = StreakAccumulator()
+        # Tiempos: histograma exacto de tiempo promedio por decisión
+        self.time_hist = {}
+        self.total_decisions = 0
+        self.total_time = 0
+        # Sumas para correlación decisiones vs tiempo
+        self.dec_sums = np.zeros(6)  # n, sx, sy, sxx, syy, sxy
+        # Bins de cartas restantes (mismo formato que kernels.binned_result_stats)
+        self.cards_stats = None
+        self.cards_sums = np.zeros(6)
+        # Complejidad: decisions -> [count, sum_time, sumsq_time, sum_result]
+        self.complexity = {}
+
+    def update(self, chunk):
+        p = self.prefix
+        results = chunk[f'{p}_result'].to_numpy()
+        self.total_rounds += len(results)
+        for valor in (1, -1, 0):
+            self.counts[valor] += int((results == valor).sum())
+        self.streaks.update(results)
+
+        # Cartas restantes
+        cards = chunk['cards_remaining'].to_numpy(dtype=np.float64)
+        res = results.astype(np.float64)
+        self.cards_sums += [len(cards), cards.sum(), res.sum(), (cards * cards).sum(), (res * res).sum(), (cards * res).sum()]
+        stats = kernels.binned_result_stats(chunk['cards_remaining'].to_numpy(), results[:, None], CARDS_BINS)
+        if self.cards_stats is None:
+            self.cards_stats = stats
+        else:
+            for clave, valores in stats.items():
+                self.cards_stats[clave] += valores
+
+        # Decisiones
+        decisions = chunk[f'{p}_decisions'].to_numpy()
+        mascara = decisions > 0
+        if not mascara.any():
+            return
+        decisions = decisions[mascara].astype(np.int64)
+        times = chunk[f'{p}_decision_time_ms'].to_numpy()[mascara].astype(np.int64)
+        res = results[mascara]
+        self.total_decisions += int(decisions.sum())
+        self.total_time += int(times.sum())
+
+        avg_time = pd.Series(times / decisions)
+        for valor, cuenta in avg_time.value_counts().items():
+            self.time_hist[valor] = self.time_hist.get(valor, 0) + int(cuenta)
+
+        d, t = decisions.astype(np.float64), times.astype(np.float64)
+        self.dec_sums += [len(d), d.sum(), t.sum(), (d * d).sum(), (t * t).sum(), (d * t).sum()]
+
+        grupos = pd.DataFrame({'d': decisions, 't': t, 'tt': t * t, 'r': res}).groupby('d').agg(
+            count=('t', 'size'), st=('t', 'sum'), stt=('tt', 'sum'), sr=('r', 'sum'))
+        for decision, fila in grupos.iterrows():
+            acumulado = self.complexity.setdefault(int(decision), [0, 0.0, 0.0, 0.0])
+            acumulado[0] += int(fila['count'])
+            acumulado[1] += fila['st']
+            acumulado[2] += fila['stt']
+            acumulado[3] += fila['sr']
+
+    def performance_summary(self):
+        return {
+            'total_rounds': self.total_rounds,
+            'wins': self.counts[1],
+            'losses': self.counts[-1],
+            'ties': self.counts[0],
+            'streaks': self.streaks.result(),
+        }
+
+    def decision_times_summary(self):
+        if not self.time_hist:
+            return None
+        valores = np.array(sorted(self.time_hist))
+        cuentas = np.array([self.time_hist[v] for v in valores])
+        n = cuentas.sum()
+        media = (valores * cuentas).sum() / n
+        std = np.sqrt(((valores - media) ** 2 * cuentas).sum() / (n - 1)) if n > 1 else np.nan
+        return {
+            'rounds': int(n),
+            'total_decisions': self.total_decisions,
+            'total_time': self.total_time,
+            'avg_time': media,
+            'min_time': valores[0],
+            'max_time': valores[-1],
+            'std_time': std,
+            'percentiles': {p: percentile_from_histogram(valores, cuentas, p) for p in PERCENTILES},
+        }
+
+    def cards_summary(self):
+        bins = cards_bins_summary(self.cards_stats) if self.cards_stats is not None else []
+        return bins, pearson_from_sums(*self.cards_sums)
+
+    def complexity_summary(self):
+        if not self.complexity:
+            return None, None
+        filas = []
+        for decision in sorted(self.complexity):
+            count, st, stt, sr = self.complexity[decision]
+            mean_time = st / count
+            std_time = np.sqrt(max(stt - st * st / count, 0) / (count - 1)) if count > 1 else np.nan
+            filas.append((decision, count, mean_time, std_time, sr / count))
+        return pearson_from_sums(*self.dec_sums), filas
+
+def analyze_comparison_streaming(csv_path, chunksize=500_000):
+    """
+    Misma salida que analyze_comparison_performance, pero leyendo el CSV por bloques.
+    La memoria usada depende del tamaño del bloque, no del número de rondas.
+    """
+    columnas = pd.read_csv(csv_path, nrows=0).columns
+    agents = detectar_agentes(columnas)
+    if tipo_csv(columnas) != "comparison":
+        raise ValueError(f"{csv_path} no tiene el formato de comparación (columnas '<agente>_result'); "
+                         "los CSV del formato antiguo se analizan sin --streaming")
+    acumuladores = {prefix: AgentStreamAccumulator(prefix) for _, prefix in agents}
+
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize, dtype=dtypes_compactos(columnas)):
+        for acumulador in acumuladores.values():
+            acumulador.update(chunk)
+
     for agent_name, prefix in agents:
-        df[f'{prefix}_cumulative'] = df[f'{prefix}_result'].cumsum()
-        axes[0, 0].plot(df['round'], df[f'{prefix}_cumulative'], label=agent_name, alpha=0.8)
-    
-    axes[0, 0].set_title('Ganancia Acumulada - Comparación')
-    axes[0, 0].set_xlabel('Ronda')
-    axes[0, 0].set_ylabel('Ganancia Acumulada')
-    axes[0, 0].legend()
-    axes[0, 0].grid(True)
-    
-    # 2. Distribución de resultados
-    results_data = []
+        acumulador = acumuladores[prefix]
+        print_agent_performance(agent_name, acumulador.performance_summary())
+        print_agent_decision_times(agent_name, acumulador.decision_times_summary())
+        bins, correlation = acumulador.cards_summary()
+        print_agent_by_cards_remaining(agent_name, bins, correlation)
+        correlation, filas = acumulador.complexity_summary()
+        print_agent_decision_complexity(agent_name, prefix, correlation, filas)
+
+    comparison_data = []
     for agent_name, prefix in agents:
-        for result in [-1, 0, 1]:
-            count = len(df[df[f'{prefix}_result'] == result])
-            results_data.append({'Agente': agent_name, 'Resultado': result, 'Cantidad': count})
-    
-    results_df = pd.DataFrame(results_data)
-    result_labels = {-1: 'Derrota', 0: 'Empate', 1: 'Victoria'}
-    results_df['Resultado_Label'] = results_df['Resultado'].map(result_labels)
-    
-    pivot_results = results_df.pivot(index='Resultado_Label', columns='Agente', values='Cantidad')
-    pivot_results.plot(kind='bar', ax=axes[0, 1])
-    axes[0, 1].set_title('Distribución de Resultados')
-    axes[0, 1].set_xlabel('Resultado')
-    axes[0, 1].set_ylabel('Cantidad')
-    axes[0, 1].tick_params(axis='x', rotation=45)
-    
-    # 3. Tiempos de decisión comparativos
+        acumulador = acumuladores[prefix]
+        tiempos = acumulador.decision_times_summary()
+        comparison_data.append({
+            'Agente': agent_name,
+            'Victorias': acumulador.counts[1],
+            'Derrotas': acumulador.counts[-1],
+            'Empates': acumulador.counts[0],
+            'Tasa_Victoria_%': acumulador.counts[1] / acumulador.total_rounds * 100,
+            'Tiempo_Promedio_ms': tiempos['avg_time'] if tiempos else 0
+        })
+    print_comparison(comparison_data)
+
+# Máximo de puntos por serie en los gráficos de líneas (ver kernels.minmax_decimate)
+MAX_PUNTOS_SERIE = 4000
+RESULT_LABELS = {-1: 'Derrota', 0: 'Empate', 1: 'Victoria'}
+
+def build_comparison_panels(df, agents, window=50, max_points=MAX_PUNTOS_SERIE):
+    """
+    Calcula los datos de los 6 paneles comparativos. Las series largas se reducen
+    a max_points, así el costo de dibujar no depende del número de rondas.
+    Cada panel es un dict con solo arrays y strings para poder enviarlo a otro proceso.
+    """
+    prefixes = [prefix for _, prefix in agents]
+    results = kernels.result_matrix(df, prefixes)
+    rounds = df['round'].to_numpy()
+
+    def lineas(matrix, etiquetas):
+        return [(etiqueta, *kernels.minmax_decimate(rounds, matrix[:, i], max_points))
+                for i, etiqueta in enumerate(etiquetas)]
+
+    nombres = [agent_name for agent_name, _ in agents]
+    panels = []
+
+    # 1. Ganancia acumulada comparativa
+    panels.append({
+        'slug': 'ganancia_acumulada', 'kind': 'lines', 'grid': True,
+        'title': 'Ganancia Acumulada - Comparación', 'xlabel': 'Ronda', 'ylabel': 'Ganancia Acumulada',
+        'series': lineas(kernels.cumulative(results), nombres),
+    })
+
+    # 2. Distribución de resultados
+    counts = kernels.result_counts(results)
+    panels.append({
+        'slug': 'distribucion_resultados', 'kind': 'bars', 'rotation': 45,
+        'title': 'Distribución de Resultados', 'xlabel': 'Resultado', 'ylabel': 'Cantidad',
+        'categories': [RESULT_LABELS[-1], RESULT_LABELS[0], RESULT_LABELS[1]],
+        'series': [(nombres[i], counts[i, [1, 2, 0]]) for i in range(len(agents))],
+    })
+
+    # 3. Tiempos de decisión comparativos (histograma ya calculado)
+    histogramas = []
     for agent_name, prefix in agents:
-        df_agent = df[df[f'{prefix}_decisions'] > 0].copy()
-        if len(df_agent) > 0:
-            df_agent['avg_time'] = df_agent[f'{prefix}_decision_time_ms'] / df_agent[f'{prefix}_decisions']
-            axes[0, 2].hist(df_agent['avg_time'], bins=30, alpha=0.7, label=agent_name)
-    
-    axes[0, 2].set_title('Distribución de Tiempos de Decisión')
-    axes[0, 2].set_xlabel('Tiempo promedio (ms)')
-    axes[0, 2].set_ylabel('Frecuencia')
-    axes[0, 2].legend()
-    
+        decisions = df[f'{prefix}_decisions'].to_numpy()
+        mascara = decisions > 0
+        if mascara.any():
+            avg_time = df[f'{prefix}_decision_time_ms'].to_numpy()[mascara] / decisions[mascara]
+            histogramas.append((agent_name, *np.histogram(avg_time, bins=30)))
+    panels.append({
+        'slug': 'tiempos_decision', 'kind': 'hist',
+        'title': 'Distribución de Tiempos de Decisión', 'xlabel': 'Tiempo promedio (ms)', 'ylabel': 'Frecuencia',
+        'series': histogramas,
+    })
+
     # 4. Rolling win rate comparativo
-    window = 50
-    for agent_name, prefix in agents:
-        df[f'{prefix}_rolling'] = df[f'{prefix}_result'].rolling(window=window).mean()
-        axes[1, 0].plot(df['round'], df[f'{prefix}_rolling'], label=agent_name, alpha=0.8)
-    
-    axes[1, 0].set_title(f'Tasa de Victoria Promedio (ventana {window})')
-    axes[1, 0].set_xlabel('Ronda')
-    axes[1, 0].set_ylabel('Tasa de Victoria')
-    axes[1, 0].axhline(y=0, color='r', linestyle='--', alpha=0.5)
-    axes[1, 0].legend()
-    
+    panels.append({
+        'slug': 'tasa_victoria_movil', 'kind': 'lines', 'hline': True,
+        'title': f'Tasa de Victoria Promedio (ventana {window})', 'xlabel': 'Ronda', 'ylabel': 'Tasa de Victoria',
+        'series': lineas(kernels.rolling_mean(results, window), nombres),
+    })
+
     # 5. Rendimiento por cartas restantes
-    df['cards_bin'] = pd.cut(df['cards_remaining'], 
-                            bins=[0, 50, 100, 150, 200, 300],
-                            labels=['0-50', '51-100', '101-150', '151-200', '201+'])
-    
-    x_pos = np.arange(len(df['cards_bin'].cat.categories))
-    width = 0.8 / len(agents)
-    
-    for i, (agent_name, prefix) in enumerate(agents):
-        by_cards = df.groupby('cards_bin', observed=True)[f'{prefix}_result'].mean()
-        axes[1, 1].bar(x_pos + i*width - width*(len(agents)-1)/2, by_cards, width, 
-                      label=agent_name, alpha=0.8)
-    
-    axes[1, 1].set_title('Rendimiento por Cartas Restantes')
-    axes[1, 1].set_xlabel('Cartas Restantes')
-    axes[1, 1].set_ylabel('Resultado Promedio')
-    axes[1, 1].set_xticks(x_pos)
-    axes[1, 1].set_xticklabels(df['cards_bin'].cat.categories)
-    axes[1, 1].legend()
-    axes[1, 1].axhline(y=0, color='r', linestyle='--', alpha=0.5)
-    
+    stats = kernels.binned_result_stats(df['cards_remaining'].to_numpy(), results, CARDS_BINS)
+    with np.errstate(invalid='ignore'):
+        by_cards = stats['sum'] / stats['count']
+    panels.append({
+        'slug': 'cartas_restantes', 'kind': 'bars', 'hline': True,
+        'title': 'Rendimiento por Cartas Restantes', 'xlabel': 'Cartas Restantes', 'ylabel': 'Resultado Promedio',
+        'categories': CARDS_LABELS,
+        'series': [(nombres[i], by_cards[:, i]) for i in range(len(agents))],
+    })
+
     # 6. Cambios de capital acumulados
-    for agent_name, prefix in agents:
-        if f'{prefix}_capital_change' in df.columns:
-            df[f'{prefix}_capital_cumulative'] = df[f'{prefix}_capital_change'].cumsum()
-            axes[1, 2].plot(df['round'], df[f'{prefix}_capital_cumulative'], 
-                           label=f'{agent_name} Capital', alpha=0.8)
+    capital_agents = [(agent_name, prefix) for agent_name, prefix in agents if f'{prefix}_capital_change' in df.columns]
+    series = []
+    if capital_agents:
+        capital = kernels.cumulative(kernels.result_matrix(df, [prefix for _, prefix in capital_agents],
+                                                           suffix='capital_change', dtype=np.int64))
+        series = lineas(capital, [f'{agent_name} Capital' for agent_name, _ in capital_agents])
+    panels.append({
+        'slug': 'capital_acumulado', 'kind': 'lines', 'grid': True,
+        'title': 'Cambio de Capital Acumulado', 'xlabel': 'Ronda', 'ylabel': 'Cambio de Capital ($)',
+        'series': series,
+    })
+    return panels
+
+def draw_panel(ax, panel):
+    """Dibuja un panel calculado por build_comparison_panels en el eje dado"""
+    if panel['kind'] == 'lines':
+        for label, x, y in panel['series']:
+            ax.plot(x, y, label=label, alpha=0.8)
+    elif panel['kind'] == 'hist':
+        for label, counts, edges in panel['series']:
+            ax.hist(edges[:-1], bins=edges, weights=counts, alpha=0.7, label=label)
+    elif panel['kind'] == 'bars':
+        x_pos = np.arange(len(panel['categories']))
+        num_series = max(len(panel['series']), 1)
+        width = 0.8 / num_series
+        for i, (label, values) in enumerate(panel['series']):
+            ax.bar(x_pos + i*width - width*(num_series-1)/2, values, width, label=label, alpha=0.8)
+        ax.set_xticks(x_pos)
+        ax.set_xticklabels(panel['categories'])
+        if panel.get('rotation'):
+            ax.tick_params(axis='x', rotation=panel['rotation'])
+
+    ax.set_title(panel['title'])
+    ax.set_xlabel(panel['xlabel'])
+    ax.set_ylabel(panel['ylabel'])
+    if panel.get('hline'):
+        ax.axhline(y=0, color='r', linestyle='--', alpha=0.5)
+    if panel['series']:
+        ax.legend()
+    if panel.get('grid'):
+        ax.grid(True)
+
+def render_panel_figure(panel, filename):
+    """
+    Dibuja un panel en su propia figura y la guarda. Se ejecuta en un proceso aparte,
+    por eso usa Figure directamente en lugar de pyplot (no necesita backend gráfico).
+    """
+    from matplotlib.figure import Figure
+
+    with plt.style.context('seaborn-v0_8'):
+        fig = Figure(figsize=(9, 6))
+        draw_panel(fig.subplots(), panel)
+        fig.tight_layout()
+        fig.savefig(filename, dpi=300, bbox_inches='tight')
+    return filename
+
+def create_comparison_visualizations(df, separate=False, workers=None, max_points=MAX_PUNTOS_SERIE, show=True):
+    """
+    Crea visualizaciones comparativas para todos los agentes disponibles.
+    :param separate: Si es True, guarda cada panel en su propio PNG, renderizando una figura por proceso.
+    :param workers: Procesos para el modo separado (por defecto, uno por panel hasta el número de CPUs).
+    :param max_points: Puntos máximos por serie en los gráficos de líneas.
+    """
+    print("\n" + "="*60)
+    print("GENERANDO VISUALIZACIONES COMPARATIVAS")
+    print("="*60)
     
-    axes[1, 2].set_title('Cambio de Capital Acumulado')
-    axes[1, 2].set_xlabel('Ronda')
-    axes[1, 2].set_ylabel('Cambio de Capital ($)')
-    axes[1, 2].legend()
-    axes[1, 2].grid(True)
+    # Detectar agentes disponibles
+    agents = detectar_agentes(df.columns)
+    panels = build_comparison_panels(df, agents, max_points=max_points)
+    timestamp = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")
+
+    if separate:
+        filenames = [f"markov_comparison_{timestamp}_{panel['slug']}.png" for panel in panels]
+        workers = workers or min(len(panels), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for filename in executor.map(render_panel_figure, panels, filenames):
+                print(f"Gráfico guardado en: {filename}")
+        return
+
+    plt.style.use('seaborn-v0_8')
+    fig, axes = plt.subplots(2, 3, figsize=(18, 12))
+    for ax, panel in zip(axes.flat, panels):
+        draw_panel(ax, panel)
     
     plt.tight_layout()
     
     # Guardar la figura
-    timestamp = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")
     filename = f"markov_comparison_{timestamp}.png"
     plt.savefig(filename, dpi=300, bbox_inches='tight')
     print(f"Gráficos guardados en: {filename}")
     
-    plt.show()
+    if show:
+        plt.show()
+    plt.close(fig)
 
 # ...existing code for old format analysis...
 def analyze_performance(df):
@@ -406,18 +743,45 @@ def analyze_performance(df):
 
 def main():
     """Función principal"""
+    parser = argparse.ArgumentParser(description="Resumen de resultados de la comparación de agentes Markov")
+    parser.add_argument("--archivo", help="CSV a analizar (por defecto, el más reciente)")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Lee el CSV por bloques sin cargarlo entero en memoria (no genera gráficos)")
+    parser.add_argument("--chunksize", type=int, default=500_000, help="Filas por bloque en modo streaming")
+    parser.add_argument("--figuras-separadas", action="store_true",
+                        help="Guarda cada gráfico en su propio PNG, renderizándolos en paralelo")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos para --figuras-separadas")
+    parser.add_argument("--max-puntos", type=int, default=MAX_PUNTOS_SERIE,
+                        help="Puntos máximos por serie en los gráficos de líneas")
+    args = parser.parse_args()
+
     try:
-        # Cargar datos
-        df, file_type = load_latest_csv()
-        
-        if file_type == "comparison":
-            # Análisis para formato de comparación
-            analyze_comparison_performance(df)
-            create_comparison_visualizations(df)
+        if args.archivo:
+            csv_path = args.archivo
+            file_type = tipo_csv(pd.read_csv(csv_path, nrows=0).columns)
+        else:
+            csv_path, file_type = find_latest_csv()
+
+        if args.streaming and file_type == "comparison":
+            print(f"Analizando por bloques de {args.chunksize} filas: {csv_path}")
+            analyze_comparison_streaming(csv_path, chunksize=args.chunksize)
         else:
-            # Análisis para formato antiguo
-            analyze_performance(df)
-            # ...existing old format analysis functions...
+            if args.streaming:
+                # El formato antiguo es de un solo agente y no tiene modo por bloques
+                print(f"{csv_path} tiene el formato antiguo: se analiza entero, sin --streaming")
+            # Cargar datos
+            print(f"Cargando archivo {'de comparación' if file_type == 'comparison' else 'antiguo'}: {csv_path}")
+            df = pd.read_csv(csv_path)
+
+            if file_type == "comparison":
+                # Análisis para formato de comparación
+                analyze_comparison_performance(df)
+                create_comparison_visualizations(df, separate=args.figuras_separadas, workers=args.workers,
+                                                 max_points=args.max_puntos)
+            else:
+                # Análisis para formato antiguo
+                analyze_performance(df)
+                # ...existing old format analysis functions...
         
         print("\n" + "="*60)
         print("ANÁLISIS COMPLETADO")
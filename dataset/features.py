@@ -0,0 +1,275 @@
+"""
+Ingeniería de features compartida entre los scripts de entrenamiento de
+`resultados/` y el AgenteRandomForest.
+
+La matriz X/y ya procesada y los índices del split se guardan en `dataset/cache/`
+como archivos `.npy` (se pueden abrir con memmap). La clave del caché es un hash
+del CSV de origen junto con la especificación de features, de modo que el CSV
+solo se vuelve a leer cuando cambia el archivo o la especificación.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+
+RAIZ_DATASET = os.path.dirname(os.path.abspath(__file__))
+RUTA_DATASET = os.path.join(RAIZ_DATASET, "blackjack_dataset.csv")
+CARPETA_CACHE = os.path.join(RAIZ_DATASET, "cache")
+
+# Se incrementa cuando cambia la forma de calcular las features,
+# así se invalidan los cachés viejos aunque el CSV sea el mismo.
+VERSION_FEATURES = 1
+
+# Tipos compactos para leer el CSV (el default de pandas es int64/float64/object)
+DTYPES_CSV = {
+    "mano_valor": "int8",
+    "mano_es_blanda": "bool",
+    "mano_apuesta": "int32",
+    "mano_num_cartas": "int8",
+    "mano_es_par_divisible": "bool",
+    "agente_nombre": "category",
+    "agente_capital_inicial": "int64",
+    "dealer_valor_carta": "int8",
+    "accion_tomada": "category",
+    "ganancia_neta": "float32",
+    "conteo_cartas": "float32",
+    "recompensa_normalizada": "float32",
+}
+
+COLUMNAS_CLASIFICACION = [
+    "mano_valor",
+    "dealer_valor_carta",
+    "conteo_cartas",
+    "usa_conteo",
+    "mano_es_blanda",
+    "mano_es_par_divisible",
+    "mano_num_cartas",
+    "mano_vs_dealer",
+    "valor_por_carta",
+    "blanda_y_valor",
+    "mano_sobre_dealer",
+    "cartas_por_conteo",
+]
+
+COLUMNAS_REGRESION_BASE = [
+    "mano_valor",
+    "dealer_valor_carta",
+    "conteo_cartas",
+    "mano_es_blanda",
+    "mano_es_par_divisible",
+]
+
+# Especificaciones por tarea: todo lo que afecta a X, y o al split entra en el hash
+SPEC_CLASIFICACION = {
+    "tarea": "clasificacion",
+    "version": VERSION_FEATURES,
+    "rango_recompensa": [-2.0, 2.0],
+    "excluir_agentes": ["AgenteAleatorio"],
+    "columnas": COLUMNAS_CLASIFICACION,
+    "test_size": 0.20,
+    "val_size": 0.25,
+    "random_state": 42,
+    "estratificar": True,
+}
+
+SPEC_REGRESION = {
+    "tarea": "regresion",
+    "version": VERSION_FEATURES,
+    "rango_recompensa": [-2.0, 2.0],
+    "excluir_agentes": [],
+    "columnas": COLUMNAS_REGRESION_BASE,
+    "test_size": 0.20,
+    "val_size": 0.25,
+    "random_state": 42,
+    "estratificar": False,
+}
+
+
+def construir_fila_clasificacion(mano_valor: int, dealer_valor_carta: int, conteo_cartas: int,
+                                 mano_es_blanda: bool, mano_es_par_divisible: bool, mano_num_cartas: int) -> list:
+    """
+    Calcula las features de una sola mano, en el orden de COLUMNAS_CLASIFICACION.
+    Es la versión escalar de construir_features_clasificacion (la usa el agente en cada decisión).
+    """
+    usa_conteo = int(conteo_cartas != 0)
+    mano_es_blanda = int(mano_es_blanda)
+    return [
+        mano_valor,
+        dealer_valor_carta,
+        conteo_cartas,
+        usa_conteo,
+        mano_es_blanda,
+        int(mano_es_par_divisible),
+        mano_num_cartas,
+        mano_valor * dealer_valor_carta,
+        mano_valor / mano_num_cartas,
+        mano_es_blanda * mano_valor,
+        mano_valor / dealer_valor_carta,
+        mano_num_cartas * conteo_cartas * usa_conteo,
+    ]
+
+
+def construir_features_clasificacion(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Versión vectorizada de construir_fila_clasificacion sobre el DataFrame del dataset.
+    :param df: DataFrame ya filtrado, con las columnas originales del CSV.
+    :return: DataFrame con las columnas de COLUMNAS_CLASIFICACION.
+    """
+    usa_conteo = df["conteo_cartas"].notna().astype("int8")
+    conteo = df["conteo_cartas"].fillna(0).astype("float32")
+    mano_valor = df["mano_valor"].astype("float32")
+    dealer = df["dealer_valor_carta"].astype("float32")
+    num_cartas = df["mano_num_cartas"].astype("float32")
+    blanda = df["mano_es_blanda"].astype("int8")
+
+    X = pd.DataFrame({
+        "mano_valor": df["mano_valor"],
+        "dealer_valor_carta": df["dealer_valor_carta"],
+        "conteo_cartas": conteo,
+        "usa_conteo": usa_conteo,
+        "mano_es_blanda": blanda,
+        "mano_es_par_divisible": df["mano_es_par_divisible"].astype("int8"),
+        "mano_num_cartas": df["mano_num_cartas"],
+        "mano_vs_dealer": mano_valor * dealer,
+        "valor_por_carta": mano_valor / num_cartas,
+        "blanda_y_valor": blanda * mano_valor,
+        "mano_sobre_dealer": mano_valor / dealer,
+        "cartas_por_conteo": num_cartas * conteo * usa_conteo,
+    })
+    return X[COLUMNAS_CLASIFICACION]
+
+
+def construir_features_regresion(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Features del script de regresión: estado base + one-hot de la acción tomada.
+    """
+    X = df[COLUMNAS_REGRESION_BASE].copy()
+    X["mano_es_blanda"] = X["mano_es_blanda"].astype("int8")
+    X["mano_es_par_divisible"] = X["mano_es_par_divisible"].astype("int8")
+    X = pd.concat([X, pd.get_dummies(df["accion_tomada"], prefix="acc", dtype="int8")], axis=1)
+    return X
+
+
+def hash_archivo(ruta: str, tam_bloque: int = 1 << 20) -> str:
+    """Hash sha256 del contenido del archivo, leído por bloques."""
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(tam_bloque), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def clave_cache(ruta_csv: str, spec: dict) -> str:
+    """Clave del caché: hash del CSV + hash de la especificación de features."""
+    h = hashlib.sha256()
+    h.update(hash_archivo(ruta_csv).encode())
+    h.update(json.dumps(spec, sort_keys=True).encode())
+    return h.hexdigest()[:16]
+
+
+def leer_dataset(ruta_csv: str, spec: dict) -> pd.DataFrame:
+    """Lee el CSV con tipos compactos y aplica los filtros de la especificación."""
+    df = pd.read_csv(ruta_csv, dtype=DTYPES_CSV)
+    minimo, maximo = spec["rango_recompensa"]
+    df = df[df["recompensa_normalizada"].between(minimo, maximo)]
+    if spec["excluir_agentes"]:
+        df = df[~df["agente_nombre"].isin(spec["excluir_agentes"])]
+    return df.reset_index(drop=True)
+
+
+def _calcular_split(n: int, y: np.ndarray, spec: dict) -> tuple:
+    """
+    Divide en train / val / test igual que los scripts originales,
+    pero sobre índices para poder guardarlos en el caché.
+    """
+    from sklearn.model_selection import train_test_split
+
+    indices = np.arange(n, dtype=np.int64)
+    estratificar = y if spec["estratificar"] else None
+    idx_train_val, idx_test = train_test_split(
+        indices, test_size=spec["test_size"], random_state=spec["random_state"], stratify=estratificar
+    )
+    estratificar = y[idx_train_val] if spec["estratificar"] else None
+    idx_train, idx_val = train_test_split(
+        idx_train_val, test_size=spec["val_size"], random_state=spec["random_state"], stratify=estratificar
+    )
+    return idx_train, idx_val, idx_test
+
+
+def _construir_matrices(df: pd.DataFrame, spec: dict) -> tuple:
+    """Devuelve (X, y, columnas, clases) como arrays compactos según la tarea."""
+    if spec["tarea"] == "clasificacion":
+        X = construir_features_clasificacion(df)
+        clases = sorted(df["accion_tomada"].astype(str).unique())
+        # Mismo orden que LabelEncoder (clases ordenadas alfabéticamente)
+        y = df["accion_tomada"].astype(str).map({c: i for i, c in enumerate(clases)}).to_numpy(dtype=np.int8)
+    else:
+        X = construir_features_regresion(df)
+        clases = []
+        y = df["recompensa_normalizada"].to_numpy(dtype=np.float32)
+    columnas = list(X.columns)
+    return X.to_numpy(dtype=np.float32), y, columnas, clases
+
+
+def cargar_datos(spec: dict, ruta_csv: str = RUTA_DATASET, carpeta_cache: str = CARPETA_CACHE,
+                 mmap: bool = True) -> dict:
+    """
+    Devuelve X, y y los índices del split para la especificación dada,
+    usando el caché si el CSV y la especificación no han cambiado.
+
+    :param spec: SPEC_CLASIFICACION o SPEC_REGRESION (o una variante).
+    :param ruta_csv: Ruta del CSV generado por dataset/crear_dataset.py.
+    :param carpeta_cache: Carpeta donde se guardan los `.npy`.
+    :param mmap: Si es True, los arrays se abren con memmap (solo lectura).
+    :return: dict con 'X', 'y', 'idx_train', 'idx_val', 'idx_test', 'columnas', 'clases'.
+    """
+    clave = clave_cache(ruta_csv, spec)
+    carpeta = os.path.join(carpeta_cache, f"{spec['tarea']}_{clave}")
+    ruta_meta = os.path.join(carpeta, "meta.json")
+    nombres = ("X", "y", "idx_train", "idx_val", "idx_test")
+
+    if not os.path.exists(ruta_meta):
+        df = leer_dataset(ruta_csv, spec)
+        X, y, columnas, clases = _construir_matrices(df, spec)
+        del df
+        idx_train, idx_val, idx_test = _calcular_split(len(y), y, spec)
+
+        # Se escribe en una carpeta temporal propia del proceso y se renombra al final,
+        # así un proceso interrumpido no deja un caché a medias y dos procesos no se pisan.
+        os.makedirs(carpeta_cache, exist_ok=True)
+        carpeta_tmp = tempfile.mkdtemp(prefix=f"{os.path.basename(carpeta)}.", suffix=".tmp", dir=carpeta_cache)
+        for nombre, arr in zip(nombres, (X, y, idx_train, idx_val, idx_test)):
+            np.save(os.path.join(carpeta_tmp, f"{nombre}.npy"), arr)
+        with open(os.path.join(carpeta_tmp, "meta.json"), "w") as f:
+            json.dump({"spec": spec, "columnas": columnas, "clases": clases, "csv": os.path.abspath(ruta_csv)}, f, indent=4)
+        try:
+            os.replace(carpeta_tmp, carpeta)
+        except OSError:
+            # Otro proceso terminó el mismo caché antes: se usa el suyo
+            shutil.rmtree(carpeta_tmp, ignore_errors=True)
+            if not os.path.exists(ruta_meta):
+                raise
+
+    with open(ruta_meta) as f:
+        meta = json.load(f)
+
+    datos = {
+        nombre: np.load(os.path.join(carpeta, f"{nombre}.npy"), mmap_mode="r" if mmap else None)
+        for nombre in nombres
+    }
+    datos["columnas"] = meta["columnas"]
+    datos["clases"] = meta["clases"]
+    return datos
+
+
+def como_dataframe(datos: dict, indices: np.ndarray = None) -> pd.DataFrame:
+    """
+    Envuelve X (o un subconjunto de filas) en un DataFrame con los nombres de columnas,
+    para que los modelos de sklearn queden entrenados con feature names.
+    """
+    X = datos["X"] if indices is None else datos["X"][indices]
+    return pd.DataFrame(X, columns=datos["columnas"], copy=False)
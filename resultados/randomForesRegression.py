@@ -1,6 +1,7 @@
 """
 1. Carga y preprocesa el dataset.
 2. Divide en train / validation / test.
+   (Pasos 1-2 en dataset/features.py, cacheados en dataset/cache/)
 3. RandomizedSearchCV para optimizar hiperparámetros (excluyendo n_estimators).
 4. Guarda cv_results_ en 'randomForest/rf_cv_results.csv'.
 5. Entrenamiento incremental (warm_start) con los mejores parámetros:
@@ -12,44 +13,38 @@
 """
 
 import os
+import sys
 import json
 import joblib
 import pandas as pd
 import matplotlib.pyplot as plt
 
 from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split, RandomizedSearchCV
+from sklearn.model_selection import RandomizedSearchCV
 from sklearn.metrics import mean_squared_error, r2_score
 import numpy as np
 
+# Se ejecuta desde resultados/, agregamos la raíz del proyecto para importar dataset/
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from dataset.features import cargar_datos, como_dataframe, SPEC_REGRESION
+
 def main():
     # 0. Crear carpeta de resultados
     output_dir = "randomForest3"
     os.makedirs(output_dir, exist_ok=True)
 
-    # 1. Carga y filtrado de outliers
-    df = pd.read_csv("../dataset/blackjack_dataset.csv")
-    df = df[df["recompensa_normalizada"].between(-2.0, 2.0)].reset_index(drop=True)
-
-    # 2. Preparo X e y
-    X = df[[
-        "mano_valor", "dealer_valor_carta", "conteo_cartas",
-        "mano_es_blanda", "mano_es_par_divisible"
-    ]].copy()
-    X["mano_es_blanda"] = X["mano_es_blanda"].astype(int)
-    X["mano_es_par_divisible"] = X["mano_es_par_divisible"].astype(int)
-    # one-hot encoding de la acción
-    X = pd.concat([X, pd.get_dummies(df["accion_tomada"], prefix="acc")], axis=1)
-
-    y = df["recompensa_normalizada"]
-
-    # 3. Split: train (60%), val (20%), test (20%)
-    X_train_val, X_test, y_train_val, y_test = train_test_split(
-        X, y, test_size=0.20, random_state=42
-    )
-    X_train, X_val, y_train, y_val = train_test_split(
-        X_train_val, y_train_val, test_size=0.25, random_state=42
-    )
+    # 1-3. Carga, features y split desde el caché compartido (dataset/features.py)
+    datos = cargar_datos(SPEC_REGRESION)
+
+    idx_train_val = np.concatenate([datos["idx_train"], datos["idx_val"]])
+    X_train     = como_dataframe(datos, datos["idx_train"])
+    X_val       = como_dataframe(datos, datos["idx_val"])
+    X_test      = como_dataframe(datos, datos["idx_test"])
+    X_train_val = como_dataframe(datos, idx_train_val)
+    y_train     = datos["y"][datos["idx_train"]]
+    y_val       = datos["y"][datos["idx_val"]]
+    y_test      = datos["y"][datos["idx_test"]]
+    y_train_val = datos["y"][idx_train_val]
 
     # 4. Búsqueda aleatoria de hiperparámetros
     param_dist = {
@@ -7,6 +7,7 @@ train_rf_action_clf.py
 3. Crea indicador usa_conteo y rellena conteo_cartas.
 4. Prepara X (features de estado) e y (acción tomada).
 5. Divide en train (60%), val (20%), test (20%).
+   (Pasos 1-5 en dataset/features.py, cacheados en dataset/cache/)
 6. RandomizedSearchCV en train para optimizar hiperparámetros.
 7. Entrenamiento incremental (warm_start) para trazar accuracy train vs val.
 8. Evalúa en test con classification_report y matriz de confusión.
@@ -14,66 +15,42 @@ train_rf_action_clf.py
 """
 
 import os
+import sys
 import json
 import joblib
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
 from sklearn.ensemble        import RandomForestClassifier
-from sklearn.model_selection import train_test_split, RandomizedSearchCV
+from sklearn.model_selection import RandomizedSearchCV
 from sklearn.preprocessing   import LabelEncoder
 from sklearn.metrics         import classification_report, confusion_matrix, accuracy_score, log_loss, ConfusionMatrixDisplay, f1_score
 
+# Se ejecuta desde resultados/, agregamos la raíz del proyecto para importar dataset/
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from dataset.features import cargar_datos, como_dataframe, SPEC_CLASIFICACION
+
 def main():
     output_dir = "randomForestClass7"
     os.makedirs(output_dir, exist_ok=True)
 
-    # 1. Carga y filtrado por recompensa_normalizada
-    df = pd.read_csv("../dataset/blackjack_dataset.csv")
-    df = df[df["recompensa_normalizada"].between(-2.0, 2.0)].reset_index(drop=True)
-
-    # 2. Filtrar el AgenteAleatorio
-    df = df[df["agente_nombre"] != "AgenteAleatorio"].reset_index(drop=True)
-
-    # 3. Indicador de uso de conteo y reemplazo de None
-    df["usa_conteo"] = df["conteo_cartas"].notna().astype(int)
-    df["conteo_cartas"] = df["conteo_cartas"].fillna(0)
-
-    # 4. Preparación de X e y
-    X = df[[
-        "mano_valor",
-        "dealer_valor_carta",
-        "conteo_cartas",
-        "usa_conteo",
-        "mano_es_blanda",
-        "mano_es_par_divisible",
-        "mano_num_cartas"
-    ]].copy()
-    X[["mano_es_blanda", "mano_es_par_divisible"]] = \
-        X[["mano_es_blanda", "mano_es_par_divisible"]].astype(int)
-
-    X["mano_vs_dealer"] = df["mano_valor"] * df["dealer_valor_carta"]
-    X["valor_por_carta"] = df["mano_valor"] / df["mano_num_cartas"]
-    X["blanda_y_valor"] = df["mano_es_blanda"] * df["mano_valor"]
-    X["mano_sobre_dealer"] = df["mano_valor"] / df["dealer_valor_carta"]
-    X["cartas_por_conteo"] = (df["mano_num_cartas"] * df["conteo_cartas"] * df["usa_conteo"])
+    # 1-5. Carga, filtrado, features y split desde el caché compartido
+    # (solo se relee el CSV si cambió el archivo o la especificación de features)
+    datos = cargar_datos(SPEC_CLASIFICACION)
 
     le = LabelEncoder()
-    y = le.fit_transform(df["accion_tomada"])
-
-    # 5. División train (60%), val (20%), test (20%)
-    X_train_val, X_test, y_train_val, y_test = train_test_split(
-        X, y,
-        test_size=0.20,
-        random_state=42,
-        stratify=y
-    )
-    X_train, X_val, y_train, y_val = train_test_split(
-        X_train_val, y_train_val,
-        test_size=0.25,
-        random_state=42,
-        stratify=y_train_val
-    )
+    le.fit(datos["clases"])
+
+    idx_train_val = np.concatenate([datos["idx_train"], datos["idx_val"]])
+    X_train     = como_dataframe(datos, datos["idx_train"])
+    X_val       = como_dataframe(datos, datos["idx_val"])
+    X_test      = como_dataframe(datos, datos["idx_test"])
+    X_train_val = como_dataframe(datos, idx_train_val)
+    y_train     = datos["y"][datos["idx_train"]]
+    y_val       = datos["y"][datos["idx_val"]]
+    y_test      = datos["y"][datos["idx_test"]]
+    y_train_val = datos["y"][idx_train_val]
 
     # 6. RandomizedSearchCV para optimizar hiperparámetros
     param_dist = {
@@ -1,10 +1,11 @@
-import time
-import csv
 import datetime
 import os
 import joblib
 from core.player import Jugador
 from core.casino import Casino
+from core.checkpoint import guardar_checkpoint, cargar_checkpoint, restaurar_checkpoint
+from core.escritor_resultados import EscritorResultados
+from core.comparacion_secuencial import ComparacionSecuencial
 from agents.markov import AgenteMarkov_arriesgado, AgenteMarkov_normal
 from agents.agente_A_5 import AgenteAleatorio_5
 from agents.markov_umbral import AgenteMarkov_prob_estable_por_umbral
@@ -16,6 +17,18 @@ from agents.markovPoliticaApuestas import AgenteMarkov_PoliticaApuestas
 # ========== CONFIGURACIÓN ==========
 NUM_RONDAS = 5000
 DINERO_INICIAL = 90000000
+# Si se define, la simulación guarda un checkpoint cada CHECKPOINT_CADA rondas y retoma desde él
+RUTA_CHECKPOINT = os.environ.get("RUTA_CHECKPOINT")
+CHECKPOINT_CADA = 100
+# Filas de resultados acumuladas antes de agregarlas al CSV
+FILAS_POR_BLOQUE = 100
+# Pares de agentes (por nombre) que se comparan ronda a ronda con parada secuencial
+# (core/comparacion_secuencial.py): la partida termina cuando todos están resueltos,
+# con NUM_RONDAS como tope. Vacío: se juegan siempre las NUM_RONDAS.
+PARES_COMPARADOS = []  # p. ej. [("Markov_Normal", "HiLo"), ("Markov_Normal", "Aleatorio1")]
+CONFIANZA_COMPARACION = 0.95
+# Diferencia por ronda por debajo de la cual dos agentes se dan por equivalentes (None: no se usa)
+MARGEN_EQUIVALENCIA = None
 
 def inicializar_tracking_agentes(agentes):
     """Inicializa estructuras de tracking para todos los agentes dinámicamente"""
@@ -43,19 +56,12 @@ def actualizar_resultado_agente(tracking, nombre_agente, capital_change):
         tracking[nombre_agente]['ties'] += 1
         return 0
 
-def crear_wrapper_timing(agente_nombre, tracking):
-    """Crea un wrapper para medir tiempos de decisión de un agente específico"""
-    agente = tracking[agente_nombre]['agente_ref']
-    original_decidir = agente.decidir_accion
+def crear_hook_decision(tracking):
+    """Crea el hook de Casino que registra el tiempo de cada decisión en el tracking del agente"""
+    def registrar_decision(agente, mano, carta_dealer, accion, segundos):
+        tracking[agente.jugador.nombre]['decision_times'].append(segundos)
     
-    def timed_decidir(mano, carta_dealer):
-        start_time = time.time()
-        result = original_decidir(mano, carta_dealer)
-        decision_time = time.time() - start_time
-        tracking[agente_nombre]['decision_times'].append(decision_time)
-        return result
-    
-    return timed_decidir
+    return registrar_decision
 
 def generar_fieldnames_csv(agentes):
     """Genera los nombres de columnas del CSV dinámicamente basado en los agentes"""
@@ -70,104 +76,82 @@ def generar_fieldnames_csv(agentes):
         ])
     return fieldnames
 
-def test_all():
-    print(f"Iniciando test de agentes Markov con {NUM_RONDAS} rondas...")
-    
-    # Inicialización de agentes
-    jugador_markov_normal = Jugador("Markov_Normal", DINERO_INICIAL)
-    agente_markov_normal = AgenteMarkov_normal(jugador_markov_normal, num_mazos=4)
-    
-    jugador_markov_arriesgado = Jugador("Markov_Arriesgado", DINERO_INICIAL)
-    agente_markov_arriesgado = AgenteMarkov_arriesgado(jugador_markov_arriesgado, num_mazos=4)
-    
-    jugador_markov_umbral = Jugador("Markov_Umbral", DINERO_INICIAL)
-    agente_markov_umbral = AgenteMarkov_prob_estable_por_umbral(jugador_markov_umbral, num_mazos=4)
-    
-    recompensas = {
-        'victoria': 0.49809807538986206,  
-        'derrota': -0.38012391328811646,
-        'empate': 0.0  
-    }
-    agente_markov_umbral.set_recompensas(recompensas)
-
-    jugador_markov_hibrido = Jugador("Markov_Hibrido", DINERO_INICIAL)
-    agente_markov_hibrido = AgenteHibrido_Markov_HiLo(jugador_markov_hibrido, num_mazos=4)
+def estado_tracking(tracking):
+    """Contadores del tracking para el checkpoint, sin las referencias a los agentes"""
+    return {nombre: {'wins': stats['wins'], 'losses': stats['losses'], 'ties': stats['ties'],
+                     'decision_times': list(stats['decision_times'])}
+            for nombre, stats in tracking.items()}
 
-    recompensas_hibrido = {
-        'victoria': 0.49809807538986206,  
-        'derrota': -0.38012391328811646,
-        'empate': 0.0    
-    }
-    agente_markov_hibrido.set_recompensas(recompensas_hibrido)
-    agente_markov_hibrido.set_factor_riesgo(0.01)
+def simular_torneo(agentes, num_rondas, csv_filename=None, ruta_checkpoint=RUTA_CHECKPOINT,
+                   checkpoint_cada=CHECKPOINT_CADA, pares_comparados=PARES_COMPARADOS):
+    """
+    Juega el torneo entre los agentes y escribe los resultados por ronda en el CSV.
+    Con ruta_checkpoint guarda un checkpoint cada checkpoint_cada rondas y, si ya existe, retoma desde él.
 
-    jugador_hilo = Jugador("HiLo", DINERO_INICIAL)
-    agente_hilo = AgenteHiLo(jugador_hilo, base_bet=5, min_bet=1, max_bet_fraction=0.1)
-
-    jugador_aleatorio1 = Jugador("Aleatorio1", DINERO_INICIAL)
-    agente_aleatorio1 = AgenteAleatorio_5(jugador_aleatorio1)
-    
-    jugador_aleatorio2 = Jugador("Aleatorio2", DINERO_INICIAL)
-    agente_aleatorio2 = AgenteAleatorio_5(jugador_aleatorio2)
-    
-    jugador_random_forest = Jugador("RandomForest", DINERO_INICIAL)
-    modelo_path = "resultados/randomForestClass6/rf_action_clf.joblib"
-    encoder_path = "resultados/randomForestClass6/label_encoder.joblib"
-    agente_random_forest = AgenteRandomForest(jugador_random_forest, modelo_path, encoder_path)
-
-    jugador_markov_politica = Jugador("Markov_Politica", DINERO_INICIAL)
-    agente_markov_politica = AgenteMarkov_PoliticaApuestas(jugador_markov_politica, num_mazos=4)
-    
-    agentes = [agente_markov_normal, agente_markov_arriesgado, agente_markov_umbral, 
-               agente_markov_hibrido, agente_hilo, agente_aleatorio1, agente_aleatorio2,
-               agente_random_forest, agente_markov_politica]
-    
+    :return: (tracking por agente, rondas jugadas, comparación secuencial o None, ruta del CSV)
+    """
     # Inicializar tracking dinámico
     tracking_agentes = inicializar_tracking_agentes(agentes)
     
-    # Create unique filename with timestamp
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    csv_filename = f"test_markov_comparison_{timestamp}.csv"
+    if csv_filename is None:
+        # Create unique filename with timestamp
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        csv_filename = f"test_markov_comparison_{timestamp}.csv"
+    checkpoint = None
+    if ruta_checkpoint and os.path.exists(ruta_checkpoint):
+        # Al retomar se sigue escribiendo en el CSV de la corrida interrumpida
+        checkpoint = cargar_checkpoint(ruta_checkpoint)
+        csv_filename = checkpoint["extra"]["resultados"]["filepath"]
     
     print(f"Agentes creados: {[a.jugador.nombre for a in agentes]}")
     
     fieldnames = generar_fieldnames_csv(agentes)
-    csv_data = []
+    capitales_iniciales = {agente.jugador.nombre.lower().replace(' ', '_'): agente.jugador.capital for agente in agentes}
+    try:
+        escritor = EscritorResultados(csv_filename, fieldnames, cada=FILAS_POR_BLOQUE,
+                                      capitales_iniciales=capitales_iniciales)
+    except PermissionError as e:
+        print(f"Error saving CSV file: {e}")
+        csv_filename = os.path.join(os.path.expanduser("~"), "Desktop", csv_filename)
+        print(f"Saving data to alternative location: {csv_filename}")
+        escritor = EscritorResultados(csv_filename, fieldnames, cada=FILAS_POR_BLOQUE,
+                                      capitales_iniciales=capitales_iniciales)
     
     print("NOTA: Agentes Markov apuestan $5 por ronda, HiLo usa apuesta adaptativa")
 
-    # Configurar wrappers de timing para todos los agentes
-    for agente in agentes:
-        nombre = agente.jugador.nombre
-        agente.decidir_accion = crear_wrapper_timing(nombre, tracking_agentes)
-
     casino = Casino(agentes, num_mazos=4, zapato=0.75)
-    original_jugar_ronda = casino._jugar_ronda
+    # Tiempos de decisión medidos por el propio Casino
+    casino.agregar_hook('decision', crear_hook_decision(tracking_agentes))
     round_number = 0
+    capitals_inicio = {}
+    comparacion = None
+    if pares_comparados:
+        comparacion = ComparacionSecuencial(pares_comparados, confianza=CONFIANZA_COMPARACION,
+                                            rondas_maximas=num_rondas, margen=MARGEN_EQUIVALENCIA)
+    cards_remaining = 0
 
-    def tracked_jugar_ronda():
-        nonlocal round_number
+    def inicio_ronda(casino):
+        nonlocal round_number, cards_remaining
         round_number += 1
         
         # Capitals antes de la ronda
-        capitals_inicio = {}
         for agente in agentes:
             nombre = agente.jugador.nombre
             capitals_inicio[nombre] = agente.jugador.capital
             tracking_agentes[nombre]['decision_times'].clear()
         
-        cards_remaining = sum(agente_markov_normal.cartas_restantes)
+        cards_remaining = sum(casino.conteo_zapato.conteos)
         
         if round_number % 100 == 0:
             print(f"Ejecutando ronda {round_number}...")
-        
-        original_jugar_ronda()
-        
+
+    def fin_ronda(casino):
         # Procesar resultados de todos los agentes
         round_data = {
             'round': round_number,
             'cards_remaining': cards_remaining
         }
+        cambios_capital = {}
         
         for agente in agentes:
             nombre = agente.jugador.nombre
@@ -175,6 +159,7 @@ def test_all():
             
             capital_final = agente.jugador.capital
             capital_change = capital_final - capitals_inicio[nombre]
+            cambios_capital[nombre] = capital_change
             
             resultado = actualizar_resultado_agente(tracking_agentes, nombre, capital_change)
             
@@ -186,7 +171,9 @@ def test_all():
                 f'{nombre_csv}_capital_change': capital_change
             })
         
-        csv_data.append(round_data)
+        escritor.agregar(round_data)
+        if comparacion is not None:
+            comparacion.agregar(cambios_capital)
         
         if round_number % 100 == 0:
             print(f"Ronda {round_number} completada.")
@@ -195,10 +182,24 @@ def test_all():
                 capital_change = agente.jugador.capital - capitals_inicio[nombre]
                 print(f"  {nombre}: Capital={agente.jugador.capital} (Δ{capital_change:+d})")
 
-    def tracked_jugar_partida(num_rondas: int):
+    casino.agregar_hook('inicio_ronda', inicio_ronda)
+    casino.agregar_hook('fin_ronda', fin_ronda)
+
+    def jugar_partida(num_rondas: int):
         """Versión modificada que termina cuando no hay jugadores con dinero"""
+        nonlocal round_number, comparacion
+        ronda_inicial = 0
+        if checkpoint is not None:
+            extra = restaurar_checkpoint(casino, checkpoint)["extra"]
+            ronda_inicial = round_number = extra["round_number"]
+            escritor.restaurar_checkpoint(extra["resultados"])
+            comparacion = extra["comparacion"]
+            # Solo los contadores: 'agente_ref' sigue apuntando a los agentes restaurados
+            for nombre, stats in extra["tracking"].items():
+                tracking_agentes[nombre].update(stats)
+            print(f"Retomando desde la ronda {ronda_inicial + 1} ({ruta_checkpoint})")
         print(f"Iniciando partida de {num_rondas} rondas")
-        for i in range(num_rondas):
+        for i in range(ronda_inicial, num_rondas):
             print(f"Ronda {i + 1} / {num_rondas}")
             
             # Verificar si algún agente puede apostar
@@ -212,38 +213,84 @@ def test_all():
                 print(f"Partida terminada en ronda {i + 1}: Ningún jugador puede apostar")
                 break
                 
-            tracked_jugar_ronda()
+            casino._jugar_ronda()
             for agente in agentes:
                 print(f"'{agente.jugador.nombre}': Capital = {agente.jugador.capital}")
+            if ruta_checkpoint and ((i + 1) % checkpoint_cada == 0 or i + 1 == num_rondas):
+                guardar_checkpoint(casino, ruta_checkpoint, i + 1, extra={
+                    "round_number": round_number, "resultados": escritor.estado_checkpoint(),
+                    "tracking": estado_tracking(tracking_agentes), "comparacion": comparacion})
+            if comparacion is not None and comparacion.resuelta:
+                print(f"Comparaciones resueltas en la ronda {i + 1}")
+                break
         print("Partida terminada")
 
-    casino._jugar_ronda = tracked_jugar_ronda
-    casino.jugar_partida = tracked_jugar_partida
+    print(f"Iniciando simulación de {num_rondas} rondas...")
+    jugar_partida(num_rondas)
 
-    print(f"Iniciando simulación de {NUM_RONDAS} rondas...")
-    casino.jugar_partida(NUM_RONDAS)
+    escritor.cerrar()
+    return tracking_agentes, round_number, comparacion, csv_filename
 
-    # Save CSV with error handling
-    try:
-        with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(csv_data)
-        print(f"Data saved to {csv_filename}")
-    except PermissionError as e:
-        print(f"Error saving CSV file: {e}")
-        alt_filename = os.path.join(os.path.expanduser("~"), "Desktop", csv_filename)
-        try:
-            with open(alt_filename, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(csv_data)
-            print(f"Data saved to alternative location: {alt_filename}")
-        except Exception as e2:
-            print(f"Failed to save to alternative location: {e2}")
+def test_all():
+    print(f"Iniciando test de agentes Markov con {NUM_RONDAS} rondas...")
+    
+    # Inicialización de agentes
+    jugador_markov_normal = Jugador("Markov_Normal", DINERO_INICIAL)
+    agente_markov_normal = AgenteMarkov_normal(jugador_markov_normal, num_mazos=4)
+    
+    jugador_markov_arriesgado = Jugador("Markov_Arriesgado", DINERO_INICIAL)
+    agente_markov_arriesgado = AgenteMarkov_arriesgado(jugador_markov_arriesgado, num_mazos=4)
+    
+    jugador_markov_umbral = Jugador("Markov_Umbral", DINERO_INICIAL)
+    agente_markov_umbral = AgenteMarkov_prob_estable_por_umbral(jugador_markov_umbral, num_mazos=4)
+    
+    recompensas = {
+        'victoria': 0.49809807538986206,  
+        'derrota': -0.38012391328811646,
+        'empate': 0.0  
+    }
+    agente_markov_umbral.set_recompensas(recompensas)
+
+    jugador_markov_hibrido = Jugador("Markov_Hibrido", DINERO_INICIAL)
+    agente_markov_hibrido = AgenteHibrido_Markov_HiLo(jugador_markov_hibrido, num_mazos=4)
+
+    recompensas_hibrido = {
+        'victoria': 0.49809807538986206,  
+        'derrota': -0.38012391328811646,
+        'empate': 0.0    
+    }
+    agente_markov_hibrido.set_recompensas(recompensas_hibrido)
+    agente_markov_hibrido.set_factor_riesgo(0.01)
+
+    jugador_hilo = Jugador("HiLo", DINERO_INICIAL)
+    agente_hilo = AgenteHiLo(jugador_hilo, base_bet=5, min_bet=1, max_bet_fraction=0.1)
+
+    jugador_aleatorio1 = Jugador("Aleatorio1", DINERO_INICIAL)
+    agente_aleatorio1 = AgenteAleatorio_5(jugador_aleatorio1)
+    
+    jugador_aleatorio2 = Jugador("Aleatorio2", DINERO_INICIAL)
+    agente_aleatorio2 = AgenteAleatorio_5(jugador_aleatorio2)
+    
+    jugador_random_forest = Jugador("RandomForest", DINERO_INICIAL)
+    modelo_path = "resultados/randomForestClass6/rf_action_clf.joblib"
+    encoder_path = "resultados/randomForestClass6/label_encoder.joblib"
+    agente_random_forest = AgenteRandomForest(jugador_random_forest, modelo_path, encoder_path)
+
+    jugador_markov_politica = Jugador("Markov_Politica", DINERO_INICIAL)
+    agente_markov_politica = AgenteMarkov_PoliticaApuestas(jugador_markov_politica, num_mazos=4)
+    
+    agentes = [agente_markov_normal, agente_markov_arriesgado, agente_markov_umbral, 
+               agente_markov_hibrido, agente_hilo, agente_aleatorio1, agente_aleatorio2,
+               agente_random_forest, agente_markov_politica]
+    
+    tracking_agentes, total_rounds, comparacion, csv_filename = simular_torneo(agentes, NUM_RONDAS)
+    print(f"Data saved to {csv_filename}")
+    if comparacion is not None:
+        print("\nCOMPARACIÓN SECUENCIAL")
+        for linea in comparacion.resumen():
+            print(f"  {linea}")
 
     # Resultados finales para todos los agentes
-    total_rounds = round_number
     if total_rounds > 0:
         print(f"\n" + "="*60)
         print("RESULTADOS FINALES - COMPARACIÓN DE AGENTES")
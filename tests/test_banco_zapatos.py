@@ -0,0 +1,55 @@
+import pickle
+import random
+import numpy as np
+from core.casino import Casino
+from core.player import Jugador
+from core.banco_zapatos import generar_banco, abrir_banco, MazoBanco, CARTAS
+from agents.agente_HiLo import AgenteHiLo
+
+# Tests para el banco de zapatos pregenerados (core/banco_zapatos.py)
+
+
+def test_banco_reproducible_con_zapatos_completos(tmp_path):
+    ruta = str(tmp_path / "banco.npy")
+    generar_banco(ruta, num_zapatos=50, num_mazos=2, semilla=3, lote=7)
+    banco = abrir_banco(ruta)
+    assert len(banco) == 50 and banco.num_mazos == 2 and abrir_banco(ruta) is banco
+    for i in range(len(banco)):
+        # Cada zapato tiene cada carta dos veces y el corte dentro del 25% final
+        assert (np.bincount(banco.cartas(i), minlength=52) == 2).all()
+        assert 15 <= banco.limite(i) <= 26
+    assert len({banco.cartas(i).tobytes() for i in range(len(banco))}) == 50
+
+    otra = str(tmp_path / "otra.npy")
+    generar_banco(otra, num_zapatos=50, num_mazos=2, semilla=3, lote=7)
+    assert (np.load(otra) == np.load(ruta)).all()
+
+
+def test_mazo_banco_reparte_en_orden_y_sigue_con_el_proximo(tmp_path):
+    banco = abrir_banco(generar_banco(str(tmp_path / "banco.npy"), num_zapatos=4, num_mazos=1, semilla=1))
+    mazo = MazoBanco(banco, 3, paso=2)
+    repartidas = [mazo.repartir() for _ in range(10)]
+    assert repartidas == [CARTAS[codigo] for codigo in banco.cartas(3)[:10]]
+    assert len(mazo) == 42 and mazo.limite_barajado == banco.limite(3)
+
+    # Con pickle (checkpoints) se guarda la posición, no las cartas
+    copia = pickle.loads(pickle.dumps(mazo))
+    assert copia.cartas == mazo.cartas and copia.banco is banco
+    assert mazo.siguiente_zapato().indice == 1
+
+
+def test_casino_repite_los_mismos_zapatos(tmp_path):
+    banco = abrir_banco(generar_banco(str(tmp_path / "banco.npy"), num_zapatos=20, num_mazos=1, semilla=5))
+
+    def jugar(semilla):
+        random.seed(semilla)
+        agente = AgenteHiLo(Jugador("HiLo", 10000))
+        casino = Casino([agente], num_mazos=1, mazo=MazoBanco(banco, 0))
+        for _ in range(40):
+            casino._jugar_ronda()
+        return agente.jugador.capital, casino.mazo.indice
+
+    capital, indice = jugar(1)
+    # Las cartas salen del banco: la semilla de random no cambia nada
+    assert jugar(2) == (capital, indice)
+    assert indice > 0
@@ -0,0 +1,74 @@
+import json
+import numpy as np
+from benchmarks import suite, historial
+
+# Tests de la suite de benchmarks (benchmarks/suite.py) y del historial (benchmarks/historial.py)
+
+
+def test_suite_filtrada_genera_json():
+    reporte = suite.ejecutar_suite(repeticiones=2, tiempo_minimo=0.001, filtro="mazo/")
+    nombres = [r["nombre"] for r in reporte["resultados"]]
+    assert nombres == ["mazo/barajar_6", "mazo/repartir_6"]
+    for resultado in reporte["resultados"]:
+        assert len(resultado["muestras"]) == 2
+        assert resultado["mediana"] > 0
+    assert reporte["meta"]["semilla"] == suite.SEMILLA
+    json.dumps(reporte)
+
+
+def test_latencias_de_decision():
+    segundos, decisiones, extra = suite.bench_decision(20, "AgenteHiLo", num_mazos=1)
+    assert decisiones > 0 and segundos > 0
+    assert extra["p50_us"] <= extra["p99_us"]
+
+
+def test_benchmarks_deterministas():
+    # Misma semilla -> mismos zapatos -> misma cantidad de decisiones
+    assert suite.bench_decision(30, "AgenteHiLo", 4)[1] == suite.bench_decision(30, "AgenteHiLo", 4)[1]
+
+
+def _reporte(commit, muestras, cambios_sin_commit=False):
+    return {
+        "meta": {"commit": commit, "maquina": "m1", "fecha": "2025-01-01T00:00:00",
+                 "cambios_sin_commit": cambios_sin_commit},
+        "resultados": [{"nombre": nombre, "unidad": "rondas/s", "muestras": valores} for nombre, valores in muestras.items()],
+    }
+
+
+def test_historial_detecta_regresion(tmp_path, capsys):
+    ruta = str(tmp_path / "historial.jsonl")
+    rng = np.random.default_rng(0)
+    base = {"casino/a": list(rng.normal(100, 2, 10)), "casino/b": list(rng.normal(100, 2, 10))}
+    # casino/a es 20% más lento, casino/b igual
+    actual = {"casino/a": list(rng.normal(80, 2, 10)), "casino/b": list(rng.normal(100, 2, 10))}
+    historial.agregar(_reporte("aaa", base), ruta)
+    historial.agregar(_reporte("bbb", actual), ruta)
+
+    assert historial.main(["--historial", ruta, "comparar", "--umbral", "0.05"]) == 1
+    salida = capsys.readouterr().out
+    assert "casino/a" in salida and "REGRESIÓN" in salida
+    filas = {f["nombre"]: f for f in historial.comparar(historial.muestras_por_commit(historial.cargar(ruta), "aaa", "m1"),
+                                                        historial.muestras_por_commit(historial.cargar(ruta), "bbb", "m1"))}
+    assert filas["casino/a"]["regresion"] and not filas["casino/b"]["regresion"]
+
+    # Con un umbral mayor a la caída no falla
+    assert historial.main(["--historial", ruta, "comparar", "--umbral", "0.5"]) == 0
+
+
+def test_historial_ignora_corridas_sin_commit(tmp_path):
+    ruta = str(tmp_path / "historial.jsonl")
+    rng = np.random.default_rng(0)
+    historial.agregar(_reporte("aaa", {"casino/a": list(rng.normal(100, 2, 10))}), ruta)
+    historial.agregar(_reporte("bbb", {"casino/a": list(rng.normal(100, 2, 10))}), ruta)
+    # Una corrida con cambios sin commit sobre bbb, 20% más lenta
+    historial.agregar(_reporte("bbb", {"casino/a": list(rng.normal(80, 2, 10))}, cambios_sin_commit=True), ruta)
+
+    corridas = historial.cargar(ruta)
+    assert len(historial.muestras_por_commit(corridas, "bbb", "m1")["casino/a"]) == 10
+    assert len(historial.muestras_por_commit(corridas, "bbb", "m1", incluir_sin_commit=True)["casino/a"]) == 20
+    assert historial.main(["--historial", ruta, "comparar", "--umbral", "0.05"]) == 0
+    assert historial.main(["--historial", ruta, "comparar", "--umbral", "0.05", "--incluir-sin-commit"]) == 1
+
+
+def test_historial_sin_datos(tmp_path):
+    assert historial.main(["--historial", str(tmp_path / "vacio.jsonl"), "comparar"]) == 2
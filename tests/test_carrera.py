@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from core.banco_zapatos import generar_banco
+from core.carrera import Carrera, jugar_zapatos
+from agents.agente_HiLo import AgenteHiLo
+from agents.agente_A_5 import AgenteAleatorio_5
+from agents.agente_aleatorio import AgenteAleatorio
+
+# Tests para la carrera entre candidatos con zapatos compartidos (core/carrera.py)
+
+
+@pytest.fixture
+def banco(tmp_path):
+    return generar_banco(str(tmp_path / "banco.npy"), num_zapatos=256, num_mazos=1, semilla=2)
+
+
+def test_zapatos_iguales_en_cualquier_reparto(banco):
+    entero, rondas = jugar_zapatos(AgenteAleatorio_5, banco, 0, 12)
+    primera, rondas_1 = jugar_zapatos(AgenteAleatorio_5, banco, 0, 5)
+    segunda, rondas_2 = jugar_zapatos(AgenteAleatorio_5, banco, 5, 12)
+    assert np.array_equal(entero, np.concatenate([primera, segunda]))
+    assert rondas == rondas_1 + rondas_2 > 12
+
+
+def test_descarta_a_los_dominados_y_ahorra_rondas(banco):
+    candidatos = {"hilo": AgenteHiLo, "aleatorio": AgenteAleatorio, "aleatorio_5": AgenteAleatorio_5}
+    resultado = Carrera(candidatos, banco, mejores=1, zapatos_maximos=128).correr()
+    assert resultado.ranking == ["hilo"]
+    assert set(resultado.eliminados) == {"aleatorio", "aleatorio_5"}
+    assert resultado.rondas_totales < resultado.rondas_sin_carrera
+    assert len(resultado.ganancias["hilo"]) >= max(zapatos for _, zapatos, _ in resultado.eliminados.values())
+    assert resultado.resumen()[0].startswith("1. hilo")
+
+
+def test_diferencias_sin_varianza_no_eliminan(banco):
+    carrera = Carrera({"a": AgenteHiLo, "b": AgenteHiLo}, banco)
+    # a siempre 5 por encima de b en los mismos zapatos: varianza 0, sin evidencia todavía
+    ganancias = {"a": np.full(8, 5.0), "b": np.zeros(8)}
+    assert carrera._dominados(["a", "b"], ganancias, 8) == {}
+
+    ganancias = {"a": np.full(64, 5.0) + np.tile([1.0, -1.0], 32), "b": np.zeros(64)}
+    assert set(carrera._dominados(["a", "b"], ganancias, 64)) == {"b"}
+
+
+def test_reduccion_y_workers(banco):
+    candidatos = {"hilo": AgenteHiLo, "aleatorio": AgenteAleatorio, "aleatorio_5": AgenteAleatorio_5}
+    en_proceso = Carrera(candidatos, banco, mejores=1, zapatos_iniciales=4, zapatos_maximos=4, reduccion=3).correr()
+    assert en_proceso.etapas == 1 and len(en_proceso.ranking) == 1
+    con_workers = Carrera(candidatos, banco, mejores=1, zapatos_iniciales=4, zapatos_maximos=4, reduccion=3,
+                          workers=2).correr()
+    assert con_workers.ranking == en_proceso.ranking
+    assert all(np.array_equal(con_workers.ganancias[nombre], en_proceso.ganancias[nombre]) for nombre in candidatos)
+
+    with pytest.raises(ValueError):
+        Carrera({"hilo": AgenteHiLo}, banco)
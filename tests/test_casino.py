@@ -3,6 +3,10 @@ import logging
 from core.casino import Casino
 from core.player import Jugador
 from agents.agente_aleatorio import AgenteAleatorio
+from agents.agente_HiLo import AgenteHiLo
+from agents.markov_RL import AgenteMarkov_RL
+from agents.markov_umbral import AgenteMarkov_prob_estable_por_umbral
+from core.composicion import HILO_POR_INDICE
 
 # Tests para la clase Casino
 # Hechos por copilot (GPT-4.1)
@@ -35,3 +39,59 @@ def test_simulacion_blackjack_un_jugador():
     assert jugador.capital >= 0
 
 
+
+def test_hooks_de_casino():
+    jugador = Jugador("Hooks", 10_000)
+    agente = AgenteAleatorio(jugador)
+    casino = Casino([agente], num_mazos=1, zapato=0.7)
+    eventos = []
+    fases = []
+    decisiones = []
+    pagos = []
+    casino.agregar_hook("inicio_ronda", lambda c: eventos.append("inicio"))
+    casino.agregar_hook("fin_ronda", lambda c: eventos.append("fin"))
+    casino.agregar_hook("fase", lambda nombre, segundos: fases.append(nombre))
+    casino.agregar_hook("decision", lambda a, mano, carta, accion, segundos: decisiones.append(segundos))
+    casino.agregar_hook("pago", lambda a, mano, ganancia: pagos.append(ganancia))
+    casino.agregar_hook("barajado", lambda c, motivo: eventos.append(motivo))
+
+    for _ in range(30):
+        pagos.clear()
+        casino._jugar_ronda()
+        # Toda mano apostada se liquida (ganar, perder, empatar o rendirse)
+        assert len(pagos) >= 1
+
+    assert eventos.count("inicio") == eventos.count("fin") == 30
+    assert "zapato" in eventos  # 30 rondas con un mazo obligan a barajar
+    assert fases[:6] == ["preparacion", "apuestas", "reparto", "jugadores", "dealer", "pagos"]
+    assert len(fases) == 6 * 30
+    assert decisiones and all(segundos >= 0 for segundos in decisiones)
+
+def test_hook_evento_invalido():
+    casino = Casino([AgenteAleatorio(Jugador("X", 100))], num_mazos=1)
+    with pytest.raises(ValueError):
+        casino.agregar_hook("no_existe", print)
+
+def test_conteo_zapato_compartido():
+    hilo = AgenteHiLo(Jugador("HiLo", 10_000))
+    rl = AgenteMarkov_RL(Jugador("RL", 10_000), num_mazos=4)
+    rl_otro_zapato = AgenteMarkov_RL(Jugador("RL6", 10_000), num_mazos=6)
+    umbral = AgenteMarkov_prob_estable_por_umbral(Jugador("Umbral", 10_000), num_mazos=4)
+    aleatorio = AgenteAleatorio(Jugador("Aleatorio", 10_000))
+    casino = Casino([hilo, rl, rl_otro_zapato, umbral, aleatorio], num_mazos=4, zapato=0.9)
+
+    # Solo se notifica a quien no lee el conteo compartido y tiene su propio observar_carta
+    assert casino.observadores == [rl_otro_zapato, umbral]
+    assert hilo.conteo_zapato is rl.conteo_zapato is casino.conteo_zapato
+    assert rl_otro_zapato.conteo_zapato is not casino.conteo_zapato
+
+    for _ in range(5):
+        casino._jugar_ronda()
+        conteo = casino.conteo_zapato
+        assert conteo.total == len(casino.mazo.cartas)
+        assert list(rl.cartas_restantes) == conteo.conteos
+        esperado_hilo = sum(h * (inicial - actual) for h, inicial, actual
+                            in zip(HILO_POR_INDICE, [16] * 9 + [64], conteo.conteos))
+        assert hilo.conteo == conteo.hilo == esperado_hilo
+        assert conteo.grupos == [conteo.conteos[0], sum(conteo.conteos[1:6]),
+                                 sum(conteo.conteos[6:9]), conteo.conteos[9]]
@@ -0,0 +1,145 @@
+import os
+import csv
+import random
+import pickle
+import joblib
+import pytest
+import numpy as np
+from core.casino import Casino
+from core.player import Jugador
+from core.data_collector import DataCollector
+from core.checkpoint import guardar_checkpoint, cargar_checkpoint, restaurar_checkpoint
+from agents.agente_HiLo import AgenteHiLo
+from agents.agente_A_5 import AgenteAleatorio_5
+from agents.markov import AgenteMarkov_normal
+from agents.markov_umbral import AgenteMarkov_prob_estable_por_umbral
+from agents.agente_randomForest import AgenteRandomForest
+from tests.test_all import simular_torneo
+
+# Tests para los checkpoints de simulaciones de Casino (core/checkpoint.py)
+
+
+def _casino(data_collector=None):
+    agentes = [AgenteHiLo(Jugador("HiLo", 10000)),
+               AgenteAleatorio_5(Jugador("Aleatorio", 10000)),
+               AgenteMarkov_normal(Jugador("Markov", 10000), num_mazos=1),
+               AgenteMarkov_prob_estable_por_umbral(Jugador("Umbral", 10000), num_mazos=1)]
+    return Casino(agentes, num_mazos=1, data_collector=data_collector)
+
+
+def _estado(casino):
+    return ([agente.jugador.capital for agente in casino.agentes],
+            [str(carta) for carta in casino.mazo.cartas], casino.agentes[0].conteo)
+
+
+@pytest.mark.parametrize("incluir_memos", [False, True])
+def test_retomar_juega_igual_que_sin_interrumpir(tmp_path, incluir_memos):
+    random.seed(7)
+    np.random.seed(7)
+    seguido = _casino()
+    seguido.jugar_partida(30)
+
+    ruta = str(tmp_path / "corrida.ckpt")
+    random.seed(7)
+    np.random.seed(7)
+    _casino().jugar_partida(12, ruta_checkpoint=ruta, checkpoint_cada=5, incluir_memos=incluir_memos)
+
+    # Otro casino, otras semillas: todo sale del checkpoint
+    random.seed(123)
+    np.random.seed(123)
+    retomado = _casino()
+    retomado.jugar_partida(30, ruta_checkpoint=ruta)
+    assert _estado(retomado) == _estado(seguido)
+    assert cargar_checkpoint(ruta)["ronda"] == 30
+
+
+def test_restaurar_corta_el_csv_del_collector(tmp_path):
+    collector = DataCollector(str(tmp_path / "datos.csv"), chunk_size=1)
+    casino = _casino(collector)
+    for _ in range(5):
+        casino._jugar_ronda()
+    ruta = str(tmp_path / "corrida.ckpt")
+    guardar_checkpoint(casino, ruta, 5, extra={"acumulado": 3})
+    tamano = os.path.getsize(collector.filepath)
+    pendientes = len(collector.registros)
+
+    for _ in range(5):
+        casino._jugar_ronda()
+    assert os.path.getsize(collector.filepath) > tamano
+
+    estado = restaurar_checkpoint(casino, cargar_checkpoint(ruta))
+    assert estado["extra"] == {"acumulado": 3}
+    assert os.path.getsize(collector.filepath) == tamano
+    assert len(collector.registros) == pendientes
+
+
+def test_checkpoint_de_otros_agentes_o_version(tmp_path):
+    ruta = str(tmp_path / "corrida.ckpt")
+    guardar_checkpoint(_casino(), ruta, 0)
+    otro = Casino([AgenteHiLo(Jugador("Otro", 10000))], num_mazos=1)
+    with pytest.raises(ValueError):
+        restaurar_checkpoint(otro, cargar_checkpoint(ruta))
+
+    estado = cargar_checkpoint(ruta)
+    estado["version"] = -1
+    with open(ruta, "wb") as f:
+        pickle.dump(estado, f)
+    with pytest.raises(ValueError):
+        cargar_checkpoint(ruta)
+
+
+def test_checkpoint_no_guarda_el_modelo_del_random_forest(tmp_path):
+    modelo, encoder = str(tmp_path / "modelo.pkl"), str(tmp_path / "encoder.pkl")
+    joblib.dump({"modelo": 1}, modelo)
+    joblib.dump({"encoder": 1}, encoder)
+    agente = AgenteRandomForest(Jugador("RF", 10000), modelo, encoder)
+    agente.cache_predicciones[(1, 2)] = "PEDIR"
+
+    estado = agente.estado_checkpoint()
+    assert not {"clf", "encoder", "cache_predicciones"} & estado.keys()
+    assert "cache_predicciones" in agente.estado_checkpoint(incluir_memos=True)
+    assert "clf" not in agente.estado_checkpoint(incluir_memos=True)
+
+    # Al restaurar se queda con el modelo que acaba de cargar
+    nuevo = AgenteRandomForest(Jugador("RF", 10000), modelo, encoder)
+    clf = nuevo.clf
+    nuevo.restaurar_checkpoint(estado)
+    assert nuevo.clf is clf
+
+
+def _agentes_torneo():
+    return [AgenteHiLo(Jugador("HiLo", 10000)), AgenteAleatorio_5(Jugador("Aleatorio", 10000)),
+            AgenteMarkov_normal(Jugador("Markov", 10000), num_mazos=4)]
+
+
+def _resultados_csv(ruta):
+    with open(ruta, newline="", encoding="utf-8") as f:
+        return [{columna: valor for columna, valor in fila.items() if not columna.endswith("_decision_time_ms")}
+                for fila in csv.DictReader(f)]
+
+
+def test_torneo_de_test_all_retoma_desde_checkpoint(tmp_path):
+    random.seed(3)
+    np.random.seed(3)
+    agentes = _agentes_torneo()
+    tracking, rondas, _, csv_seguido = simular_torneo(agentes, 20, str(tmp_path / "seguido.csv"), ruta_checkpoint=None)
+
+    ruta = str(tmp_path / "torneo.ckpt")
+    random.seed(3)
+    np.random.seed(3)
+    simular_torneo(_agentes_torneo(), 12, str(tmp_path / "retomado.csv"), ruta_checkpoint=ruta, checkpoint_cada=5)
+
+    # Otros agentes y otras semillas: el estado sale del checkpoint (que tiene un agente Markov con locks)
+    random.seed(99)
+    np.random.seed(99)
+    retomados = _agentes_torneo()
+    tracking_retomado, rondas_retomado, _, csv_retomado = simular_torneo(retomados, 20, ruta_checkpoint=ruta)
+
+    assert rondas_retomado == rondas == 20
+    assert csv_retomado == str(tmp_path / "retomado.csv")
+    assert [a.jugador.capital for a in retomados] == [a.jugador.capital for a in agentes]
+    for nombre, stats in tracking.items():
+        assert {k: stats[k] for k in ("wins", "losses", "ties")} == \
+               {k: tracking_retomado[nombre][k] for k in ("wins", "losses", "ties")}
+    assert all(tracking_retomado[a.jugador.nombre]["agente_ref"] is a for a in retomados)
+    assert _resultados_csv(csv_retomado) == _resultados_csv(csv_seguido)
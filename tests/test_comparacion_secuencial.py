@@ -0,0 +1,67 @@
+import pytest
+import numpy as np
+from core.comparacion_secuencial import ComparacionSecuencial, MEJOR_A, MEJOR_B, EQUIVALENTES, INDISTINGUIBLES
+
+# Tests para la parada secuencial de comparaciones entre agentes (core/comparacion_secuencial.py)
+
+
+def _jugar(comparacion, rondas, medias, semilla=0):
+    """Cambios de capital por ronda parecidos a apostar 5: -10, -5, 0, 5, 7 o 10, más la media del agente."""
+    rng = np.random.default_rng(semilla)
+    valores = [-10, -5, 0, 5, 7, 10]
+    probabilidades = [0.04, 0.44, 0.08, 0.37, 0.04, 0.03]
+    for _ in range(rondas):
+        cambios = {nombre: rng.choice(valores, p=probabilidades) + media for nombre, media in medias.items()}
+        if comparacion.agregar(cambios):
+            break
+    return comparacion
+
+
+def test_corta_cuando_uno_es_claramente_mejor():
+    comparacion = _jugar(ComparacionSecuencial([("bueno", "malo"), ("malo", "bueno")], rondas_maximas=5000),
+                         5000, {"bueno": 0.0, "malo": -1.5})
+    directo, invertido = comparacion.pares
+    assert directo.decision == MEJOR_A and invertido.decision == MEJOR_B
+    assert comparacion.rondas < 1000
+    assert "bueno supera a malo" in comparacion.resumen()[0]
+
+
+def test_iguales_quedan_indistinguibles_o_equivalentes():
+    falsos = 0
+    for semilla in range(40):
+        comparacion = _jugar(ComparacionSecuencial([("a", "b")], rondas_maximas=1500), 1500,
+                             {"a": 0.0, "b": 0.0}, semilla)
+        if comparacion.pares[0].decision == INDISTINGUIBLES:
+            assert comparacion.rondas == 1500
+        else:
+            falsos += 1
+    assert falsos <= 4
+
+    comparacion = _jugar(ComparacionSecuencial([("a", "b")], rondas_maximas=20000, margen=1.0), 20000,
+                         {"a": 0.0, "b": 0.0})
+    par = comparacion.pares[0]
+    assert par.decision == EQUIVALENTES and -1.0 < par.intervalo[0] < par.intervalo[1] < 1.0
+
+
+def test_diferencias_constantes_no_deciden():
+    # Los dos sin capital (Δ = 0) o uno siempre 5 por encima: varianza 0, ninguna evidencia
+    comparacion = ComparacionSecuencial([("a", "b"), ("c", "d")], rondas_minimas=10, rondas_maximas=300, margen=1.0)
+    for ronda in range(300):
+        resuelta = comparacion.agregar({"a": 0, "b": 0, "c": 5, "d": 0})
+        assert resuelta == (ronda + 1 == 300)
+    assert [par.decision for par in comparacion.pares] == [INDISTINGUIBLES, INDISTINGUIBLES]
+
+    # En cuanto aparece variación, el par se puede decidir
+    comparacion = ComparacionSecuencial([("c", "d")], rondas_minimas=10)
+    for _ in range(50):
+        comparacion.agregar({"c": 5, "d": 0})
+    assert comparacion.pares[0].decision is None
+    _jugar(comparacion, 5000, {"c": 5.0, "d": 0.0})
+    assert comparacion.pares[0].decision == MEJOR_A
+
+
+def test_parametros_invalidos():
+    with pytest.raises(ValueError):
+        ComparacionSecuencial([])
+    with pytest.raises(ValueError):
+        ComparacionSecuencial([("a", "b")], confianza=1.0)
@@ -0,0 +1,82 @@
+import random
+from core.composicion import Composicion, ConteoZapato
+from core.player import Jugador
+from core.cartas import Carta, Rango, Palo
+from core.cartas import Mazo
+from agents.markov_RL import AgenteMarkov_RL
+from agents.markovPoliticaApuestas import AgenteMarkov_PoliticaApuestas
+
+# Tests para la composición con hash Zobrist incremental (core/composicion.py)
+
+
+def test_hash_incremental_igual_al_recalculado():
+    rng = random.Random(0)
+    composicion = Composicion.zapato(6)
+    inicial = composicion.hash
+    quitadas = []
+    for _ in range(200):
+        indice = rng.choice([i for i, c in enumerate(composicion.conteos) if c > 0])
+        composicion.quitar(indice)
+        quitadas.append(indice)
+        assert composicion.hash == Composicion(composicion.conteos).hash
+    assert composicion.total == 6 * 52 - 200
+
+    for indice in reversed(quitadas):
+        composicion.reponer(indice)
+    assert composicion.hash == inicial and composicion.conteos == Composicion.zapato(6).conteos
+
+
+def test_orden_de_quitado_no_importa():
+    a, b = Composicion.zapato(1), Composicion.zapato(1)
+    for indice in (0, 9, 3):
+        a.quitar(indice)
+    for indice in (3, 0, 9):
+        b.quitar(indice)
+    assert a.hash == b.hash
+    a.quitar(4)
+    assert a.hash != b.hash
+    copia = a.copia()
+    copia.quitar(1)
+    assert a.hash != copia.hash and a.conteos[1] == 4
+
+
+def test_tabla_crece_sin_cambiar_hashes():
+    chica = Composicion.zapato(2)
+    antes = chica.hash
+    Composicion([200] * 10)  # fuerza a agrandar la tabla
+    assert Composicion.zapato(2).hash == antes == chica.hash
+
+
+def test_dealer_rl_con_composicion():
+    agente = AgenteMarkov_RL(Jugador("RL", 1000), num_mazos=8)
+    distribucion = agente._simular_dealer(Carta(Palo.PICAS, Rango.SEIS))
+    assert abs(sum(distribucion.values()) - 1.0) < 1e-9
+    assert set(distribucion) <= {17, 18, 19, 20, 21, 'dealer_bust'}
+
+
+def test_conteo_zapato_quitar_y_reponer():
+    conteo = ConteoZapato(2)
+    conteo.observar_indice(1)
+    copia = conteo.copia()
+    for indice in (0, 3, 9, 7):
+        copia.quitar(indice)
+    assert conteo.total == 2 * 52 - 1 and copia.total == conteo.total - 4
+    for indice in (7, 9, 3, 0):
+        copia.reponer(indice)
+    assert (copia.conteos, copia.grupos, copia.hilo, copia.composicion.hash) == \
+        (conteo.conteos, conteo.grupos, conteo.hilo, conteo.composicion.hash)
+
+
+def test_conteo_hi_lo_politica_apuestas():
+    random.seed(1)
+    agente = AgenteMarkov_PoliticaApuestas(Jugador("PG", 1000), num_mazos=2)
+    mazo = Mazo(num_mazos=2)
+    for _ in range(60):
+        agente.observar_carta(mazo.repartir())
+        restantes = agente.cartas_restantes
+        # Mismo cálculo que hacía el agente recorriendo las cartas restantes
+        conteo = sum(restantes[1:6]) - restantes[0] - restantes[9]
+        assert agente.conteo_hi_lo == conteo / max(1, sum(restantes) / 52.0)
+        assert agente._crear_clave_agrupada(agente.conteo_zapato) == tuple(
+            int(n / sum(restantes) * 20)
+            for n in (restantes[0], sum(restantes[1:6]), sum(restantes[6:9]), restantes[9]))
@@ -0,0 +1,71 @@
+import time
+import pytest
+from core.acciones import Accion
+from core.player import Jugador, Mano
+from core.cartas import Carta, Rango, Palo
+from agents.markov import AgenteMarkov_normal
+from agents.markov_h import AgenteHibrido_Markov_HiLo
+from agents.markovPoliticaApuestas import AgenteMarkov_PoliticaApuestas
+from agents.estrategia_basica import accion_basica
+
+# Tests para las decisiones con presupuesto (agents/decision_anytime.py) y la estrategia básica
+
+
+def _mano(*rangos):
+    return Mano([Carta(Palo.PICAS, rango) for rango in rangos])
+
+
+def _dealer(rango):
+    return Carta(Palo.CORAZONES, rango)
+
+
+def _crear(clase, num_mazos=8, **presupuesto):
+    if clase is AgenteMarkov_PoliticaApuestas:
+        return clase(Jugador("Markov", 1000), num_mazos=num_mazos, config=presupuesto)
+    return clase(Jugador("Markov", 1000), num_mazos=num_mazos, **presupuesto)
+
+
+AGENTES = [AgenteMarkov_normal, AgenteHibrido_Markov_HiLo, AgenteMarkov_PoliticaApuestas]
+
+
+def test_estrategia_basica():
+    assert accion_basica(_mano(Rango.DIEZ, Rango.SEIS), _dealer(Rango.DIEZ)) == Accion.RENDIRSE
+    assert accion_basica(_mano(Rango.DIEZ, Rango.TRES, Rango.TRES), _dealer(Rango.DIEZ)) == Accion.PEDIR
+    assert accion_basica(_mano(Rango.SEIS, Rango.CINCO), _dealer(Rango.SEIS)) == Accion.DOBLAR
+    assert accion_basica(_mano(Rango.AS, Rango.AS), _dealer(Rango.DIEZ)) == Accion.DIVIDIR
+    assert accion_basica(_mano(Rango.DIEZ, Rango.DIEZ), _dealer(Rango.SEIS)) == Accion.PLANTARSE
+    assert accion_basica(_mano(Rango.AS, Rango.SIETE), _dealer(Rango.DIEZ)) == Accion.PEDIR
+    assert accion_basica(_mano(Rango.DIEZ, Rango.DOS), _dealer(Rango.CUATRO)) == Accion.PLANTARSE
+
+
+@pytest.mark.parametrize("clase", AGENTES)
+def test_sin_presupuesto_usa_estrategia_basica(clase):
+    agente = _crear(clase, presupuesto_nodos=1)
+    mano = _mano(Rango.DIEZ, Rango.SEIS)
+    assert agente.decidir_accion(mano, _dealer(Rango.DIEZ)) == accion_basica(mano, _dealer(Rango.DIEZ))
+    assert agente.decisiones_respaldo == 1
+    assert agente.profundidad_ultima_decision == 0
+
+
+@pytest.mark.parametrize("clase", AGENTES)
+def test_presupuesto_amplio_igual_a_busqueda_completa(clase):
+    exacto = _crear(clase, num_mazos=1)
+    con_presupuesto = _crear(clase, num_mazos=1, presupuesto_ms=60_000)
+    for mano, dealer in [(_mano(Rango.DIEZ, Rango.SEIS), _dealer(Rango.NUEVE)),
+                         (_mano(Rango.CINCO, Rango.SEIS), _dealer(Rango.SEIS)),
+                         (_mano(Rango.AS, Rango.SEIS), _dealer(Rango.SIETE))]:
+        assert con_presupuesto.decidir_accion(mano, dealer) == exacto.decidir_accion(mano, dealer)
+        assert con_presupuesto.profundidad_ultima_decision >= 1
+    assert con_presupuesto.decisiones_respaldo == 0
+
+
+def test_latencia_acotada():
+    agente = AgenteMarkov_normal(Jugador("Markov", 1000), num_mazos=8, presupuesto_ms=5)
+    latencias = []
+    for dealer in (Rango.DOS, Rango.CUATRO, Rango.SEIS, Rango.OCHO):
+        agente.resetear_conteo()  # caché frío en cada decisión
+        inicio = time.perf_counter()
+        agente.decidir_accion(_mano(Rango.DIEZ, Rango.DOS), _dealer(dealer))
+        latencias.append(time.perf_counter() - inicio)
+    # El presupuesto se revisa en cada nodo: el exceso es a lo sumo el costo de un nodo
+    assert max(latencias) < 0.05
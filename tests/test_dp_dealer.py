@@ -0,0 +1,51 @@
+import functools
+import numpy as np
+from core.player import Jugador, Mano
+from core.cartas import Carta, Rango, Palo
+from agents.dp_jugador import VALORES_POR_INDICE, siguiente_estado
+from agents.dp_dealer import PASARSE, distribucion_final, probabilidades_resultado
+from agents.markov_h import AgenteHibrido_Markov_HiLo
+
+# Tests para el dealer como cadena de Markov absorbente (agents/dp_dealer.py)
+
+
+def test_cadena_igual_a_la_recursion():
+    prob_dist = np.random.default_rng(5).dirichlet(np.ones(10))
+
+    @functools.lru_cache(maxsize=None)
+    def final(total, blanda):
+        if total > 21:
+            return {PASARSE: 1.0}
+        if total >= 17:
+            return {total: 1.0}
+        dist = {}
+        for p, valor in zip(prob_dist, VALORES_POR_INDICE):
+            for t, q in final(*siguiente_estado(total, blanda, valor)).items():
+                dist[t] = dist.get(t, 0.0) + p * q
+        return dist
+
+    dist = distribucion_final(prob_dist)
+    for j, valor in enumerate(VALORES_POR_INDICE):
+        referencia = final(valor, valor == 11)
+        for t in range(PASARSE + 1):
+            assert abs(dist[j, t] - referencia.get(t, 0.0)) < 1e-12
+
+    victoria, derrota, empate = probabilidades_resultado(dist)
+    assert np.allclose(victoria + derrota + empate, 1.0)
+    assert np.allclose(victoria[16], dist[:, PASARSE])  # con 16 solo se gana si el dealer se pasa
+    assert np.allclose(empate[18], dist[:, 18])
+
+
+def test_zapato_vacio_el_dealer_se_queda_con_la_visible():
+    dist = distribucion_final(np.zeros(10))
+    assert dist[0, 11] == 1.0 and dist[9, 10] == 1.0
+
+
+def test_hibrido_resuelve_el_dealer_una_vez_por_distribucion():
+    agente = AgenteHibrido_Markov_HiLo(Jugador("Hibrido", 1000), num_mazos=6)
+    mano = Mano([Carta(Palo.PICAS, Rango.DIEZ), Carta(Palo.PICAS, Rango.SEIS)])
+    agente.decidir_accion(mano, Carta(Palo.CORAZONES, Rango.DIEZ))
+    agente.decidir_accion(mano, Carta(Palo.CORAZONES, Rango.SIETE))
+    memos = agente.estadisticas_cache()['memos']
+    assert memos['memo_dealer_dist']['fallos'] == 1 and len(agente.memo_dealer_dist) == 1
+    assert memos['memo_outcome_prob']['aciertos'] > 0
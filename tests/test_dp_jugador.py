@@ -0,0 +1,53 @@
+import functools
+import numpy as np
+from core.player import Jugador, Mano
+from core.cartas import Carta, Rango, Palo
+from agents.dp_jugador import VALORES_POR_INDICE, estado_mano, siguiente_estado, resolver_tabla
+from agents.markov_umbral import AgenteMarkov_prob_estable_por_umbral
+
+# Tests para la tabla de valores del jugador por programación dinámica (agents/dp_jugador.py)
+
+
+def _mano(*rangos):
+    return Mano([Carta(Palo.PICAS, rango) for rango in rangos])
+
+
+def test_estado_con_blandura_real():
+    assert estado_mano(_mano(Rango.AS, Rango.SEIS)) == (17, True)
+    assert estado_mano(_mano(Rango.AS, Rango.AS)) == (12, True)  # Mano.es_blanda da False
+    assert estado_mano(_mano(Rango.AS, Rango.SEIS, Rango.DIEZ)) == (17, False)
+    assert siguiente_estado(18, True, 5) == (13, False)
+    assert siguiente_estado(10, False, 11) == (21, True)
+    assert siguiente_estado(15, True, 11) == (16, True)
+    assert siguiente_estado(15, False, 10) == (25, False)
+
+
+def test_tabla_igual_a_la_recursion():
+    rng = np.random.default_rng(3)
+    prob_dist = rng.dirichlet(np.ones(10))
+    plantarse = rng.uniform(-1, 1, size=(22, 10))
+
+    @functools.lru_cache(maxsize=None)
+    def valor(total, blanda, dealer):
+        if total > 21:
+            return -1.0
+        return max(plantarse[total, dealer], pedir(total, blanda, dealer))
+
+    def pedir(total, blanda, dealer):
+        return sum(p * valor(*siguiente_estado(total, blanda, v), dealer) for p, v in zip(prob_dist, VALORES_POR_INDICE))
+
+    tabla = resolver_tabla(prob_dist, plantarse, -1.0)
+    for total, blanda in [(t, False) for t in range(2, 22)] + [(t, True) for t in range(11, 22)]:
+        for dealer in range(10):
+            assert abs(tabla.pedir[int(blanda), total, dealer] - pedir(total, blanda, dealer)) < 1e-12
+            assert abs(tabla.valor[int(blanda), total, dealer] - valor(total, blanda, dealer)) < 1e-12
+
+
+def test_decisiones_del_umbral_son_consultas():
+    agente = AgenteMarkov_prob_estable_por_umbral(Jugador("Umbral", 1000), num_mazos=6)
+    carta_dealer = Carta(Palo.CORAZONES, Rango.DIEZ)
+    agente.decidir_accion(_mano(Rango.DIEZ, Rango.SEIS), carta_dealer)
+    assert len(agente.memo_valor_estado) == 1  # una tabla para la distribución vigente
+    for mano in (_mano(Rango.CINCO, Rango.SEIS), _mano(Rango.AS, Rango.SIETE), _mano(Rango.OCHO, Rango.OCHO)):
+        agente.decidir_accion(mano, Carta(Palo.CORAZONES, Rango.SEIS))
+        assert agente.nodos_decision == 0
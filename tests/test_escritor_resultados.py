@@ -0,0 +1,65 @@
+import json
+import pytest
+import pandas as pd
+from core.escritor_resultados import EscritorResultados, ruta_resumen
+from data_viewer import markov_resumen
+
+# Tests para el escritor incremental de resultados por ronda (core/escritor_resultados.py)
+
+COLUMNAS = ["round", "cards_remaining", "markov_normal_decision_time_ms", "markov_normal_decisions",
+            "markov_normal_result", "markov_normal_capital_change"]
+
+
+def _fila(ronda, resultado):
+    return {"round": ronda, "cards_remaining": 200 - ronda, "markov_normal_decision_time_ms": 3,
+            "markov_normal_decisions": 1, "markov_normal_result": resultado,
+            "markov_normal_capital_change": 5 * resultado}
+
+
+def test_escribe_por_bloques_y_se_lee_a_mitad_de_corrida(tmp_path):
+    ruta = str(tmp_path / "test_markov_comparison_x.csv")
+    escritor = EscritorResultados(ruta, COLUMNAS, cada=4, capitales_iniciales={"markov_normal": 100})
+    assert list(pd.read_csv(ruta).columns) == COLUMNAS
+
+    resultados = [1, -1, 0, 1, 1, -1]
+    for ronda, resultado in enumerate(resultados, start=1):
+        escritor.agregar(_fila(ronda, resultado))
+    # Solo el primer bloque está en disco; el resto sigue en memoria
+    assert len(escritor.pendientes) == 2
+    parcial = pd.read_csv(ruta)
+    assert list(parcial["round"]) == [1, 2, 3, 4]
+    markov_resumen.analyze_comparison_performance(parcial)
+
+    escritor.cerrar()
+    assert list(pd.read_csv(ruta)["markov_normal_result"]) == resultados
+    with open(ruta_resumen(ruta)) as f:
+        resumen = json.load(f)
+    assert resumen["rondas"] == 6
+    assert resumen["agentes"]["markov_normal"] == {"victorias": 3, "derrotas": 2, "empates": 1,
+                                                   "ganancia": 5, "capital": 105}
+
+
+def test_restaurar_corta_lo_escrito_despues_del_checkpoint(tmp_path):
+    ruta = str(tmp_path / "resultados.csv")
+    escritor = EscritorResultados(ruta, COLUMNAS, cada=2)
+    for ronda in range(1, 4):
+        escritor.agregar(_fila(ronda, 1))
+    estado = escritor.estado_checkpoint()
+    for ronda in range(4, 8):
+        escritor.agregar(_fila(ronda, -1))
+
+    otro = EscritorResultados(ruta, COLUMNAS, cada=2)
+    otro.restaurar_checkpoint(estado)
+    for ronda in range(4, 6):
+        otro.agregar(_fila(ronda, 0))
+    otro.cerrar()
+    assert list(pd.read_csv(ruta)["round"]) == [1, 2, 3, 4, 5]
+    assert otro.resumen["agentes"]["markov_normal"]["empates"] == 2
+
+
+def test_columnas_fuera_del_esquema(tmp_path):
+    escritor = EscritorResultados(str(tmp_path / "resultados.csv"), COLUMNAS)
+    with pytest.raises(ValueError):
+        escritor.agregar({"round": 1, "otra": 2})
+    with pytest.raises(ValueError):
+        EscritorResultados(str(tmp_path / "otro.csv"), COLUMNAS, cada=0)
@@ -0,0 +1,36 @@
+import pytest
+from core.acciones import Accion
+from core.player import Jugador
+from agents.agente_HiLo import AgenteHiLo
+from agents.estrategia_basica import accion_basica
+from agents.evaluador_politica import EvaluadorPolitica
+
+# Tests para el evaluador exhaustivo de políticas fijas (agents/evaluador_politica.py)
+
+
+def test_estrategia_basica_casi_sin_ventaja_y_peor_con_mas_mazos():
+    un_mazo = EvaluadorPolitica(accion_basica, num_mazos=1).evaluar()
+    dos_mazos = EvaluadorPolitica(accion_basica, num_mazos=2).evaluar()
+    assert sum(un_mazo.prob_por_mano.values()) == pytest.approx(1.0)
+    assert len(un_mazo.ev_por_mano) == 55 * 10
+    assert abs(un_mazo.ventaja_casa) < 0.01
+    assert un_mazo.ventaja_casa < dos_mazos.ventaja_casa
+    # 20 contra 6 gana casi siempre; contra el 6 el jugador tiene ventaja
+    assert un_mazo.ev_por_mano[(10, 10, 6)] > 0.6
+    assert un_mazo.ev(10, 6, 10) == un_mazo.ev(6, 10, 10) == un_mazo.ev_por_mano[(6, 10, 10)]
+    assert un_mazo.ev_por_carta_dealer()[6] > 0
+
+
+def test_politicas_triviales():
+    rendirse = EvaluadorPolitica(lambda mano, carta_dealer: Accion.RENDIRSE, num_mazos=1).evaluar()
+    assert rendirse.ventaja_casa == pytest.approx(0.5)
+    plantarse = EvaluadorPolitica(lambda mano, carta_dealer: Accion.PLANTARSE, num_mazos=1).evaluar()
+    assert 0.1 < plantarse.ventaja_casa < 0.25
+    hilo = EvaluadorPolitica(AgenteHiLo(Jugador("HiLo", 1000)), num_mazos=1).evaluar()
+    assert abs(hilo.ventaja_casa) < 0.02
+
+
+def test_zapato_empezado_sin_dieces_favorece_a_la_casa():
+    completo = EvaluadorPolitica(accion_basica, num_mazos=1).evaluar()
+    sin_dieces = EvaluadorPolitica(accion_basica, conteos=[4] * 9 + [8]).evaluar()
+    assert sin_dieces.ventaja_casa > completo.ventaja_casa + 0.02
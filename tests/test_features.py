@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dataset import features
+from dataset.features import (cargar_datos, construir_features_clasificacion, construir_fila_clasificacion,
+                              SPEC_CLASIFICACION, SPEC_REGRESION, COLUMNAS_CLASIFICACION)
+
+# Tests para el caché de features compartido (dataset/features.py)
+
+
+def _escribir_csv(ruta, n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    acciones = np.array(["PEDIR", "PLANTARSE", "DOBLAR"])
+    df = pd.DataFrame({
+        "mano_valor": rng.integers(4, 22, n),
+        "mano_es_blanda": rng.integers(0, 2, n).astype(bool),
+        "mano_apuesta": 5,
+        "mano_num_cartas": rng.integers(2, 5, n),
+        "mano_es_par_divisible": rng.integers(0, 2, n).astype(bool),
+        "agente_nombre": rng.choice(["AgenteHiLo", "AgenteAleatorio", "AgenteMarkov_normal"], n),
+        "agente_capital_inicial": 1000,
+        "dealer_valor_carta": rng.integers(2, 12, n),
+        "accion_tomada": acciones[rng.integers(0, 3, n)],
+        "ganancia_neta": rng.choice([-5, 0, 5], n),
+        # El agente marca usa_conteo con conteo != 0, así que el test evita el conteo 0
+        "conteo_cartas": np.where(rng.random(n) < 0.5, rng.choice([-3, -2, -1, 1, 2, 3], n), np.nan),
+    })
+    df["recompensa_normalizada"] = df["ganancia_neta"] / df["mano_apuesta"]
+    df.to_csv(ruta, index=False, na_rep="None")
+    return df
+
+
+def test_features_vectorizadas_igual_a_escalares(tmp_path):
+    ruta = tmp_path / "dataset.csv"
+    _escribir_csv(ruta)
+    df = features.leer_dataset(ruta, SPEC_CLASIFICACION)
+    X = construir_features_clasificacion(df)
+    assert list(X.columns) == COLUMNAS_CLASIFICACION
+
+    for i in range(0, len(df), 17):
+        fila = df.iloc[i]
+        conteo = 0 if pd.isna(fila["conteo_cartas"]) else int(fila["conteo_cartas"])
+        esperado = construir_fila_clasificacion(int(fila["mano_valor"]), int(fila["dealer_valor_carta"]), conteo,
+                                                bool(fila["mano_es_blanda"]), bool(fila["mano_es_par_divisible"]),
+                                                int(fila["mano_num_cartas"]))
+        assert np.allclose(X.iloc[i].to_numpy(dtype=float), esperado, rtol=1e-6)
+
+
+def test_cache_se_reutiliza_y_se_invalida(tmp_path, monkeypatch):
+    ruta = tmp_path / "dataset.csv"
+    cache = tmp_path / "cache"
+    _escribir_csv(ruta)
+
+    datos = cargar_datos(SPEC_CLASIFICACION, ruta_csv=ruta, carpeta_cache=cache)
+    assert isinstance(datos["X"], np.memmap)
+    n = len(datos["y"])
+    assert len(datos["idx_train"]) + len(datos["idx_val"]) + len(datos["idx_test"]) == n
+    original = pd.read_csv(ruta)
+    assert n == (original["agente_nombre"] != "AgenteAleatorio").sum()
+
+    # Segunda carga: no debe volver a leer el CSV
+    def no_leer(*args, **kwargs):
+        raise AssertionError("El CSV no debería releerse")
+    monkeypatch.setattr(features, "leer_dataset", no_leer)
+    datos2 = cargar_datos(SPEC_CLASIFICACION, ruta_csv=ruta, carpeta_cache=cache)
+    assert np.array_equal(datos["X"], datos2["X"])
+    assert np.array_equal(datos["idx_test"], datos2["idx_test"])
+
+    # Si cambia el CSV, se recalcula
+    _escribir_csv(ruta, seed=1)
+    with pytest.raises(AssertionError):
+        cargar_datos(SPEC_CLASIFICACION, ruta_csv=ruta, carpeta_cache=cache)
+
+
+def test_cache_construido_a_la_vez_por_otro_proceso(tmp_path, monkeypatch):
+    ruta = tmp_path / "dataset.csv"
+    cache = tmp_path / "cache"
+    _escribir_csv(ruta)
+
+    # Mientras este proceso arma las matrices, "otro" termina el mismo caché
+    construir = features._construir_matrices
+    otro_proceso = {}
+
+    def construir_con_carrera(df, spec):
+        if not otro_proceso:
+            otro_proceso["datos"] = None
+            otro_proceso["datos"] = cargar_datos(spec, ruta_csv=ruta, carpeta_cache=cache)
+        return construir(df, spec)
+
+    monkeypatch.setattr(features, "_construir_matrices", construir_con_carrera)
+    datos = cargar_datos(SPEC_CLASIFICACION, ruta_csv=ruta, carpeta_cache=cache)
+    assert np.array_equal(datos["X"], otro_proceso["datos"]["X"])
+    # Queda solo la carpeta del caché, sin temporales
+    assert len(list(cache.iterdir())) == 1
+
+
+def test_cache_regresion(tmp_path):
+    ruta = tmp_path / "dataset.csv"
+    _escribir_csv(ruta)
+    datos = cargar_datos(SPEC_REGRESION, ruta_csv=ruta, carpeta_cache=tmp_path / "cache")
+    assert datos["y"].dtype == np.float32
+    assert {"acc_PEDIR", "acc_PLANTARSE", "acc_DOBLAR"} <= set(datos["columnas"])
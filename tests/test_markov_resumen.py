@@ -0,0 +1,94 @@
+import io
+import sys
+import contextlib
+import pytest
+import numpy as np
+import pandas as pd
+from data_viewer import markov_resumen, kernels
+
+# Tests del modo streaming de data_viewer/markov_resumen.py y de data_viewer/kernels.py
+
+
+def _escribir_csv(ruta, n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"round": np.arange(1, n + 1), "cards_remaining": rng.integers(1, 260, n)})
+    for prefix in ("markov_normal", "markov_rl"):
+        decisions = rng.integers(0, 5, n)
+        df[f"{prefix}_decision_time_ms"] = decisions * rng.integers(0, 40, n)
+        df[f"{prefix}_decisions"] = decisions
+        df[f"{prefix}_result"] = rng.choice([-1, 0, 1], n, p=[0.45, 0.1, 0.45])
+        df[f"{prefix}_capital_change"] = df[f"{prefix}_result"] * 5
+    df.to_csv(ruta, index=False)
+
+
+def _capturar(funcion, *args, **kwargs):
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida):
+        funcion(*args, **kwargs)
+    return salida.getvalue()
+
+
+def test_streaming_mismo_reporte(tmp_path):
+    ruta = tmp_path / "test_markov_comparison.csv"
+    _escribir_csv(ruta)
+    esperado = _capturar(markov_resumen.analyze_comparison_performance, pd.read_csv(ruta))
+    # Bloques chicos para que las rachas y los grupos crucen límites de bloque
+    for chunksize in (7, 64, 10_000):
+        assert _capturar(markov_resumen.analyze_comparison_streaming, ruta, chunksize=chunksize) == esperado
+
+
+def test_streaming_con_formato_antiguo(tmp_path, monkeypatch):
+    ruta = tmp_path / "test_markov_results.csv"
+    pd.DataFrame({"round": [1, 2, 3], "result": [1, -1, 0]}).to_csv(ruta, index=False)
+    with pytest.raises(ValueError, match="formato antiguo"):
+        markov_resumen.analyze_comparison_streaming(ruta)
+
+    # Desde la línea de comandos el formato antiguo se analiza entero
+    monkeypatch.setattr(sys, "argv", ["markov_resumen", "--streaming", "--archivo", str(ruta)])
+    salida = _capturar(markov_resumen.main)
+    assert "formato antiguo" in salida and "Total de rondas jugadas: 3" in salida
+    assert "Error" not in salida
+
+
+def test_comparacion_sin_agentes():
+    assert "No hay agentes para comparar" in _capturar(markov_resumen.print_comparison, [])
+
+
+def test_rachas_por_bloques():
+    rng = np.random.default_rng(3)
+    results = rng.choice([-1, 0, 1], 1000)
+    acumulador = markov_resumen.StreakAccumulator()
+    for inicio in range(0, len(results), 13):
+        acumulador.update(results[inicio:inicio + 13])
+    assert np.allclose(acumulador.result(), markov_resumen.calculate_streaks(results))
+
+
+def test_kernels_igual_a_pandas():
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({"cards_remaining": rng.integers(0, 320, 2000)})
+    for prefix in ("a", "b"):
+        df[f"{prefix}_result"] = rng.choice([-1, 0, 1], len(df))
+    matrix = kernels.result_matrix(df, ["a", "b"])
+
+    rolling = kernels.rolling_mean(matrix, 50)
+    esperado = df[["a_result", "b_result"]].rolling(50).mean().to_numpy()
+    assert np.allclose(rolling, esperado, equal_nan=True)
+    assert np.array_equal(kernels.cumulative(matrix), df[["a_result", "b_result"]].cumsum().to_numpy())
+
+    stats = kernels.binned_result_stats(df["cards_remaining"].to_numpy(), matrix, markov_resumen.CARDS_BINS)
+    bins = pd.cut(df["cards_remaining"], bins=markov_resumen.CARDS_BINS, labels=markov_resumen.CARDS_LABELS)
+    agrupado = df.groupby(bins, observed=False)["b_result"].agg(["count", "sum"])
+    assert np.array_equal(stats["count"][:, 1], agrupado["count"].to_numpy())
+    assert np.array_equal(stats["sum"][:, 1], agrupado["sum"].to_numpy())
+
+
+def test_decimado_conserva_extremos():
+    rng = np.random.default_rng(7)
+    x = np.arange(100_000)
+    y = np.cumsum(rng.choice([-1, 1], len(x))).astype(float)
+    y[:49] = np.nan  # como el inicio de una media móvil
+    xd, yd = kernels.minmax_decimate(x, y, 1000)
+    assert len(xd) <= 1002
+    assert np.all(np.diff(xd) > 0)
+    assert np.nanmax(yd) == np.nanmax(y) and np.nanmin(yd) == np.nanmin(y)
+    assert xd[-1] == x[-1]
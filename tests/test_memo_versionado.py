@@ -0,0 +1,36 @@
+from core.player import Jugador, Mano
+from core.cartas import Carta, Rango, Palo
+from agents.markov_h import AgenteHibrido_Markov_HiLo
+from agents.markov_umbral import AgenteMarkov_prob_estable_por_umbral
+
+# Tests para la retención de memos por versión de la distribución (agents/memo_versionado.py)
+
+MANO = Mano([Carta(Palo.PICAS, Rango.DIEZ), Carta(Palo.PICAS, Rango.SEIS)])
+CARTA_DEALER = Carta(Palo.CORAZONES, Rango.DIEZ)
+
+
+def test_hibrido_conserva_los_memos_entre_umbrales():
+    agente = AgenteHibrido_Markov_HiLo(Jugador("Hibrido", 1000), num_mazos=6)
+    agente.decidir_accion(MANO, CARTA_DEALER)
+    assert agente.nodos_decision > 0
+    agente.observar_carta(Carta(Palo.TREBOLES, Rango.CINCO))  # no cruza ningún umbral
+    agente.decidir_accion(MANO, Carta(Palo.CORAZONES, Rango.SIETE))
+    assert agente.nodos_decision == 0
+
+    agente.set_recompensas({'empate': -0.1})  # la tabla del jugador depende de las recompensas
+    agente.decidir_accion(MANO, CARTA_DEALER)
+    assert agente.nodos_decision > 0
+    assert len(agente.memo_valor_estado) == 1
+
+
+def test_version_nueva_desaloja_la_anterior():
+    agente = AgenteMarkov_prob_estable_por_umbral(Jugador("Umbral", 1000), num_mazos=6)
+    agente.decidir_accion(MANO, CARTA_DEALER)
+    version = agente.version_dist
+    for _ in range(12):  # la mitad de los 24 ases cruza el umbral
+        agente.observar_carta(Carta(Palo.TREBOLES, Rango.AS))
+    assert agente.version_dist == version + 1
+    assert len(agente.memo_valor_estado) == 0 and agente.memo_valor_estado.desalojos == 1
+
+    agente.decidir_accion(MANO, CARTA_DEALER)
+    assert list(agente.memo_valor_estado) == [agente.clave_dist_actual]
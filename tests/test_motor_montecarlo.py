@@ -0,0 +1,48 @@
+import pytest
+from core.acciones import Accion
+from core.player import Jugador, Mano
+from core.cartas import Carta, Rango, Palo
+from agents.markov import AgenteMarkov_normal
+from agents.motor_montecarlo import MotorMonteCarlo
+
+# Tests para el motor de EV por Monte Carlo (agents/motor_montecarlo.py)
+
+
+def _mano(*rangos):
+    return Mano([Carta(Palo.PICAS, rango) for rango in rangos])
+
+
+def test_estimaciones_cerca_de_la_busqueda_exacta():
+    exacto = AgenteMarkov_normal(Jugador("Exacto", 1000), num_mazos=8)
+    motor = MotorMonteCarlo(muestras_lote=4096, max_muestras=16384, z=100, semilla=7)  # sin corte temprano
+    mano, carta_dealer = _mano(Rango.DIEZ, Rango.SEIS), Carta(Palo.CORAZONES, Rango.NUEVE)
+    conteos = exacto.cartas_restantes
+    evs = motor.evaluar(conteos, mano, carta_dealer, [Accion.PLANTARSE, Accion.DOBLAR])
+    assert motor.ultimas_muestras == 2 * 16384
+    assert evs[Accion.PLANTARSE] == pytest.approx(exacto._calcular_ev_plantarse(16, carta_dealer, conteos.copy()), abs=0.02)
+    assert evs[Accion.DOBLAR] == pytest.approx(exacto._calcular_ev_doblar(mano, carta_dealer, conteos.copy()), abs=0.04)
+
+
+def test_corta_cuando_la_mejor_accion_se_separa():
+    motor = MotorMonteCarlo(muestras_lote=256, semilla=7)
+    conteos = [32] * 9 + [128]
+    evs = motor.evaluar(conteos, _mano(Rango.CINCO, Rango.SEIS), Carta(Palo.CORAZONES, Rango.SEIS),
+                        [Accion.PLANTARSE, Accion.PEDIR, Accion.DOBLAR], {Accion.RENDIRSE: -0.5})
+    assert max(evs, key=evs.get) == Accion.DOBLAR
+    assert motor.ultimas_muestras < 2 * motor.max_muestras
+    assert motor.evaluar([2] * 10, _mano(Rango.CINCO, Rango.SEIS), Carta(Palo.CORAZONES, Rango.SEIS),
+                         [Accion.PLANTARSE]) is None  # no alcanza para una muestra
+
+
+def test_auto_usa_montecarlo_solo_con_la_clave_sin_resolver():
+    agente = AgenteMarkov_normal(Jugador("Auto", 1000), num_mazos=8, motor_ev='auto', costo_maximo_nodos=0)
+    mano = _mano(Rango.DIEZ, Rango.SEIS)
+    agente.decidir_accion(mano, Carta(Palo.CORAZONES, Rango.DIEZ))  # sin estimación todavía: exacta
+    assert agente.decisiones_montecarlo == 0 and agente.costo_frio_estimado > 0
+    agente.decidir_accion(mano, Carta(Palo.CORAZONES, Rango.SIETE))  # otra carta visible, clave fría
+    assert agente.decisiones_montecarlo == 1 and agente.nodos_decision == 0
+    agente.decidir_accion(_mano(Rango.NUEVE, Rango.DOS), Carta(Palo.CORAZONES, Rango.DIEZ))  # ya resuelta
+    assert agente.decisiones_montecarlo == 1
+
+    with pytest.raises(ValueError):
+        agente.configurar_motor('aproximado')
@@ -0,0 +1,60 @@
+from core.player import Jugador, Mano
+from core.cartas import Carta, Rango, Palo
+from agents.markov import AgenteMarkov_normal, AgenteMarkov_arriesgado
+from agents.markovPoliticaApuestas import AgenteMarkov_PoliticaApuestas
+
+# Tests para la poda por probabilidad de camino con cota de error (agents/poda_probabilidad.py)
+
+
+def _mano(*rangos):
+    return Mano([Carta(Palo.PICAS, rango) for rango in rangos])
+
+
+MANOS = [(_mano(Rango.DIEZ, Rango.SEIS), Carta(Palo.CORAZONES, Rango.DIEZ)),
+         (_mano(Rango.CINCO, Rango.SEIS), Carta(Palo.CORAZONES, Rango.CINCO)),
+         (_mano(Rango.DOS, Rango.TRES), Carta(Palo.CORAZONES, Rango.SIETE))]
+
+
+def test_poda_recorre_menos_nodos_con_la_misma_decision():
+    exacto = AgenteMarkov_normal(Jugador("Exacto", 1000), num_mazos=8)
+    podado = AgenteMarkov_normal(Jugador("Podado", 1000), num_mazos=8, umbral_poda=1e-4)
+    for mano, carta_dealer in MANOS:
+        assert podado.decidir_accion(mano, carta_dealer) == exacto.decidir_accion(mano, carta_dealer)
+        assert podado.nodos_decision < exacto.nodos_decision
+        masa = podado.masa_descartada_max[carta_dealer.valor]
+        assert 0 < masa < 0.05
+        assert podado.cota_error_ultima_decision in (0.0, masa, 2 * masa)
+
+
+def test_cota_que_puede_cambiar_la_accion_repite_sin_poda():
+    exacto = AgenteMarkov_normal(Jugador("Exacto", 1000), num_mazos=8)
+    # Con un umbral enorme el dealer casi no se expande y la cota cubre cualquier diferencia
+    podado = AgenteMarkov_normal(Jugador("Podado", 1000), num_mazos=8, umbral_poda=0.5)
+    sin_verificar = AgenteMarkov_normal(Jugador("Rapido", 1000), num_mazos=8, umbral_poda=0.5)
+    sin_verificar.configurar_poda(0.5, verificar=False)
+    mano, carta_dealer = MANOS[0]
+    assert podado.decidir_accion(mano, carta_dealer) == exacto.decidir_accion(mano, carta_dealer)
+    assert podado.decisiones_exactas == 1 and podado.cota_error_ultima_decision == 0.0
+    sin_verificar.decidir_accion(mano, carta_dealer)
+    assert sin_verificar.decisiones_exactas == 0 and sin_verificar.cota_error_ultima_decision > 0.5
+
+    podado.resetear_conteo()
+    assert podado.masa_descartada_max == {} and len(podado._memos_exactos['memo_valor_estado']) == 0
+
+
+def test_politica_apuestas_con_poda():
+    exacto = AgenteMarkov_PoliticaApuestas(Jugador("PG", 1000), num_mazos=8)
+    podado = AgenteMarkov_PoliticaApuestas(Jugador("PG", 1000), num_mazos=8, config={'umbral_poda': 1e-4})
+    for mano, carta_dealer in MANOS:
+        assert podado.decidir_accion(mano, carta_dealer) == exacto.decidir_accion(mano, carta_dealer)
+        assert podado.nodos_decision < exacto.nodos_decision
+
+
+def test_arriesgado_con_poda_y_cotas_al_doble():
+    exacto = AgenteMarkov_arriesgado(Jugador("Exacto", 1000), num_mazos=8)
+    podado = AgenteMarkov_arriesgado(Jugador("Podado", 1000), num_mazos=8, umbral_poda=1e-4)
+    for mano, carta_dealer in MANOS:
+        assert podado.decidir_accion(mano, carta_dealer) == exacto.decidir_accion(mano, carta_dealer)
+        assert podado.nodos_decision < exacto.nodos_decision
+        masa = podado.masa_descartada_max[carta_dealer.valor]
+        assert podado.cota_error_ultima_decision in (0.0, 2 * masa, 4 * masa)
@@ -0,0 +1,44 @@
+import time
+from core.player import Jugador, Mano
+from core.cartas import Carta, Rango, Palo
+from agents.markov import AgenteMarkov_normal
+from agents.markovPoliticaApuestas import AgenteMarkov_PoliticaApuestas
+
+# Tests para el precálculo especulativo al barajar (agents/prefetch_zapato.py)
+
+
+def _mano(*rangos):
+    return Mano([Carta(Palo.PICAS, rango) for rango in rangos])
+
+
+MANOS = [(_mano(Rango.DIEZ, Rango.SEIS), Carta(Palo.CORAZONES, Rango.DIEZ)),
+         (_mano(Rango.OCHO, Rango.OCHO), Carta(Palo.CORAZONES, Rango.AS)),
+         (_mano(Rango.DOS, Rango.TRES), Carta(Palo.CORAZONES, Rango.SIETE))]
+
+
+def test_prefetch_llena_el_cache_antes_de_decidir():
+    con_prefetch = AgenteMarkov_normal(Jugador("Prefetch", 1000), num_mazos=8, prefetch=True)
+    sin_prefetch = AgenteMarkov_normal(Jugador("Frio", 1000), num_mazos=8)
+    assert con_prefetch.esperar_prefetch(timeout=60)
+    assert con_prefetch.prefetch_estados > 0 and con_prefetch.prefetch_nodos > 0
+
+    for mano, carta_dealer in MANOS:
+        assert con_prefetch.decidir_accion(mano, carta_dealer) == sin_prefetch.decidir_accion(mano, carta_dealer)
+        # Con el caché caliente la decisión casi no recorre nodos
+        assert con_prefetch.nodos_decision * 10 < sin_prefetch.nodos_decision
+
+
+def test_decision_interrumpe_al_hilo_y_barajar_lo_reinicia():
+    agente = AgenteMarkov_PoliticaApuestas(Jugador("PG", 1000), num_mazos=8, config={'prefetch': True})
+    referencia = AgenteMarkov_PoliticaApuestas(Jugador("PG", 1000), num_mazos=8)
+    for mano, carta_dealer in MANOS:
+        assert agente.decidir_accion(mano, carta_dealer) == referencia.decidir_accion(mano, carta_dealer)
+        # Con el hilo corriendo, nodos_decision se lee con el candado tomado
+        assert agente.estadisticas_cache()['nodos_ultima_decision'] <= referencia.nodos_decision
+
+    primer_hilo = agente._hilo_prefetch
+    inicio = time.perf_counter()
+    agente.resetear_conteo()
+    assert time.perf_counter() - inicio < 1.0  # el hilo viejo corta en el próximo nodo
+    assert not primer_hilo.is_alive() and agente._hilo_prefetch is not primer_hilo
+    assert agente.esperar_prefetch(timeout=60)
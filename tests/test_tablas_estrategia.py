@@ -0,0 +1,50 @@
+import os
+from core.acciones import Accion
+from core.player import Mano
+from core.cartas import Carta, Rango, Palo
+from agents import tablas_estrategia
+from agents.tablas_estrategia import generar_tabla, tabla_estrategia, ruta_tabla, MAZOS_INFINITOS
+from agents.estrategia_basica import TABLA_FIJA
+from agents.evaluador_politica import EvaluadorPolitica
+from agents.motor_montecarlo import MotorMonteCarlo, PIDE
+
+# Tests para las tablas de estrategia básica generadas y guardadas (agents/tablas_estrategia.py)
+
+
+def _mano(*rangos):
+    return Mano([Carta(Palo.PICAS, rango) for rango in rangos])
+
+
+def test_tabla_generada_juega_mejor_que_la_fija_en_casino():
+    tabla = generar_tabla(num_mazos=1)
+    assert tabla.accion(_mano(Rango.CINCO, Rango.SEIS), Carta(Palo.CORAZONES, Rango.SEIS)) == Accion.DOBLAR
+    assert tabla.accion(_mano(Rango.OCHO, Rango.OCHO), Carta(Palo.CORAZONES, Rango.SEIS)) == Accion.DIVIDIR
+    assert tabla.accion(_mano(Rango.DIEZ, Rango.SEIS), Carta(Palo.CORAZONES, Rango.DIEZ)) == Accion.RENDIRSE
+    assert tabla.accion(_mano(Rango.DIEZ, Rango.CUATRO, Rango.DOS), Carta(Palo.CORAZONES, Rango.DIEZ)) == Accion.PEDIR
+    generada = EvaluadorPolitica(tabla.accion, num_mazos=1).evaluar()
+    fija = EvaluadorPolitica(TABLA_FIJA.accion, num_mazos=1).evaluar()
+    assert generada.ventaja_casa < fija.ventaja_casa
+
+
+def test_se_guarda_versionada_y_se_carga_sin_recalcular(tmp_path, monkeypatch):
+    carpeta = str(tmp_path)
+    tabla = tabla_estrategia(6, carpeta=carpeta)
+    ruta = ruta_tabla(6, carpeta=carpeta)
+    assert os.path.exists(ruta) and f"_v{tablas_estrategia.VERSION_TABLAS}_6_mazos_" in ruta
+    assert tabla_estrategia(6, carpeta=carpeta) is tabla
+
+    # Sin la copia en memoria se lee el archivo, sin generar de nuevo
+    tablas_estrategia._CARGADAS.clear()
+    monkeypatch.setattr(tablas_estrategia, "generar_tabla", None)
+    leida = tabla_estrategia(6, carpeta=carpeta)
+    assert (leida.duras, leida.blandas, leida.pares) == (tabla.duras, tabla.blandas, tabla.pares)
+    assert ruta_tabla(MAZOS_INFINITOS, carpeta=carpeta) != ruta
+
+
+def test_motor_montecarlo_sigue_la_tabla_dada():
+    tabla = generar_tabla(num_mazos=8)
+    assert MotorMonteCarlo().pide is PIDE
+    pide = MotorMonteCarlo(estrategia=tabla).pide
+    assert pide[0, 12, 2] and pide[0, 16, 10] and not pide[0, 17, 10] and not pide[1, 19, 6]
+    # Con más de dos cartas, en 8 mazos la generada juega igual que la fija
+    assert (pide == PIDE).all()
@@ -0,0 +1,61 @@
+import json
+import pytest
+from core.player import Jugador, Mano
+from core.cartas import Carta, Rango, Palo
+from agents.markov import AgenteMarkov_normal, AgenteMarkov_arriesgado
+from agents.markov_umbral import AgenteMarkov_prob_estable_por_umbral
+from agents.markov_h import AgenteHibrido_Markov_HiLo
+from agents.markov_RL import AgenteMarkov_RL
+from agents.telemetria_cache import MemoInstrumentado
+
+# Tests para la telemetría de cachés de los agentes Markov (agents/telemetria_cache.py)
+
+AGENTES = [AgenteMarkov_normal, AgenteMarkov_arriesgado, AgenteMarkov_prob_estable_por_umbral,
+           AgenteHibrido_Markov_HiLo, AgenteMarkov_RL]
+
+
+def _mano(*rangos):
+    return Mano([Carta(Palo.PICAS, rango) for rango in rangos])
+
+
+def test_memo_instrumentado():
+    memo = MemoInstrumentado()
+    assert "a" not in memo
+    memo["a"] = (0.1, 0.2, 0.7)
+    assert "a" in memo
+    memo.clear()
+    stats = memo.estadisticas()
+    assert (stats["aciertos"], stats["fallos"], stats["desalojos"], stats["entradas"]) == (1, 1, 1, 0)
+    assert stats["bytes"] > 0 and stats["tasa_aciertos"] == 0.5
+
+
+@pytest.mark.parametrize("clase", AGENTES)
+def test_estadisticas_por_decision_y_zapato(clase, tmp_path):
+    agente = clase(Jugador("Markov", 1000), num_mazos=1)
+    mano, carta_dealer = _mano(Rango.DIEZ, Rango.SEIS), Carta(Palo.CORAZONES, Rango.NUEVE)
+
+    agente.decidir_accion(mano, carta_dealer)
+    primera = agente.estadisticas_cache()
+    assert primera["decisiones"] == 1
+    assert primera["nodos_ultima_decision"] > 0
+    assert set(primera["memos"]) == set(agente.MEMOS)
+    assert sum(m["fallos"] for m in primera["memos"].values()) > 0
+
+    # La misma decisión con el mismo conteo debe reutilizar el caché
+    agente.decidir_accion(mano, carta_dealer)
+    segunda = agente.estadisticas_cache()
+    assert segunda["decisiones"] == 2
+    assert sum(m["aciertos"] for m in segunda["memos"].values()) > sum(m["aciertos"] for m in primera["memos"].values())
+
+    # Al barajar se guarda la foto del zapato y los contadores vuelven a cero
+    agente.resetear_conteo()
+    assert len(agente.telemetria_por_zapato) == 1
+    assert agente.telemetria_por_zapato[0]["decisiones"] == 2
+    actual = agente.estadisticas_cache()
+    assert actual["zapato"] == 1 and actual["decisiones"] == 0
+    assert all(m["entradas"] == 0 and m["fallos"] == 0 for m in actual["memos"].values())
+
+    ruta = tmp_path / "telemetria.jsonl"
+    agente.volcar_telemetria(ruta)
+    lineas = [json.loads(linea) for linea in ruta.read_text().splitlines()]
+    assert [linea["zapato"] for linea in lineas] == [0, 1]